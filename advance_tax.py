@@ -0,0 +1,180 @@
+"""
+Advance tax scheduler for TaxBot 2025
+Quarterly installments, shortfalls and interest under sections 234B and 234C
+
+Every function works on NumPy arrays, so a whole client book is scheduled
+with a handful of column operations; the single-taxpayer helper is a thin
+wrapper over the same arithmetic.
+"""
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from tax_rules import DEFAULT_FY_AY, get_rule_set
+
+# Cumulative share of assessed tax due by 15 Jun, 15 Sep, 15 Dec and 15 Mar
+INSTALLMENT_SHARES = (0.15, 0.45, 0.75, 1.0)
+# No 234C interest on the June and September installments if at least 12% / 36% was paid
+INSTALLMENT_RELIEF = (0.12, 0.36, 0.75, 1.0)
+# 44AD / 44ADA taxpayers pay everything in the March installment
+PRESUMPTIVE_SHARES = (0.0, 0.0, 0.0, 1.0)
+# Months of 234C interest on each installment's shortfall
+INSTALLMENT_INTEREST_MONTHS = (3, 3, 3, 1)
+INTEREST_RATE = 0.01  # per month, or part of a month
+DEFAULT_MONTHS_TO_FILING = 4  # April to a 31 July return
+
+def _fy_start_year(fy_ay):
+    return int(get_rule_set(fy_ay).fy_ay.split()[1][:4])
+
+def installment_due_dates(fy_ay=DEFAULT_FY_AY):
+    year = _fy_start_year(fy_ay)
+    return [date(year, 6, 15), date(year, 9, 15), date(year, 12, 15), date(year + 1, 3, 15)]
+
+def interest_month_labels(fy_ay=DEFAULT_FY_AY, months_to_filing=DEFAULT_MONTHS_TO_FILING):
+    """
+    "Apr 2025" style labels for the monthly interest columns: the twelve
+    months of the financial year, then the months up to filing
+    """
+    year = _fy_start_year(fy_ay)
+    return [
+        date(year + (3 + i) // 12, (3 + i) % 12 + 1, 1).strftime("%b %Y")
+        for i in range(12 + months_to_filing)
+    ]
+
+def _round_down_100(amounts):
+    # Rule 119A: interest is charged on the shortfall rounded down to a multiple of 100
+    return np.floor(amounts / 100) * 100
+
+def schedule_advance_tax_batch(total_tax, tds_paid=0, installments_paid=None, fy_ay=DEFAULT_FY_AY,
+                               presumptive=False, months_to_filing=DEFAULT_MONTHS_TO_FILING):
+    """
+    Vectorized advance tax schedule for many taxpayers.
+
+    total_tax, tds_paid and presumptive are scalars or per-taxpayer arrays;
+    installments_paid is an (n, 4) array of the amounts actually paid in
+    each quarter. Returns a dict of columns: assessed_tax, installment_1..4
+    (amount due in each quarter), shortfall_1..4 (against the cumulative
+    requirement), interest_234c, interest_234b, total_interest and
+    balance_payable, plus "monthly_interest", an (n, 12 + months_to_filing)
+    array of interest accruing in each month from April of the financial
+    year (see interest_month_labels).
+    """
+    total_tax = np.atleast_1d(np.asarray(total_tax, dtype=np.float64))
+    n_rows = len(total_tax)
+    tds_paid = np.broadcast_to(np.asarray(tds_paid, dtype=np.float64), (n_rows,))
+    if installments_paid is None:
+        installments_paid = np.zeros((n_rows, 4))
+    paid = np.broadcast_to(np.asarray(installments_paid, dtype=np.float64), (n_rows, 4))
+    presumptive = np.broadcast_to(np.asarray(presumptive, dtype=bool), (n_rows,))
+    if (total_tax < 0).any() or (tds_paid < 0).any() or (paid < 0).any():
+        raise ValueError("Tax and payment amounts must be non-negative numbers")
+    if months_to_filing < 0:
+        raise ValueError("Months to filing must be a non-negative number")
+
+    rules = get_rule_set(fy_ay)
+    assessed_tax = np.maximum(0, total_tax - tds_paid)
+    # Below the threshold no advance tax is due and no interest applies
+    liable = assessed_tax >= rules.advance_tax_threshold
+
+    shares = np.where(presumptive[:, None], PRESUMPTIVE_SHARES, INSTALLMENT_SHARES)
+    relief = np.where(presumptive[:, None], PRESUMPTIVE_SHARES, INSTALLMENT_RELIEF)
+    required = np.where(liable[:, None], assessed_tax[:, None] * shares, 0.0)
+    cumulative_paid = np.cumsum(paid, axis=1)
+    shortfall = np.maximum(0, required - cumulative_paid)
+    short_of_relief = cumulative_paid < assessed_tax[:, None] * relief
+    interest_234c_by_installment = np.where(
+        liable[:, None] & short_of_relief,
+        _round_down_100(shortfall) * INTEREST_RATE * np.asarray(INSTALLMENT_INTEREST_MONTHS),
+        0.0
+    )
+
+    advance_paid = cumulative_paid[:, -1]
+    short_of_90 = liable & (advance_paid < 0.9 * assessed_tax)
+    balance = np.maximum(0, assessed_tax - advance_paid)
+    interest_234b_per_month = np.where(short_of_90, _round_down_100(balance) * INTEREST_RATE, 0.0)
+
+    # Month 0 is April of the financial year: June, September and December
+    # shortfalls accrue for three months each, March's for one, and 234B runs
+    # from April of the assessment year until filing
+    monthly_interest = np.zeros((n_rows, 12 + months_to_filing))
+    for installment, first_month in enumerate((2, 5, 8, 11)):
+        months = INSTALLMENT_INTEREST_MONTHS[installment]
+        monthly_interest[:, first_month:first_month + months] += (
+            interest_234c_by_installment[:, installment:installment + 1] / months
+        )
+    monthly_interest[:, 12:] += interest_234b_per_month[:, None]
+
+    interest_234c = interest_234c_by_installment.sum(axis=1)
+    interest_234b = interest_234b_per_month * months_to_filing
+    due = np.diff(required, axis=1, prepend=0.0)
+    result = {"assessed_tax": assessed_tax}
+    for i in range(4):
+        result[f"installment_{i + 1}"] = due[:, i]
+    for i in range(4):
+        result[f"shortfall_{i + 1}"] = shortfall[:, i]
+    result.update({
+        "interest_234c": interest_234c,
+        "interest_234b": interest_234b,
+        "total_interest": interest_234c + interest_234b,
+        "balance_payable": balance + interest_234c + interest_234b,
+        "monthly_interest": monthly_interest
+    })
+    return result
+
+def schedule_advance_tax_frame(clients, fy_ay=DEFAULT_FY_AY, months_to_filing=DEFAULT_MONTHS_TO_FILING):
+    """
+    schedule_advance_tax_batch over a DataFrame with a total_tax column and
+    optional tds_paid, paid_1..paid_4 and presumptive columns. Returns the
+    result columns as a DataFrame with one interest column per month.
+    """
+    if "total_tax" not in clients:
+        raise ValueError("Client data must have a total_tax column")
+
+    def column(name, default=0):
+        return clients[name].fillna(default).to_numpy() if name in clients else default
+
+    paid = np.column_stack([
+        np.broadcast_to(column(f"paid_{i}"), (len(clients),)) for i in range(1, 5)
+    ])
+    result = schedule_advance_tax_batch(
+        clients["total_tax"].to_numpy(), column("tds_paid"), paid, fy_ay,
+        column("presumptive", False), months_to_filing
+    )
+    monthly = pd.DataFrame(
+        result.pop("monthly_interest"),
+        columns=[f"interest {label}" for label in interest_month_labels(fy_ay, months_to_filing)],
+        index=clients.index
+    )
+    return pd.concat([pd.DataFrame(result, index=clients.index), monthly], axis=1)
+
+def schedule_advance_tax(total_tax, tds_paid=0, installments_paid=(0, 0, 0, 0), fy_ay=DEFAULT_FY_AY,
+                         presumptive=False, months_to_filing=DEFAULT_MONTHS_TO_FILING):
+    """
+    Advance tax schedule for one taxpayer. Returns the batch columns as
+    plain numbers, an "installments" list with due date, amount due,
+    amount paid and shortfall per quarter, and "monthly_interest" as a
+    list of (month label, interest) pairs.
+    """
+    if len(installments_paid) != 4:
+        raise ValueError("Installments paid must have one amount per quarter")
+    result = schedule_advance_tax_batch(
+        total_tax, tds_paid, [installments_paid], fy_ay, presumptive, months_to_filing
+    )
+    schedule = {
+        name: float(values[0]) for name, values in result.items() if name != "monthly_interest"
+    }
+    schedule["installments"] = [
+        {
+            "due_date": due_date,
+            "amount_due": schedule[f"installment_{i + 1}"],
+            "amount_paid": installments_paid[i],
+            "shortfall": schedule[f"shortfall_{i + 1}"]
+        }
+        for i, due_date in enumerate(installment_due_dates(fy_ay))
+    ]
+    schedule["monthly_interest"] = list(zip(
+        interest_month_labels(fy_ay, months_to_filing), result["monthly_interest"][0].tolist()
+    ))
+    return schedule
@@ -4,14 +4,21 @@ import pandas as pd
 import altair as alt
 
 from voice_assistant import voice_assistant_ui
-from tax_engine import compute_total_tax_liability
+from tax_cache import cached_get_smart_tips
+from tax_pipeline import build_tax_pipeline, update_tax_pipeline
 from smart_tips import (
-    get_smart_tips, display_tips,
+    display_tips,
     get_tax_payment_guidance, get_document_checklist,
     get_upcoming_deadlines
 )
-from visualization import display_visualizations, offer_pdf_download
+from tax_engine import compare_tax_regimes
+from advance_tax import schedule_advance_tax
+from visualization import (
+    display_advance_tax_schedule, display_regime_comparison,
+    display_visualizations, offer_pdf_download
+)
 from indian_formatter import format_indian_currency, format_indian_number
+from tax_rules import DEFAULT_FY_AY, available_fy_ay
 
 
 # ---------------- Helper Function ---------------- #
@@ -94,6 +101,9 @@ with st.sidebar:
 # ---------------- Session State ---------------- #
 if 'form_submitted' not in st.session_state:
     st.session_state.form_submitted = False
+if 'tax_pipeline' not in st.session_state:
+    # Per-session stage graph: a recalculation reruns only the stages whose inputs changed
+    st.session_state.tax_pipeline = build_tax_pipeline()
 
 
 # ---------------- Personal Info Form ---------------- #
@@ -112,9 +122,10 @@ with st.form(key='personal_info'):
             horizontal=True, help="Are you living in India?"
         )
     with col2:
+        fy_ay_options = available_fy_ay()
         fy_ay = st.selectbox(
             "Financial Year / Assessment Year",
-            ["FY 2025-26 / AY 2026-27"], index=0,
+            fy_ay_options, index=fy_ay_options.index(DEFAULT_FY_AY),
             help="Choose the applicable financial year"
         )
         employment_type = st.selectbox(
@@ -159,10 +170,16 @@ if st.session_state.form_submitted:
         presumptive_eligibility = False
         stcg = ltcg = dividends = interest_income = 0
         tds_paid = advance_tax_paid = 0
+        advance_tax_installments = (0, 0, 0, 0)
+        section_80c = section_80d = nps_contribution = home_loan_interest = 0
+        metro_city = False
 
         etype = st.session_state.employment_type
 
-        if etype == "Salaried":
+        # Mixed income fills in every head
+        mixed = etype == "Mixed"
+
+        if etype == "Salaried" or mixed:
             st.subheader("Income Details: Salaried")
             col1, col2 = st.columns(2)
             with col1:
@@ -173,8 +190,9 @@ if st.session_state.form_submitted:
                 hra = st.number_input("HRA", min_value=0, value=0)
                 rent_paid = st.number_input("Rent Paid", min_value=0, value=0)
                 employer_nps = st.number_input("Employer NPS Contribution", min_value=0, value=0)
+                metro_city = st.checkbox("Living in a Metro City (for HRA exemption)")
 
-        elif etype == "Rental":
+        if etype == "Rental" or mixed:
             st.subheader("Income Details: Rental")
             col1, col2 = st.columns(2)
             with col1:
@@ -184,13 +202,13 @@ if st.session_state.form_submitted:
                 municipal_tax = st.number_input("Municipal Tax Paid", min_value=0, value=0)
                 interest_paid = st.number_input("Interest Paid on Home Loan", min_value=0, value=0)
 
-        elif etype in ["Freelancer", "Business"]:
+        if etype in ["Freelancer", "Business"] or mixed:
             st.subheader("Income Details: Freelance / Business")
             net_profit = st.number_input("Net Profit", min_value=0, value=0)
             expenses = st.number_input("Expenses", min_value=0, value=0)
             presumptive_eligibility = st.checkbox("Eligible for Presumptive Taxation Scheme")
 
-        elif etype == "Investor":
+        if etype == "Investor" or mixed:
             st.subheader("Income Details: Investor")
             col1, col2 = st.columns(2)
             with col1:
@@ -202,7 +220,22 @@ if st.session_state.form_submitted:
 
         with st.expander("Optional Fields"):
             tds_paid = st.number_input("TDS Paid", min_value=0, value=0)
-            advance_tax_paid = st.number_input("Advance Tax Paid", min_value=0, value=0)
+            st.caption("Advance Tax Paid")
+            quarter_cols = st.columns(4)
+            advance_tax_installments = tuple(
+                quarter_col.number_input(f"By 15 {month}", min_value=0, value=0)
+                for quarter_col, month in zip(quarter_cols, ["Jun", "Sep", "Dec", "Mar"])
+            )
+            advance_tax_paid = sum(advance_tax_installments)
+
+        with st.expander("Old Regime Deductions (Optional)"):
+            col1, col2 = st.columns(2)
+            with col1:
+                section_80c = st.number_input("Other 80C Investments (PPF, ELSS, LIC)", min_value=0, value=0)
+                section_80d = st.number_input("Health Insurance Premium (80D)", min_value=0, value=0)
+            with col2:
+                nps_contribution = st.number_input("Own NPS Contribution (80CCD(1B))", min_value=0, value=0)
+                home_loan_interest = st.number_input("Home Loan Interest, Self-occupied (24(b))", min_value=0, value=0)
 
         st.session_state.income_details = {
             "basic_salary": basic_salary,
@@ -221,7 +254,14 @@ if st.session_state.form_submitted:
             "dividends": dividends,
             "interest_income": interest_income,
             "tds_paid": tds_paid,
-            "advance_tax_paid": advance_tax_paid
+            "advance_tax_paid": advance_tax_paid,
+            "advance_tax_installments": advance_tax_installments,
+            "presumptive_eligibility": presumptive_eligibility,
+            "section_80c": section_80c,
+            "section_80d": section_80d,
+            "nps_contribution": nps_contribution,
+            "home_loan_interest": home_loan_interest,
+            "metro_city": metro_city
         }
 
     # ----- Taxation Tab ----- #
@@ -230,26 +270,41 @@ if st.session_state.form_submitted:
             if st.button("Calculate Tax", type="primary"):
                 with st.spinner("Calculating tax..."):
                     try:
-                        tax_result = compute_total_tax_liability(
+                        tax_result = update_tax_pipeline(
+                            st.session_state.tax_pipeline,
                             st.session_state.income_details,
                             st.session_state.fy_ay,
                             st.session_state.employment_type
                         )
-                        tips = get_smart_tips(
+                        tips = cached_get_smart_tips(
                             st.session_state.income_details,
-                            tax_result,
                             st.session_state.fy_ay,
                             st.session_state.employment_type
                         )
                         st.session_state.tax_result = tax_result
                         st.session_state.tips = tips
                         st.success("Tax calculation complete!")
+                        st.caption(
+                            "Recomputed stages: " + (", ".join(st.session_state.tax_pipeline.recomputed) or "none")
+                        )
                         display_visualizations(
                             st.session_state.income_details,
                             tax_result,
                             st.session_state.employment_type,
                             st.session_state.fy_ay
                         )
+                        display_regime_comparison(compare_tax_regimes(
+                            st.session_state.income_details,
+                            st.session_state.fy_ay,
+                            st.session_state.employment_type
+                        ))
+                        display_advance_tax_schedule(schedule_advance_tax(
+                            tax_result['total_tax'],
+                            st.session_state.income_details.get('tds_paid', 0),
+                            st.session_state.income_details.get('advance_tax_installments', (0, 0, 0, 0)),
+                            st.session_state.fy_ay,
+                            presumptive=st.session_state.income_details.get('presumptive_eligibility', False)
+                        ))
                         display_tips(tips)
                     except Exception as e:
                         st.error(f"Error in tax calculation: {str(e)}")
@@ -279,6 +334,6 @@ if st.session_state.form_submitted:
             get_document_checklist(st.session_state.employment_type)
 
         st.header("Important Deadlines")
-        get_upcoming_deadlines()
+        get_upcoming_deadlines(st.session_state.get('fy_ay', DEFAULT_FY_AY))
 else:
     st.info("Please submit your profile information to continue.")
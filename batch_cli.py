@@ -0,0 +1,128 @@
+"""
+Command-line batch runner for TaxBot 2025
+Streams a large taxpayer CSV through the tax engine in fixed-size chunks
+
+Usage:
+    python batch_cli.py payroll.csv results.csv --workers 8 --chunk-size 100000
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from indian_formatter import parse_indian_series
+from tax_engine import BATCH_INCOME_FIELDS, OLD_REGIME_FIELDS, compute_total_tax_liability_batch
+from tax_rules import DEFAULT_FY_AY
+
+def compute_chunk(chunk, fy_ay, employment_type=None, tips=False):
+    """
+    Compute tax for one chunk of rows; returns only the result columns,
+    plus the ids of the smart tips that apply to each row with tips=True
+    """
+    if tips:
+        from smart_tips import TIP_INCOME_FIELDS, evaluate_tips_batch, tip_ids_batch
+    chunk = chunk.copy()
+    fields = BATCH_INCOME_FIELDS + (TIP_INCOME_FIELDS + OLD_REGIME_FIELDS if tips else [])
+    fields = list(dict.fromkeys(fields))
+    present = [name for name in fields if name in chunk]
+    for name in present:
+        if not pd.api.types.is_numeric_dtype(chunk[name]):
+            # Amounts written as "12,34,567", "Rs. 12.5L" or "1.2 Cr"
+            chunk[name] = parse_indian_series(chunk[name]) / 100
+    chunk[present] = chunk[present].fillna(0)
+    result = compute_total_tax_liability_batch(chunk, fy_ay, employment_type)
+    if tips:
+        result["tips"] = tip_ids_batch(evaluate_tips_batch(chunk, result, employment_type, fy_ay)).str.join(";")
+    return result
+
+def render_chunk(chunk, fy_ay, employment_type=None, header=False, tips=False):
+    """
+    Compute one chunk and render input plus result columns as CSV text, so
+    the expensive formatting happens in the worker rather than the writer
+    """
+    result = compute_chunk(chunk, fy_ay, employment_type, tips)
+    return pd.concat([chunk, result], axis=1).to_csv(header=header, index=False)
+
+def run_batch(input_path, output_path, fy_ay=DEFAULT_FY_AY, employment_type=None,
+              workers=None, chunk_size=100000, log=sys.stderr, tips=False):
+    """
+    Read input_path in chunks, compute every chunk in a process pool and
+    write input plus result columns to output_path in input order. At most
+    two chunks per worker are in flight at any time, so memory stays bounded
+    by the chunk size. Returns the number of rows processed.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if chunk_size <= 0:
+        raise ValueError("Chunk size must be a positive number of rows")
+
+    reader = pd.read_csv(input_path, chunksize=chunk_size)
+    rows = 0
+    started = time.perf_counter()
+
+    with open(output_path, "w", newline="") as output:
+        def write(n_rows, text):
+            nonlocal rows
+            output.write(text)
+            rows += n_rows
+            elapsed = time.perf_counter() - started
+            rate = rows / elapsed if elapsed > 0 else 0
+            print(f"Processed {rows:,} rows in {elapsed:.1f}s ({rate:,.0f} rows/sec)", file=log)
+
+        if workers == 0:
+            # Run in this process, which is handy for small files and debugging
+            for i, chunk in enumerate(reader):
+                write(len(chunk), render_chunk(chunk, fy_ay, employment_type, i == 0, tips))
+            return rows
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight = deque()
+            for i, chunk in enumerate(reader):
+                future = pool.submit(render_chunk, chunk, fy_ay, employment_type, i == 0, tips)
+                in_flight.append((len(chunk), future))
+                # Write finished chunks in order before reading further ahead
+                while len(in_flight) >= 2 * workers or (in_flight and in_flight[0][1].done()):
+                    n_rows, future = in_flight.popleft()
+                    write(n_rows, future.result())
+            while in_flight:
+                n_rows, future = in_flight.popleft()
+                write(n_rows, future.result())
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compute income tax for every row of a taxpayer CSV"
+    )
+    parser.add_argument("input", help="Input CSV with income_details columns")
+    parser.add_argument("output", help="Output CSV (input columns plus tax results)")
+    parser.add_argument("--fy-ay", default=DEFAULT_FY_AY,
+                        help=f"Financial year / assessment year (default: {DEFAULT_FY_AY})")
+    parser.add_argument("--employment-type", default=None,
+                        help="Employment type for every row; defaults to the employment_type column")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes (default: CPU count, 0 runs in-process)")
+    parser.add_argument("--chunk-size", type=int, default=100000,
+                        help="Rows per chunk (default: 100000)")
+    parser.add_argument("--tips", action="store_true",
+                        help="Add a tips column with the ids of the smart tips that apply to each row")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    try:
+        rows = run_batch(args.input, args.output, args.fy_ay, args.employment_type,
+                         args.workers, args.chunk_size, tips=args.tips)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - started
+    print(f"Done: {rows:,} rows written to {args.output} "
+          f"({rows / elapsed if elapsed > 0 else 0:,.0f} rows/sec)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""
+Benchmark suite for TaxBot 2025
+Measures ops/sec and memory per call for the tax engine, Indian number
+formatting, smart tips, the PDF report and every chart builder, on small,
+medium and large taxpayer profiles
+
+Usage:
+    python benchmark.py                                  # run and print results
+    python benchmark.py --save benchmarks/baseline.json  # record a new baseline
+    python benchmark.py --compare benchmarks/baseline.json --threshold 25
+"""
+
+import argparse
+import inspect
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+DEFAULT_THRESHOLD = 25.0  # percent slower than baseline before a benchmark is flagged
+FY_AY = "FY 2025-26 / AY 2026-27"
+
+PROFILES = {
+    "small": {
+        "employment_type": "Salaried",
+        "income_details": {"basic_salary": 600000, "hra": 120000, "rent_paid": 150000},
+        "amount": 75000.5
+    },
+    "medium": {
+        "employment_type": "Salaried",
+        "income_details": {
+            "basic_salary": 1500000, "hra": 400000, "bonus": 200000, "rent_paid": 360000,
+            "pf": 90000, "stcg": 80000, "ltcg": 300000
+        },
+        "amount": 1875432.75
+    },
+    "large": {
+        "employment_type": "Mixed",
+        "income_details": {
+            "basic_salary": 45000000, "hra": 6000000, "bonus": 9000000, "rent_paid": 2400000,
+            "rent_received": 3600000, "municipal_tax": 80000, "interest_paid": 150000,
+            "net_profit": 25000000, "dividends": 1500000, "interest_income": 900000,
+            "stcg": 4000000, "ltcg": 12000000
+        },
+        "amount": 987654321.25
+    }
+}
+
+ENGINE_EMPLOYMENT_TYPES = ["Salaried", "Rental", "Freelancer", "Business", "Investor", "Mixed"]
+
+def _benchmarks(profile):
+    """
+    (name, callable) pairs for one profile; imports happen here so module
+    import time is not measured
+    """
+    import numpy as np
+    import pandas as pd
+    from indian_formatter import convert_to_words, format_indian_number, format_indian_series
+    from smart_tips import get_smart_tips
+    from tax_engine import compute_total_tax_liability
+    import visualization
+
+    income_details = profile["income_details"]
+    employment_type = profile["employment_type"]
+    tax_result = compute_total_tax_liability(income_details, FY_AY, employment_type)
+    tips = get_smart_tips(income_details, tax_result, FY_AY, employment_type)
+    amount = profile["amount"]
+    # A report column of amounts up to this profile's amount
+    column = pd.Series(np.linspace(0, amount, 10000))
+
+    def engine(etype):
+        # Read every field, as the UI and report do, so lazily derived
+        # values are timed along with construction
+        return dict(compute_total_tax_liability(income_details, FY_AY, etype))
+
+    benchmarks = [
+        ("engine.compute_total_tax_liability", lambda: engine(employment_type))
+    ]
+    for etype in ENGINE_EMPLOYMENT_TYPES:
+        benchmarks.append((f"engine.compute_total_tax_liability.{etype}",
+                           lambda etype=etype: engine(etype)))
+    benchmarks += [
+        ("formatter.format_indian_number", lambda: format_indian_number(amount)),
+        ("formatter.format_indian_series", lambda: format_indian_series(column, paise=True)),
+        ("formatter.convert_to_words", lambda: convert_to_words(amount)),
+        ("tips.get_smart_tips", lambda: get_smart_tips(income_details, tax_result, FY_AY, employment_type)),
+        ("report.generate_pdf_report",
+         lambda: visualization.generate_pdf_report(income_details, tax_result, tips, employment_type, FY_AY))
+    ]
+    # Every create_* chart builder, called with whichever of these arguments it takes
+    arguments = {
+        "tax_result": tax_result, "income_details": income_details,
+        "employment_type": employment_type, "fy_ay": FY_AY
+    }
+    for name, builder in inspect.getmembers(visualization, inspect.isfunction):
+        if name.startswith("create_"):
+            # Time building the figure, not a hit in the figure cache
+            builder = getattr(builder, "__wrapped__", builder)
+            kwargs = {param: arguments[param] for param in inspect.signature(builder).parameters}
+            benchmarks.append((f"chart.{name}", lambda builder=builder, kwargs=kwargs: builder(**kwargs)))
+    return benchmarks
+
+def measure(func, min_time=0.1, repeats=5):
+    """
+    Best-of-repeats ops/sec, each repeat running func for at least
+    min_time, plus the peak memory and number of blocks still allocated
+    after one call
+    """
+    func()  # Warm up caches and lazy imports
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed == 0 else max(2, int(min_time / elapsed * 1.2))
+    best = elapsed
+    for _ in range(repeats - 1):
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = func()
+    current, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained_blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    del result
+    return {
+        "ops_per_sec": loops / best,
+        "peak_bytes": peak,
+        "retained_blocks": retained_blocks
+    }
+
+def run_benchmarks(profiles=None, name_filter=None, min_time=0.1, log=sys.stderr):
+    """
+    Run every benchmark on every profile and return {"meta": ..., "results":
+    {"<benchmark>[<profile>]": {"ops_per_sec", "peak_bytes", "retained_blocks"}}}
+    """
+    results = {}
+    # Chart builders may call st.info outside a Streamlit run, which logs a
+    # warning on every call
+    logging.disable(logging.WARNING)
+    try:
+        for profile_name in profiles or PROFILES:
+            for name, func in _benchmarks(PROFILES[profile_name]):
+                key = f"{name}[{profile_name}]"
+                if name_filter and name_filter not in key:
+                    continue
+                results[key] = measure(func, min_time=min_time)
+                if log:
+                    print(f"{key:65s} {results[key]['ops_per_sec']:>14,.0f} ops/sec "
+                          f"{results[key]['peak_bytes']:>10,} B peak", file=log)
+    finally:
+        logging.disable(logging.NOTSET)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "recorded": datetime.now().isoformat(timespec="seconds")
+        },
+        "results": results
+    }
+
+def compare_to_baseline(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Benchmarks whose ops/sec fell more than threshold percent below the
+    baseline, as (name, baseline ops/sec, current ops/sec, percent slower)
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        expected = baseline["results"].get(name)
+        if expected is None:
+            continue
+        slower = (1 - result["ops_per_sec"] / expected["ops_per_sec"]) * 100
+        if slower > threshold:
+            regressions.append((name, expected["ops_per_sec"], result["ops_per_sec"], slower))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the TaxBot engine, formatter, tips and charts")
+    parser.add_argument("--profile", action="append", choices=list(PROFILES),
+                        help="Profile to run (repeatable; default: all)")
+    parser.add_argument("--filter", default=None, help="Only run benchmarks whose name contains this")
+    parser.add_argument("--min-time", type=float, default=0.1,
+                        help="Seconds each of the five timing repeats runs for (default: 0.1)")
+    parser.add_argument("--save", metavar="PATH", help="Write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", nargs="?", const=DEFAULT_BASELINE,
+                        help=f"Compare against a JSON baseline (default: {DEFAULT_BASELINE})")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Percent slowdown that counts as a regression (default: {DEFAULT_THRESHOLD:g})")
+    args = parser.parse_args(argv)
+
+    current = run_benchmarks(args.profile, args.filter, args.min_time)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.save}", file=sys.stderr)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(current, baseline, args.threshold)
+        for name, expected, actual, slower in regressions:
+            print(f"REGRESSION {name}: {actual:,.0f} ops/sec vs {expected:,.0f} baseline "
+                  f"({slower:.1f}% slower)", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No benchmark more than {args.threshold:g}% slower than {args.compare}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Compliance calendar for TaxBot 2025
+Every due date of a financial year, and a date index of what each client
+owes on them
+
+All dates are derived from the selected financial year. The client index
+is sorted by due date once, so "who owes what in the next 14 days" is a
+binary search and a slice, however large the client book.
+"""
+
+from collections import namedtuple
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from advance_tax import installment_due_dates, schedule_advance_tax_frame
+from tax_rules import DEFAULT_FY_AY, get_rule_set
+
+Deadline = namedtuple("Deadline", ["due_date", "kind", "description"])
+
+def _fy_ay_labels(fy_ay):
+    fy, ay = get_rule_set(fy_ay).fy_ay.split(" / ")
+    return fy, ay, int(fy.split()[1][:4])
+
+def compliance_deadlines(fy_ay=DEFAULT_FY_AY):
+    """
+    Every statutory due date of the financial year, in date order: the four
+    advance tax installments, the ITR due dates with and without a tax
+    audit, and the last date for a belated or revised return
+    """
+    fy, ay, year = _fy_ay_labels(fy_ay)
+    quarters = ("Q1", "Q2", "Q3", "Q4")
+    deadlines = [
+        Deadline(due_date, f"advance_tax_{i + 1}", f"{quarters[i]} Advance Tax Payment ({fy})")
+        for i, due_date in enumerate(installment_due_dates(fy_ay))
+    ]
+    deadlines += [
+        Deadline(date(year + 1, 7, 31), "itr", f"ITR Filing Deadline ({ay})"),
+        Deadline(date(year + 1, 10, 31), "itr_audit", f"ITR Filing Deadline for Tax Audit Cases ({ay})"),
+        Deadline(date(year + 1, 12, 31), "belated_revised", f"Belated / Revised ITR Deadline ({ay})")
+    ]
+    return sorted(deadlines, key=lambda deadline: deadline.due_date)
+
+def upcoming_deadlines(fy_ay=DEFAULT_FY_AY, today=None):
+    """
+    The deadlines of the financial year that fall on or after today
+    """
+    today = today or date.today()
+    return [deadline for deadline in compliance_deadlines(fy_ay) if deadline.due_date >= today]
+
+class ComplianceCalendar:
+    """
+    What every client owes on every due date, sorted by date.
+
+    Each entry is one client and one deadline: the shortfall an advance tax
+    installment adds for the client, or the client's return with the balance
+    payable alongside it. No shortfall is counted twice, so amounts can be
+    totalled.
+    """
+
+    def __init__(self, clients, due_dates, kinds, amounts, fy_ay=DEFAULT_FY_AY):
+        order = np.argsort(due_dates, kind="stable")
+        self.fy_ay = fy_ay
+        self.due_dates = np.asarray(due_dates, dtype="datetime64[D]")[order]
+        self.clients = np.asarray(clients, dtype=object)[order]
+        self.kinds = np.asarray(kinds, dtype=object)[order]
+        self.amounts = np.asarray(amounts, dtype=np.float64)[order]
+        self.descriptions = {deadline.kind: deadline.description for deadline in compliance_deadlines(fy_ay)}
+
+    def __len__(self):
+        return len(self.due_dates)
+
+    def due_between(self, start, end):
+        """
+        Entries due from start to end, both inclusive, as a DataFrame in
+        due date order
+        """
+        start = np.datetime64(start, "D")
+        end = np.datetime64(end, "D")
+        if end < start:
+            raise ValueError("End date must not be before the start date")
+        first = np.searchsorted(self.due_dates, start, side="left")
+        last = np.searchsorted(self.due_dates, end, side="right")
+        kinds = self.kinds[first:last]
+        return pd.DataFrame({
+            "client": self.clients[first:last],
+            "due_date": self.due_dates[first:last],
+            "kind": kinds,
+            "description": pd.Series(kinds, dtype=object).map(self.descriptions).to_numpy(),
+            "amount": self.amounts[first:last]
+        })
+
+    def upcoming(self, days=14, today=None):
+        """
+        Entries due in the next days days, counting today
+        """
+        if days <= 0:
+            raise ValueError("Days must be a positive number")
+        today = today or date.today()
+        return self.due_between(today, today + timedelta(days=days - 1))
+
+def build_compliance_calendar(clients, fy_ay=DEFAULT_FY_AY):
+    """
+    Index a client book by due date.
+
+    clients takes the schedule_advance_tax_frame columns (total_tax and
+    optional tds_paid, paid_1..paid_4 and presumptive) plus an optional
+    boolean tax_audit column, which moves a client's return to the audit
+    due date. Installments are listed with the shortfall they add over the
+    previous installment's and left out when they add none; clients with a
+    balance payable get a return entry for it.
+    """
+    schedule = schedule_advance_tax_frame(clients, fy_ay)
+    deadlines = {deadline.kind: deadline.due_date for deadline in compliance_deadlines(fy_ay)}
+    labels = np.asarray(clients.index, dtype=object)
+
+    client_parts, date_parts, kind_parts, amount_parts = [], [], [], []
+    previous = np.zeros(len(clients))
+    for i in range(1, 5):
+        cumulative = schedule[f"shortfall_{i}"].to_numpy()
+        shortfall = np.maximum(0, cumulative - previous)
+        previous = cumulative
+        owing = shortfall > 0
+        client_parts.append(labels[owing])
+        date_parts.append(np.full(owing.sum(), deadlines[f"advance_tax_{i}"], dtype="datetime64[D]"))
+        kind_parts.append(np.full(owing.sum(), f"advance_tax_{i}", dtype=object))
+        amount_parts.append(shortfall[owing])
+
+    if "tax_audit" in clients:
+        audit = clients["tax_audit"].fillna(False).to_numpy(dtype=bool)
+    else:
+        audit = np.zeros(len(clients), dtype=bool)
+    balance = schedule["balance_payable"].to_numpy()
+    payable = balance > 0
+    client_parts.append(labels[payable])
+    date_parts.append(np.where(audit, np.datetime64(deadlines["itr_audit"], "D"),
+                               np.datetime64(deadlines["itr"], "D"))[payable])
+    kind_parts.append(np.where(audit, "itr_audit", "itr").astype(object)[payable])
+    amount_parts.append(balance[payable])
+
+    return ComplianceCalendar(
+        np.concatenate(client_parts), np.concatenate(date_parts),
+        np.concatenate(kind_parts), np.concatenate(amount_parts), fy_ay
+    )
@@ -8,6 +8,7 @@ from tax_engine import compute_total_tax_liability
 from smart_tips import get_smart_tips, display_tips, get_tax_payment_guidance, get_document_checklist, get_upcoming_deadlines
 from visualization import display_visualizations, offer_pdf_download
 from indian_formatter import format_indian_currency, format_indian_number
+from tax_rules import DEFAULT_FY_AY
 
 # Helper function to format values for display
 def format_value_display(value):
@@ -141,7 +142,7 @@ if st.session_state.form_submitted:
             get_document_checklist(st.session_state.employment_type)
         
         st.header("Important Deadlines")
-        get_upcoming_deadlines()
+        get_upcoming_deadlines(st.session_state.get('fy_ay', DEFAULT_FY_AY))
         
 else:
     st.info("Please submit your profile information to continue.")
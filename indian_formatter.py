@@ -1,3 +1,6 @@
+import functools
+import re
+
 def format_indian_number(amount):
 
     if amount == 0:
@@ -10,8 +13,8 @@ def format_indian_number(amount):
         if amount == int(amount):
             amount = int(amount)
         else:
-            # Round to 2 decimal places
-            amount = round(amount, 2)
+            # Round to 2 decimal places, the same way for NumPy floats
+            amount = round(float(amount), 2)
             str_amount = str(amount)
             integer_part, decimal_part = str_amount.split('.')
             formatted_integer = format_indian_integer(int(integer_part))
@@ -23,81 +26,504 @@ def format_indian_number(amount):
 
 def format_indian_integer(num):
     
-    if num == 0:
-        return "0"
+    if num < 0:
+        return "-" + format_indian_integer(-num)
     
     num_str = str(num)
     
     if len(num_str) <= 3:
         return num_str
     
-   
-    result = ""
-    length = len(num_str)
+    # Last three digits, then groups of two for thousands, lakhs, crores...
+    head = num_str[:-3]
+    groups = [head[max(i - 2, 0):i] for i in range(len(head), 0, -2)]
+    groups.reverse()
+    return ",".join(groups) + "," + num_str[-3:]
+
+# Largest amount the array formatter handles: int64 paise, with room to round
+_MAX_ARRAY_AMOUNT = 9e16
+_MAX_DIGITS = 19
+_ARRAY_TABLES = {}
+
+def _array_tables():
+    """
+    Byte tables for the array formatter, built on first use: every
+    three-digit group "000".."999", every pair of two-digit groups
+    "00,00,".."99,99," and every paise suffix ".00"..".99"
+    """
+    import numpy as np
     
-    # Add commas from right to left
-    for i, digit in enumerate(reversed(num_str)):
-        if i == 3:  # First comma after 3 digits
-            result = "," + result
-        elif i > 3 and (i - 3) % 2 == 0:  # Every 2 digits after first comma
-            result = "," + result
-        result = digit + result
+    if not _ARRAY_TABLES:
+        def table(pattern, count):
+            text = "".join(pattern.format(i // 100, i % 100) for i in range(count)).encode("ascii")
+            return np.frombuffer(text, dtype=np.uint8).reshape(count, -1)
+        _ARRAY_TABLES["triples"] = table("{0:d}{1:02d}", 1000)
+        _ARRAY_TABLES["quads"] = table("{0:02d},{1:02d},", 10000)
+        _ARRAY_TABLES["paise"] = table(".{1:02d}", 100)
+        _ARRAY_TABLES["powers"] = 10 ** np.arange(1, _MAX_DIGITS, dtype=np.int64)
+    return _ARRAY_TABLES
+
+def format_indian_array(amounts, paise=False, sign=False, prefix=""):
+    """
+    Format a whole array of amounts with lakh/crore grouping in one go.
+
+    Amounts are rounded to whole rupees, or to two decimal places with
+    paise=True. Negative amounts get a leading "-", and sign=True also puts
+    "+" in front of positive ones. prefix (e.g. "Rs. ") goes before the sign.
+    Returns a NumPy array of str; whole-rupee amounts read exactly as
+    format_indian_number would write them.
+    """
+    import numpy as np
     
-    return result
+    tables = _array_tables()
+    values = np.asarray(amounts)
+    shape = values.shape
+    values = values.ravel()
+    scale = 100 if paise else 1
+    if values.dtype.kind in "iub":
+        values = values.astype(np.int64)
+        if values.size and np.abs(values.astype(np.float64)).max() * scale >= _MAX_ARRAY_AMOUNT:
+            raise ValueError("Amount is too large to format")
+        units = np.abs(values) * scale
+        negative = values < 0
+    else:
+        values = values.astype(np.float64)
+        if not np.isfinite(values).all():
+            raise ValueError("Amounts must be finite numbers")
+        if values.size and np.abs(values).max() * scale >= _MAX_ARRAY_AMOUNT:
+            raise ValueError("Amount is too large to format")
+        units = np.rint(np.abs(values) * scale).astype(np.int64)
+        # Amounts that round to zero are shown unsigned
+        negative = (values < 0) & (units > 0)
+    rupees, fraction = np.divmod(units, scale) if paise else (units, None)
+    signed = (negative | (units > 0)) if sign else negative
+    
+    ndigits = np.searchsorted(tables["powers"], rupees, side="right") + 1
+    # Characters in the grouped integer part: digits plus one comma per pair
+    int_width = ndigits + np.maximum(ndigits - 2, 0) // 2
+    # Digits above the last three go in blocks of two lakh/crore groups
+    quads = (max(int(ndigits.max(initial=1)) - 3, 0) + 3) // 4
+    suffix = 3 if paise else 0
+    
+    # Every row right-aligned, leading zeros included; the rows are cut
+    # down to their own length below
+    width = len(prefix) + 1 + 3 + 6 * quads + suffix
+    n = rupees.size
+    right = np.zeros((n, width), dtype=np.uint8)
+    end = width - suffix
+    if paise:
+        right[:, end:] = tables["paise"][fraction]
+    right[:, end - 3:end] = tables["triples"][rupees % 1000]
+    remaining = rupees // 1000
+    for block in range(quads):
+        column = end - 9 - 6 * block
+        right[:, column:column + 6] = tables["quads"][remaining % 10000]
+        remaining //= 10000
+    rows = np.flatnonzero(signed)
+    right[rows, end - int_width[rows] - 1] = np.where(negative[rows], ord("-"), ord("+"))
+    
+    lengths = len(prefix) + signed + int_width + suffix
+    prefix_bytes = np.frombuffer(prefix.encode("ascii"), dtype=np.uint8)
+    left = np.zeros((n, width), dtype=np.uint8)
+    for length in np.flatnonzero(np.bincount(lengths, minlength=width + 1)):
+        picked = np.flatnonzero(lengths == length)
+        left[picked, :length] = right[picked, width - length:]
+    if prefix:
+        left[:, :len(prefix)] = prefix_bytes
+    return left.view(f"S{width}").ravel().astype(f"U{width}").reshape(shape)
+
+def format_indian_series(amounts, paise=False, sign=False, prefix=""):
+    """
+    format_indian_array for a pandas Series (or anything array-like),
+    returning a Series of str with the same index
+    """
+    import pandas as pd
+    
+    index = amounts.index if isinstance(amounts, pd.Series) else None
+    name = amounts.name if isinstance(amounts, pd.Series) else None
+    return pd.Series(format_indian_array(amounts, paise, sign, prefix), index=index, name=name, dtype=object)
+
+LAKH = 100000
+CRORE = 10000000
+NEGATIVE_STYLES = ("minus", "leading", "parentheses")
+
+class IndianFormatter:
+    """
+    Currency formatter configured once and reused, with an LRU cache for
+    amounts that repeat across tips, tables and charts in one render.
+
+    precision=None keeps format_indian_number's output (paise only when
+    there are any); an int fixes the decimal places. short=True writes
+    amounts from a lakh up as "12.5 L" or "1.23 Cr". negative is "minus"
+    (Rs. -500), "leading" (-Rs. 500) or "parentheses" ((Rs. 500)).
+    """
+
+    def __init__(self, symbol="Rs. ", precision=None, short=False, negative="minus", cache_size=2048):
+        if precision is not None and precision < 0:
+            raise ValueError("Precision must be a non-negative number of decimal places")
+        if negative not in NEGATIVE_STYLES:
+            raise ValueError(f"Negative style must be one of {', '.join(NEGATIVE_STYLES)}")
+        self.symbol = symbol
+        self.precision = precision
+        self.short = short
+        self.negative = negative
+        # Short form defaults to two decimals without trailing zeros
+        self._short_precision = 2 if precision is None else precision
+        self._cached = functools.lru_cache(maxsize=cache_size, typed=True)(self._format)
+
+    def __call__(self, amount):
+        return self._cached(amount)
+
+    format = __call__
+
+    def cache_info(self):
+        return self._cached.cache_info()
+
+    def cache_clear(self):
+        self._cached.cache_clear()
+
+    def _number(self, magnitude):
+        if self.precision is None:
+            return format_indian_number(magnitude)
+        integer_part, _, decimal_part = f"{magnitude:.{self.precision}f}".partition(".")
+        formatted = format_indian_integer(int(integer_part))
+        return f"{formatted}.{decimal_part}" if decimal_part else formatted
+
+    def _short_number(self, magnitude):
+        precision = self._short_precision
+        value, unit = magnitude / LAKH, "L"
+        if magnitude >= CRORE or round(value, precision) >= 100:
+            value, unit = magnitude / CRORE, "Cr"
+        integer_part, _, decimal_part = f"{value:.{precision}f}".partition(".")
+        if self.precision is None:
+            decimal_part = decimal_part.rstrip("0")
+        formatted = format_indian_integer(int(integer_part))
+        return f"{formatted}.{decimal_part} {unit}" if decimal_part else f"{formatted} {unit}"
+
+    def _format(self, amount):
+        magnitude = -amount if amount < 0 else amount
+        if self.short and magnitude >= LAKH:
+            text = self._short_number(magnitude)
+        else:
+            text = self._number(magnitude)
+        # Amounts that round to zero are shown unsigned
+        if amount >= 0 or not any(digit in text for digit in "123456789"):
+            return f"{self.symbol}{text}"
+        if self.negative == "leading":
+            return f"-{self.symbol}{text}"
+        if self.negative == "parentheses":
+            return f"({self.symbol}{text})"
+        return f"{self.symbol}-{text}"
+
+CURRENCY_FORMATTER = IndianFormatter()
+SHORT_CURRENCY_FORMATTER = IndianFormatter(short=True)
 
 def format_indian_currency(amount):
-   
-    formatted_amount = format_indian_number(amount)
-    return f"Rs. {formatted_amount}"
+    
+    return CURRENCY_FORMATTER(amount)
 
 def format_indian_currency_short(amount):
-  
-    formatted_amount = format_indian_number(amount)
-    return f"Rs. {formatted_amount}"
+    
+    return SHORT_CURRENCY_FORMATTER(amount)
 
-def convert_to_words(amount):
-   
-    if amount == 0:
-        return "Zero"
-    
-    # Handle negative numbers
-    if amount < 0:
-        return f"Negative {convert_to_words(-amount)}"
-    
-    # Convert to integer if it's a whole number
-    if isinstance(amount, float) and amount == int(amount):
-        amount = int(amount)
-    
-    # Define the Indian number system
-    crore = 10000000
-    lakh = 100000
-    thousand = 1000
-    
-    result = []
-    
-    # Crores
-    if amount >= crore:
-        crores = amount // crore
-        result.append(f"{crores} crore{'s' if crores > 1 else ''}")
-        amount %= crore
-    
-    # Lakhs
-    if amount >= lakh:
-        lakhs = amount // lakh
-        result.append(f"{lakhs} lakh{'s' if lakhs > 1 else ''}")
-        amount %= lakh
-    
-    # Thousands
-    if amount >= thousand:
-        thousands = amount // thousand
-        result.append(f"{thousands} thousand")
-        amount %= thousand
-    
-    # Remaining amount
-    if amount > 0:
-        result.append(str(amount))
-    
-    return " ".join(result)
+_ENGLISH_ONES = (
+    "Zero One Two Three Four Five Six Seven Eight Nine Ten Eleven Twelve Thirteen "
+    "Fourteen Fifteen Sixteen Seventeen Eighteen Nineteen"
+).split()
+_ENGLISH_TENS = "Twenty Thirty Forty Fifty Sixty Seventy Eighty Ninety".split()
+
+# Hindi has an irregular word for every number below a hundred
+_HINDI_0_TO_99 = (
+    "शून्य एक दो तीन चार पाँच छह सात आठ नौ "
+    "दस ग्यारह बारह तेरह चौदह पंद्रह सोलह सत्रह अठारह उन्नीस "
+    "बीस इक्कीस बाईस तेईस चौबीस पच्चीस छब्बीस सत्ताईस अट्ठाईस उनतीस "
+    "तीस इकतीस बत्तीस तैंतीस चौंतीस पैंतीस छत्तीस सैंतीस अड़तीस उनतालीस "
+    "चालीस इकतालीस बयालीस तैंतालीस चवालीस पैंतालीस छियालीस सैंतालीस अड़तालीस उनचास "
+    "पचास इक्यावन बावन तिरेपन चौवन पचपन छप्पन सत्तावन अट्ठावन उनसठ "
+    "साठ इकसठ बासठ तिरेसठ चौंसठ पैंसठ छियासठ सड़सठ अड़सठ उनहत्तर "
+    "सत्तर इकहत्तर बहत्तर तिहत्तर चौहत्तर पचहत्तर छिहत्तर सतहत्तर अठहत्तर उन्यासी "
+    "अस्सी इक्यासी बयासी तिरासी चौरासी पचासी छियासी सत्तासी अट्ठासी नवासी "
+    "नब्बे इक्यानवे बानवे तिरानवे चौरानवे पचानवे छियानवे सत्तानवे अट्ठानवे निन्यानवे"
+).split()
+
+# Words for 0-99 plus the scale and currency words, per language
+NUMBER_WORDS = {
+    "en": {
+        "0-99": tuple(_ENGLISH_ONES + [
+            f"{tens} {_ENGLISH_ONES[unit]}" if unit else tens
+            for tens in _ENGLISH_TENS for unit in range(10)
+        ]),
+        "hundred": "Hundred", "thousand": "Thousand", "lakh": "Lakh", "crore": "Crore",
+        "rupee": "Rupee", "rupees": "Rupees", "paisa": "Paisa", "paise": "Paise",
+        "and": "and", "minus": "Minus"
+    },
+    "hi": {
+        "0-99": tuple(_HINDI_0_TO_99),
+        "hundred": "सौ", "thousand": "हज़ार", "lakh": "लाख", "crore": "करोड़",
+        "rupee": "रुपया", "rupees": "रुपये", "paisa": "पैसा", "paise": "पैसे",
+        "and": "और", "minus": "ऋण"
+    }
+}
+
+def _number_words(words, number):
+    if number == 0:
+        return words["0-99"][0]
+    below_100 = words["0-99"]
+    crores, number = divmod(number, CRORE)
+    lakhs, number = divmod(number, LAKH)
+    thousands, number = divmod(number, 1000)
+    hundreds, rest = divmod(number, 100)
+    parts = []
+    if crores:
+        # A crore count is itself read in lakhs and thousands ("One Lakh Crore")
+        parts += (below_100[crores] if crores < 100 else _number_words(words, crores), words["crore"])
+    if lakhs:
+        parts += (below_100[lakhs], words["lakh"])
+    if thousands:
+        parts += (below_100[thousands], words["thousand"])
+    if hundreds:
+        parts += (below_100[hundreds], words["hundred"])
+    if rest:
+        parts.append(below_100[rest])
+    return " ".join(parts)
+
+def _language_words(language):
+    words = NUMBER_WORDS.get(language)
+    if words is None:
+        raise ValueError(f"Language must be one of {', '.join(NUMBER_WORDS)}")
+    return words
+
+def number_to_words(number, language="en"):
+    """
+    A whole number in Indian-system words, e.g. "Twelve Lakh Fifty Thousand"
+    """
+    words = _language_words(language)
+    if number < 0:
+        return f"{words['minus']} {_number_words(words, -int(number))}"
+    return _number_words(words, int(number))
+
+def _paise_words(words, paise):
+    if paise < 0:
+        return f"{words['minus']} {_paise_words(words, -paise)}"
+    rupees, paise = divmod(paise, 100)
+    text = f"{_number_words(words, rupees)} {words['rupee'] if rupees == 1 else words['rupees']}"
+    if not paise:
+        return text
+    paise_text = f"{words['0-99'][paise]} {words['paisa'] if paise == 1 else words['paise']}"
+    return f"{text} {words['and']} {paise_text}" if rupees else paise_text
+
+def convert_to_words(amount, language="en"):
+    """
+    Amount in words as written on a cheque, rounded to the paisa, e.g.
+    "Twelve Lakh Fifty Thousand Three Hundred Rupees and Fifty Paise".
+    language is "en" for English or "hi" for Hindi.
+    """
+    words = _language_words(language)
+    if isinstance(amount, float):
+        paise = round(amount * 100)
+    else:
+        paise = int(amount) * 100
+    return _paise_words(words, paise)
+
+def convert_to_words_bulk(amounts, language="en"):
+    """
+    convert_to_words for a whole array of amounts, returning an object
+    array of the same shape. Each distinct amount is converted once.
+    """
+    import numpy as np
+    
+    words = _language_words(language)
+    values = np.asarray(amounts)
+    if values.dtype.kind in "iub":
+        paise = values.astype(np.int64) * 100
+    else:
+        values = values.astype(np.float64)
+        if not np.isfinite(values).all():
+            raise ValueError("Amounts must be finite numbers")
+        paise = np.rint(values * 100).astype(np.int64)
+    distinct, positions = np.unique(paise.ravel(), return_inverse=True)
+    converted = np.array([_paise_words(words, int(p)) for p in distinct.tolist()], dtype=object)
+    return converted[positions].reshape(values.shape)
+
+UNIT_SCALES = {"k": 1000, "thousand": 1000, "l": LAKH, "lakh": LAKH, "lac": LAKH, "cr": CRORE, "crore": CRORE}
+
+# A written amount such as "Rs. 12,34,567.50", "₹12.5L", "-1.2 Cr", "(5,000)" or "5000/-".
+# Digits are grouped the Indian or the western way, or not at all.
+AMOUNT_PATTERN = re.compile(r"""
+    \s*(?P<open>\()?\s*(?P<lead>[-+])?\s*
+    (?:(?:₹|rs\.?|inr)\s*)?(?P<sign>[-+])?\s*
+    (?P<integer>\d{1,3}(?:,\d{2})*,\d{3}|\d{1,3}(?:,\d{3})+|\d+|(?=\.\d))
+    (?P<fraction>\.\d+)?
+    \s*(?P<unit>k|thousands?|l|lakhs?|lacs?|cr|crores?)?\.?
+    \s*(?:/-)?\s*(?P<close>\))?\s*
+""", re.VERBOSE | re.IGNORECASE)
+
+def _word_values():
+    values = {}
+    for words in NUMBER_WORDS.values():
+        for value, word in enumerate(words["0-99"]):
+            if " " not in word:
+                values[word.lower()] = value
+        for scale, amount in (("hundred", 100), ("thousand", 1000), ("lakh", LAKH), ("crore", CRORE)):
+            values[words[scale].lower()] = amount
+        for marker in ("rupee", "rupees", "paisa", "paise"):
+            values[words[marker].lower()] = marker
+        values[words["and"].lower()] = None
+        values[words["minus"].lower()] = "minus"
+    values.update({"lakhs": LAKH, "lac": LAKH, "lacs": LAKH, "crores": CRORE, "only": None})
+    return values
+
+# Every word _parse_words understands: numbers, scales, currency markers
+AMOUNT_WORDS = _word_values()
+
+# An amount inside free text, in digits ("8 lakh", "₹12.5L") or in words
+# ("twelve lakh fifty thousand")
+_WORD_ALTERNATIVES = "|".join(sorted(
+    (re.escape(word) for word, value in AMOUNT_WORDS.items() if isinstance(value, int)),
+    key=len, reverse=True
+))
+AMOUNT_IN_TEXT = re.compile(
+    r"(?:(?:₹|\brs\.?)\s*)?\d(?:[\d,]*\d)?(?:\.\d+)?\s*(?:crores?|cr|lakhs?|lacs?|l|k|thousand)?(?![^\W\d_])"
+    rf"|\b(?:{_WORD_ALTERNATIVES})\b(?:\s+(?:and\s+)?(?:{_WORD_ALTERNATIVES})\b)*",
+    re.IGNORECASE
+)
+
+def _scaled_paise(integer, fraction, scale):
+    # Exact integer arithmetic, rounding half to even like round()
+    digits = len(fraction)
+    numerator = int(fraction or 0) * scale * 100
+    paise, remainder = divmod(numerator, 10 ** digits)
+    if 2 * remainder > 10 ** digits or (2 * remainder == 10 ** digits and paise % 2):
+        paise += 1
+    return int(integer or 0) * scale * 100 + paise
+
+def _unit_scale(unit):
+    return UNIT_SCALES[unit.lower().rstrip("s")] if unit else 1
+
+def _parse_words(text):
+    total = current = 0
+    rupees = paise = None
+    negative = False
+    for token in text.lower().replace("-", " ").replace(",", " ").split():
+        if token not in AMOUNT_WORDS:
+            return None
+        value = AMOUNT_WORDS[token]
+        if value is None:
+            continue
+        if value == "minus":
+            negative = True
+        elif value in ("rupee", "rupees"):
+            rupees, total, current = total + current, 0, 0
+        elif value in ("paisa", "paise"):
+            paise, total, current = total + current, 0, 0
+        elif value == CRORE:
+            # Whatever came before is the number of crores ("One Lakh Crore")
+            total, current = (total + current or 1) * CRORE, 0
+        elif value >= 1000:
+            total, current = total + (current or 1) * value, 0
+        elif value == 100:
+            current = (current or 1) * 100
+        else:
+            current += value
+    leftover = total + current
+    if rupees is None and paise is None:
+        rupees = leftover
+    elif leftover:
+        return None
+    if paise is not None and paise >= 100:
+        return None
+    result = (rupees or 0) * 100 + (paise or 0)
+    return -result if negative else result
+
+def parse_indian_amount_paise(text):
+    """
+    Read an amount written in digits or words and return it in paise.
+    Raises ValueError if text is not an amount.
+    """
+    match = AMOUNT_PATTERN.fullmatch(text)
+    if match is not None and bool(match["open"]) == bool(match["close"]):
+        paise = _scaled_paise(match["integer"].replace(",", ""), (match["fraction"] or ".")[1:],
+                              _unit_scale(match["unit"]))
+        negative = bool(match["open"]) or "-" in (match["lead"], match["sign"])
+        return -paise if negative else paise
+    paise = _parse_words(text) if text.strip() else None
+    if paise is None:
+        raise ValueError(f"Cannot read {text!r} as an amount")
+    return paise
+
+def parse_indian_amount(text):
+    """
+    The inverse of format_indian_number and convert_to_words: "12,34,567",
+    "₹12.5L", "1.2 Cr", "twelve lakh" and "Rs. 5,000/-" all become
+    rupees, as an int when there are no paise.
+    """
+    paise = parse_indian_amount_paise(text)
+    return paise // 100 if paise % 100 == 0 else paise / 100
+
+def parse_indian_series(amounts):
+    """
+    Parse a whole column of written amounts into an int64 Series of paise
+    with the same index. Missing and blank values count as zero, and a
+    numeric column is simply converted. Raises ValueError naming the first
+    row that is not an amount.
+    """
+    import numpy as np
+    import pandas as pd
+    
+    series = amounts if isinstance(amounts, pd.Series) else pd.Series(amounts)
+    if series.dtype.kind in "iub":
+        return series.astype(np.int64) * 100
+    if series.dtype.kind == "f":
+        if not np.isfinite(series.fillna(0)).all():
+            raise ValueError("Amounts must be finite numbers")
+        return np.rint(series.fillna(0) * 100).astype(np.int64)
+    
+    fullmatch = AMOUNT_PATTERN.fullmatch
+    fast_rows, integers, fractions, scales, negatives, slow_rows = [], [], [], [], [], []
+    for row, value in enumerate(series.to_numpy(object)):
+        if not isinstance(value, str):
+            if value is None or value != value:
+                continue
+            value = str(value)
+        match = fullmatch(value)
+        if match is None or bool(match["open"]) != bool(match["close"]):
+            slow_rows.append(row)
+            continue
+        opened, lead, sign, integer, fraction, unit, _ = match.groups()
+        integer = integer.replace(",", "")
+        scale = _unit_scale(unit)
+        # Rows whose paise fit comfortably in int64 are computed together below
+        if len(integer) + len(str(scale)) > 16 or fraction and len(fraction) > 10:
+            slow_rows.append(row)
+            continue
+        fast_rows.append(row)
+        integers.append(integer or "0")
+        fractions.append(fraction[1:] if fraction else "")
+        scales.append(scale)
+        negatives.append(bool(opened) or lead == "-" or sign == "-")
+    
+    paise = np.zeros(len(series), dtype=np.int64)
+    if fast_rows:
+        scale = np.array(scales, dtype=np.int64) * 100
+        whole = np.array(integers).astype(np.int64)
+        digits = np.array([len(f) for f in fractions], dtype=np.int64)
+        part = np.array([f or "0" for f in fractions]).astype(np.int64)
+        denominator = 10 ** digits
+        quotient, remainder = np.divmod(part * scale, denominator)
+        # Round half to even, exactly as the scalar parser does
+        quotient += (2 * remainder > denominator) | ((2 * remainder == denominator) & (quotient % 2 == 1))
+        paise[fast_rows] = np.where(negatives, -1, 1) * (whole * scale + quotient)
+    
+    for row in slow_rows:
+        value = str(series.iloc[row])
+        try:
+            amount = parse_indian_amount_paise(value) if value.strip() else 0
+        except ValueError as e:
+            raise ValueError(f"Row {series.index[row]!r}: {e}") from None
+        if not -2 ** 63 <= amount < 2 ** 63:
+            raise ValueError(f"Row {series.index[row]!r}: amount {value!r} is too large")
+        paise[row] = amount
+    return pd.Series(paise, index=series.index, name=series.name)
 
 def get_indian_amount_display(amount):
     """
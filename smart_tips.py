@@ -1,124 +1,456 @@
 """
 Smart tax tips module for TaxBot 2025
 Provides context-aware tax advice based on user inputs
+
+Every tip is a declarative TipRule. Rule conditions only use elementwise
+operators, so one decision table serves a single taxpayer (plain values)
+and a whole payroll batch (NumPy columns). Descriptions are templates,
+rendered only for the rows that are actually shown or exported.
+
+Actionable tips carry the exact tax they save. Each one is a what-if
+scenario; for a batch every scenario for every taxpayer is stacked into
+one compare_tax_regimes_batch call, one taxpayer is priced by the scalar
+engine, and tips are ranked by what they save.
 """
 
+import functools
+import string
+from collections import namedtuple
+from datetime import date
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
 import streamlit as st
-from indian_formatter import format_indian_currency, format_indian_number
+from compliance_calendar import upcoming_deadlines
+from indian_formatter import format_indian_currency, format_indian_currency_short, format_indian_number
+from tax_engine import (
+    BATCH_INCOME_FIELDS, OLD_REGIME_FIELDS, TaxResult, _batch_column, _batch_employment_types,
+    _batch_row_count, _head_income, calculate_capital_gains_tax, calculate_old_regime_deductions,
+    compare_tax_regimes, compare_tax_regimes_batch, compute_total_tax_liability
+)
+from tax_rules import DEFAULT_FY_AY, get_rule_set
 
-def get_smart_tips(income_details, tax_result, fy_ay, employment_type):
+# Inputs the tip rules read, besides employment_type
+TIP_INCOME_FIELDS = ["basic_salary", "hra", "rent_paid", "employer_nps", "net_profit", "stcg", "ltcg"]
+TIP_RESULT_FIELDS = ["rebate_87a", "total_tax", "advance_tax_required"]
+
+# What-if scenarios behind the actionable tips. apply returns the columns the
+# tip changes, given the taxpayer's columns and the old-regime rules;
+# in_baseline marks tips the entered figures already claim, whose saving is
+# the extra tax without them.
+WhatIf = namedtuple("WhatIf", ["tip_id", "apply", "in_baseline"])
+
+# Inputs a scenario may change without moving either regime's slab income
+_DEDUCTION_FIELDS = frozenset(OLD_REGIME_FIELDS)
+_CAPITAL_GAINS_FIELDS = frozenset(["stcg", "ltcg"])
+
+# Scenarios see NumPy columns for a batch and plain values for one
+# taxpayer; these skip NumPy's per-call overhead on plain values
+def _zeros_like(a):
+    return np.zeros_like(a) if isinstance(a, np.ndarray) else 0
+
+def _maximum(a, b):
+    return np.maximum(a, b) if isinstance(a, np.ndarray) or isinstance(b, np.ndarray) else max(a, b)
+
+def _where(condition, a, b):
+    return np.where(condition, a, b) if isinstance(condition, np.ndarray) else (a if condition else b)
+
+WHAT_IF_SCENARIOS = (
+    WhatIf("hra_exemption", lambda c, rules: {"rent_paid": _zeros_like(c["rent_paid"])}, True),
+    WhatIf("nps",
+           lambda c, rules: {"nps_contribution": _maximum(c["nps_contribution"], rules.section_80ccd_1b_limit)},
+           False),
+    WhatIf("section_80c",
+           lambda c, rules: {"section_80c": _maximum(c["section_80c"], rules.section_80c_limit - c["pf"])},
+           False),
+    WhatIf("health_insurance",
+           lambda c, rules: {"section_80d": _maximum(c["section_80d"], rules.section_80d_limit)},
+           False),
+    # Book LTCG only up to the exemption this year; the part moved to next
+    # year is covered by next year's exemption
+    WhatIf("ltcg_harvesting",
+           lambda c, rules: {"ltcg": _where(c["ltcg"] > rules.ltcg_exemption,
+                                            _maximum(rules.ltcg_exemption, c["ltcg"] - rules.ltcg_exemption),
+                                            c["ltcg"])},
+           False)
+)
+
+# description is a str.format template; its fields are the year's figures
+# from tip_figures, or else columns, shown as currency
+TipRule = namedtuple("TipRule", ["tip_id", "category", "icon", "title", "description", "condition"])
+
+TIP_RULES = (
+    TipRule("rebate_87a", "rebate", "💰", "Section 87A Rebate Applied",
+            "You're eligible for {rebate_87a} rebate under Section 87A. This reduces your tax liability significantly!",
+            lambda c: c["rebate_87a"] > 0),
+    TipRule("hra_exemption", "deduction", "🏠", "HRA Exemption Available",
+            "You can claim HRA exemption of approximately {hra_exemption}. Ensure you have rent receipts and rental agreement.",
+            lambda c: c["salaried"] & (c["hra"] > 0) & (c["rent_paid"] > 0) & (c["hra_exemption"] > 0)),
+    TipRule("missing_rent", "missing_info", "⚠️", "Missing Rent Information",
+            "You have HRA but haven't entered rent paid. HRA exemption is available if you pay rent.",
+            lambda c: c["salaried"] & (c["hra"] > 0) & (c["rent_paid"] == 0)),
+    TipRule("nps", "investment", "🏦", "NPS Investment Opportunity",
+            "Consider investing in NPS for additional tax benefits up to {section_80ccd_1b_limit} under Section 80CCD(1B).",
+            lambda c: c["salaried"] & (c["employer_nps"] == 0)),
+    TipRule("section_80c", "investment", "💼", "Section 80C Headroom",
+            "Investing up to the {section_80c_limit} Section 80C limit (PPF, ELSS, life insurance) lowers your tax under the Old Tax Regime.",
+            lambda c: c["section_80c_savings"] > 0),
+    TipRule("health_insurance", "deduction", "🩺", "Health Insurance Deduction",
+            "A health insurance premium up to the {section_80d_limit} Section 80D limit lowers your tax under the Old Tax Regime.",
+            lambda c: c["health_insurance_savings"] > 0),
+    TipRule("stcg", "capital_gains", "📊", "STCG Tax Applicable",
+            "Your STCG of {stcg} will be taxed at {stcg_rate} (rate for {fy}).",
+            lambda c: c["stcg"] > 0),
+    TipRule("ltcg_taxable", "capital_gains", "📈", "LTCG Tax Applicable",
+            "Your LTCG of {ltcg} exceeds {ltcg_exemption}. Tax of {ltcg_rate} applies on gains above {ltcg_exemption} (rates for {fy}).",
+            lambda c: c["ltcg"] > c["ltcg_exemption"]),
+    TipRule("ltcg_harvesting", "capital_gains", "🌾", "Spread LTCG Across Years",
+            "Booking gains above {ltcg_exemption} in the next financial year instead lets its LTCG exemption cover them.",
+            lambda c: c["ltcg_harvesting_savings"] > 0),
+    TipRule("ltcg_exempt", "capital_gains", "✅", "LTCG Within Exemption Limit",
+            "Your LTCG of {ltcg} is within the {ltcg_exemption} exemption limit for {fy}. No tax applicable!",
+            lambda c: (c["ltcg"] > 0) & (c["ltcg"] <= c["ltcg_exemption"])),
+    TipRule("advance_tax", "advance_tax", "⏰", "Advance Tax Payment Required",
+            "Your tax liability of {total_tax} requires advance tax payment. Failure to pay may result in interest charges.",
+            lambda c: c["advance_tax_required"]),
+    TipRule("presumptive", "scheme", "📊", "Presumptive Taxation Eligibility",
+            "You may be eligible for presumptive taxation scheme (Section 44AD/44ADA) for simplified tax calculation.",
+            # Rs. 50L turnover limit for presumptive taxation
+            lambda c: ((c["employment_type"] == "Freelancer") | (c["employment_type"] == "Business"))
+                      & (c["net_profit"] <= 5000000)),
+    TipRule("regime_switch", "rebate", "🔄", "Old Tax Regime Is Cheaper",
+            "With your deductions and exemptions, filing under the Old Tax Regime costs less than the New Tax Regime.",
+            lambda c: c["regime_switch_savings"] > 0),
+    TipRule("standard_deduction", "deduction", "📝", "Standard Deduction Applied",
+            "Standard deduction of {standard_deduction} has been applied to your salary income under the New Tax Regime.",
+            lambda c: c["salaried"]),
+    TipRule("budget_2025", "regime", "🎯", "New Tax Regime Slabs",
+            "Your tax uses the {fy} New Tax Regime slabs: {new_regime_slabs}. A Section 87A rebate of up to {rebate_max} applies while taxable income is within {rebate_limit}.",
+            lambda c: True)
+)
+
+class TipTable:
     """
-    Generate smart tax tips based on user inputs and tax computation results
+    Tip rules compiled into a decision table: one boolean column per rule,
+    in display order
     """
-    tips = []
-    
-    # Rebate eligibility tip
-    if tax_result["rebate_87a"] > 0:
-        tips.append({
-            "icon": "💰",
-            "title": "Section 87A Rebate Applied",
-            "description": f"You're eligible for {format_indian_currency(tax_result['rebate_87a'])} rebate under Section 87A. This reduces your tax liability significantly!",
-            "category": "rebate"
-        })
-    
-    # HRA + Rent tip for salaried employees
-    if employment_type == "Salaried":
-        hra = income_details.get('hra', 0)
-        rent_paid = income_details.get('rent_paid', 0)
-        
-        if hra > 0 and rent_paid > 0:
-            hra_exemption = min(hra, rent_paid - (income_details.get('basic_salary', 0) * 0.1))
-            if hra_exemption > 0:
-                tips.append({
-                    "icon": "🏠",
-                    "title": "HRA Exemption Available",
-                    "description": f"You can claim HRA exemption of approximately {format_indian_currency(hra_exemption)}. Ensure you have rent receipts and rental agreement.",
-                    "category": "deduction"
-                })
-        elif hra > 0 and rent_paid == 0:
-            tips.append({
-                "icon": "⚠️",
-                "title": "Missing Rent Information",
-                "description": "You have HRA but haven't entered rent paid. HRA exemption is available if you pay rent.",
-                "category": "missing_info"
-            })
-    
-    # NPS investment tip
-    if employment_type == "Salaried":
-        employer_nps = income_details.get('employer_nps', 0)
-        if employer_nps == 0:
-            tips.append({
-                "icon": "🏦",
-                "title": "NPS Investment Opportunity",
-                "description": "Consider investing in NPS for additional tax benefits up to Rs. 50,000 under Section 80CCD(1B).",
-                "category": "investment"
-            })
-    
-    # Capital gains threshold tip (Updated for 2025-26)
-    ltcg = income_details.get('ltcg', 0)
-    stcg = income_details.get('stcg', 0)
-    
-    if stcg > 0:
-        tips.append({
-            "icon": "📊",
-            "title": "STCG Tax Applicable",
-            "description": f"Your STCG of {format_indian_currency(stcg)} will be taxed at 20% (updated rate for 2025-26).",
-            "category": "capital_gains"
-        })
-    
-    if ltcg > 125000:
-        tips.append({
-            "icon": "📈",
-            "title": "LTCG Tax Applicable",
-            "description": f"Your LTCG of {format_indian_currency(ltcg)} exceeds Rs. 1,25,000. Tax of 12.5% applies on gains above Rs. 1.25L (updated rates for 2025-26).",
-            "category": "capital_gains"
-        })
-    elif ltcg > 0 and ltcg <= 125000:
-        tips.append({
-            "icon": "✅",
-            "title": "LTCG Within Exemption Limit",
-            "description": f"Your LTCG of {format_indian_currency(ltcg)} is within the Rs. 1,25,000 exemption limit (updated for 2025-26). No tax applicable!",
-            "category": "capital_gains"
-        })
-    
-    # Advance tax warning
-    if tax_result["advance_tax_required"]:
-        tips.append({
-            "icon": "⏰",
-            "title": "Advance Tax Payment Required",
-            "description": f"Your tax liability of {format_indian_currency(tax_result['total_tax'])} requires advance tax payment. Failure to pay may result in interest charges.",
-            "category": "advance_tax"
-        })
-    
-    # Presumptive taxation tip
-    if employment_type in ["Freelancer", "Business"]:
-        net_profit = income_details.get('net_profit', 0)
-        if net_profit <= 5000000:  # Rs. 50L turnover limit for presumptive taxation
-            tips.append({
-                "icon": "📊",
-                "title": "Presumptive Taxation Eligibility",
-                "description": "You may be eligible for presumptive taxation scheme (Section 44AD/44ADA) for simplified tax calculation.",
-                "category": "scheme"
+
+    def __init__(self, rules):
+        self.rules = tuple(rules)
+        self.tip_ids = tuple(rule.tip_id for rule in self.rules)
+        if len(set(self.tip_ids)) != len(self.tip_ids):
+            raise ValueError("Tip ids must be unique")
+        self.by_id = {rule.tip_id: rule for rule in self.rules}
+        # Amount fields each description template needs
+        self.fields = {
+            rule.tip_id: tuple(field for _, field, _, _ in string.Formatter().parse(rule.description) if field)
+            for rule in self.rules
+        }
+
+    def match(self, columns):
+        """
+        Rules that apply to one taxpayer, given plain values
+        """
+        return [rule for rule in self.rules if rule.condition(columns)]
+
+    def evaluate(self, columns, n_rows):
+        """
+        Boolean matrix with a row per taxpayer and a column per rule
+        """
+        table = np.zeros((n_rows, len(self.rules)), dtype=bool)
+        for i, rule in enumerate(self.rules):
+            table[:, i] = rule.condition(columns)
+        return table
+
+    def render(self, tip_id, columns, row=None, fy_ay=DEFAULT_FY_AY):
+        """
+        The tip dict for one rule, quoting fy_ay's figures and formatting its
+        amounts for one row (or from plain values when row is None)
+        """
+        rule = self.by_id[tip_id]
+        savings = columns.get(f"{tip_id}_savings", 0.0)
+        description = rule.description
+        if self.fields[tip_id]:
+            figures = tip_figures(fy_ay)
+            description = description.format(**{
+                name: figures[name] if name in figures
+                else format_indian_currency(columns[name] if row is None else columns[name][row])
+                for name in self.fields[tip_id]
             })
-    
-    # Standard deduction info
-    if employment_type == "Salaried":
-        tips.append({
-            "icon": "📝",
-            "title": "Standard Deduction Applied",
-            "description": "Standard deduction of Rs. 75,000 has been applied to your salary income under the New Tax Regime.",
-            "category": "deduction"
-        })
-    
-    # New regime benefits for 2025-26
-    tips.append({
-        "icon": "🎯",
-        "title": "Budget 2025 Benefits",
-        "description": "You're benefiting from the new tax slabs: 0% up to Rs. 4L, 5% on 4-8L, 10% on 8-12L, 15% on 12-16L, 20% on 16-20L, 25% on 20-24L, and 30% above 24L. Higher rebate limit (Rs. 12L) and maximum rebate (Rs. 60K) also apply.",
-        "category": "regime"
+        return {
+            "icon": rule.icon,
+            "title": rule.title,
+            "description": description,
+            "category": rule.category,
+            "savings": float(savings if row is None or np.ndim(savings) == 0 else savings[row])
+        }
+
+TIP_TABLE = TipTable(TIP_RULES)
+
+@functools.lru_cache(maxsize=None)
+def tip_figures(fy_ay=DEFAULT_FY_AY):
+    """
+    The limits, rates and slabs tip descriptions quote, formatted from
+    fy_ay's rule sets, so the text always matches the rules the savings are
+    priced with
+    """
+    rules = get_rule_set(fy_ay)
+    old_rules = get_rule_set(fy_ay, "old")
+    slabs = []
+    for lower, upper, rate in rules.slabs:
+        if lower == 0:
+            slabs.append(f"{rate * 100:g}% up to {format_indian_currency_short(upper)}")
+        elif upper == float('inf'):
+            slabs.append(f"and {rate * 100:g}% above {format_indian_currency_short(lower)}")
+        else:
+            slabs.append(f"{rate * 100:g}% from {format_indian_currency_short(lower)} "
+                         f"to {format_indian_currency_short(upper)}")
+    return MappingProxyType({
+        "fy": rules.fy_ay.split(" / ")[0],
+        "new_regime_slabs": ", ".join(slabs),
+        "rebate_limit": format_indian_currency(rules.rebate_limit),
+        "rebate_max": format_indian_currency(rules.rebate_max),
+        "standard_deduction": format_indian_currency(rules.standard_deduction),
+        "stcg_rate": f"{rules.stcg_rate * 100:g}%",
+        "ltcg_rate": f"{rules.ltcg_rate * 100:g}%",
+        "section_80c_limit": format_indian_currency(old_rules.section_80c_limit),
+        "section_80d_limit": format_indian_currency(old_rules.section_80d_limit),
+        "section_80ccd_1b_limit": format_indian_currency(old_rules.section_80ccd_1b_limit),
+        "ltcg_exemption": format_indian_currency(rules.ltcg_exemption)
     })
-    
-    return tips
+
+def tip_savings_batch(data, fy_ay=DEFAULT_FY_AY, employment_type=None):
+    """
+    Exact tax saving of every actionable tip for every row of data, as
+    {tip_id: column}. The rows as entered and every what-if scenario are
+    priced together by one compare_tax_regimes_batch call. Savings are
+    measured against the cheaper regime, so switching regimes is only
+    counted by regime_switch.
+    """
+    n_rows = _batch_row_count(data, employment_type)
+    etype = np.asarray(_batch_employment_types(data, employment_type, n_rows))
+    fields = BATCH_INCOME_FIELDS + OLD_REGIME_FIELDS
+    col = {name: _batch_column(data, name, n_rows) for name in fields}
+    rules = get_rule_set(fy_ay, "old")
+
+    blocks = {name: [values] for name, values in col.items()}
+    for what_if in WHAT_IF_SCENARIOS:
+        changed = what_if.apply(col, rules)
+        for name in fields:
+            blocks[name].append(changed.get(name, col[name]))
+    n_blocks = len(WHAT_IF_SCENARIOS) + 1
+    stacked = {name: np.concatenate(values) for name, values in blocks.items()}
+    if "metro_city" in data:
+        stacked["metro_city"] = np.tile(np.asarray(data["metro_city"], dtype=bool), n_blocks)
+    compared = compare_tax_regimes_batch(stacked, fy_ay, np.tile(etype, n_blocks))
+
+    new_tax = np.asarray(compared["new_total_tax"]).reshape(n_blocks, n_rows)
+    best_tax = np.minimum(new_tax, np.asarray(compared["old_total_tax"]).reshape(n_blocks, n_rows))
+    savings = {"regime_switch": new_tax[0] - best_tax[0]}
+    for i, what_if in enumerate(WHAT_IF_SCENARIOS, 1):
+        savings[what_if.tip_id] = best_tax[i] - best_tax[0] if what_if.in_baseline else best_tax[0] - best_tax[i]
+    return savings
+
+def _priced_tip_savings(income_details, fy_ay, employment_type):
+    """
+    tip_savings by comparing both regimes for the entered figures and for
+    every scenario
+    """
+    col = {name: income_details.get(name, 0) for name in BATCH_INCOME_FIELDS + OLD_REGIME_FIELDS}
+    rules = get_rule_set(fy_ay, "old")
+
+    def best_tax(changed):
+        details = dict(income_details, **{name: float(value) for name, value in changed.items()})
+        comparison = compare_tax_regimes(details, fy_ay, employment_type)
+        return min(comparison["new"]["total_tax"], comparison["old"]["total_tax"]), comparison
+
+    baseline, comparison = best_tax({})
+    savings = {"regime_switch": float(comparison["new"]["total_tax"] - baseline)}
+    for what_if in WHAT_IF_SCENARIOS:
+        tax = best_tax(what_if.apply(col, rules))[0]
+        savings[what_if.tip_id] = float(tax - baseline if what_if.in_baseline else baseline - tax)
+    return savings
+
+def tip_savings(income_details, fy_ay, employment_type):
+    """
+    Exact tax saving of every actionable tip for one taxpayer, as {tip_id: amount}.
+    Same scenarios as tip_savings_batch, priced by the scalar engine; for
+    one row that is much cheaper than stacking arrays.
+
+    Tax never falls as taxable income rises, and every scenario leaves
+    old-regime taxable income at or above what it is with all the added
+    deductions claimed at once. When the old regime costs at least as much
+    as the new one even then, the new regime is cheaper in every scenario:
+    scenarios that only change old-regime deductions save nothing, and ones
+    that only change capital gains are priced under the new regime alone.
+    """
+    tax_result = compute_total_tax_liability(income_details, fy_ay, employment_type)
+    new_rules = get_rule_set(fy_ay)
+    old_rules = get_rule_set(fy_ay, "old")
+    col = {name: income_details.get(name, 0) for name in BATCH_INCOME_FIELDS + OLD_REGIME_FIELDS}
+    scenarios = [(what_if, what_if.apply(col, old_rules)) for what_if in WHAT_IF_SCENARIOS]
+
+    all_deductions = {}
+    for what_if, changed in scenarios:
+        if not what_if.in_baseline and changed.keys() <= _DEDUCTION_FIELDS:
+            all_deductions.update(changed)
+    deductions = calculate_old_regime_deductions(dict(income_details, **all_deductions), employment_type, fy_ay)
+    old_head_income = _head_income(
+        income_details, employment_type, old_rules.standard_deduction, deductions["hra_exemption"]
+    )
+    old_floor = max(0, old_head_income - (deductions["total"] - deductions["hra_exemption"]))
+    # Slab tax is summed first, so capital gains tax is added the same way in both regimes
+    new_slab_tax = tax_result["tax_after_rebate"] + tax_result["surcharge"] + tax_result["cess"]
+    if TaxResult(old_rules, old_floor)["total_tax"] < new_slab_tax:
+        return _priced_tip_savings(income_details, fy_ay, employment_type)
+
+    baseline = tax_result["total_tax"]
+    savings = {"regime_switch": 0.0}
+    for what_if, changed in scenarios:
+        if changed.keys() <= _DEDUCTION_FIELDS:
+            savings[what_if.tip_id] = 0.0
+        elif changed.keys() <= _CAPITAL_GAINS_FIELDS:
+            stcg_tax, ltcg_tax = calculate_capital_gains_tax(
+                float(changed.get("stcg", col["stcg"])), float(changed.get("ltcg", col["ltcg"])), fy_ay
+            )
+            tax = TaxResult(new_rules, tax_result["taxable_income"], stcg_tax, ltcg_tax)["total_tax"]
+            savings[what_if.tip_id] = float(tax - baseline if what_if.in_baseline else baseline - tax)
+        else:
+            return _priced_tip_savings(income_details, fy_ay, employment_type)
+    return savings
+
+def tip_columns(income_details, tax_result, employment_type, fy_ay=DEFAULT_FY_AY):
+    """
+    The values the tip rules read, for one taxpayer
+    """
+    columns = {name: income_details.get(name, 0) for name in TIP_INCOME_FIELDS}
+    columns.update({name: tax_result[name] for name in TIP_RESULT_FIELDS})
+    columns["employment_type"] = employment_type
+    columns["salaried"] = employment_type == "Salaried"
+    columns["hra_exemption"] = min(columns["hra"], columns["rent_paid"] - columns["basic_salary"] * 0.1)
+    columns["ltcg_exemption"] = get_rule_set(fy_ay).ltcg_exemption
+    for tip_id, savings in tip_savings(income_details, fy_ay, employment_type).items():
+        columns[f"{tip_id}_savings"] = savings
+    return columns
+
+def tip_columns_batch(data, tax_results, employment_type=None, fy_ay=DEFAULT_FY_AY):
+    """
+    The values the tip rules read, as one column per input for every row
+    of data (a DataFrame or dict of columns) and its batch tax results
+    """
+    n_rows = len(tax_results["total_tax"])
+    columns = {name: _batch_column(data, name, n_rows) for name in TIP_INCOME_FIELDS}
+    columns.update({name: np.asarray(tax_results[name]) for name in TIP_RESULT_FIELDS})
+    etype = np.asarray(_batch_employment_types(data, employment_type, n_rows))
+    columns["employment_type"] = etype
+    columns["salaried"] = etype == "Salaried"
+    columns["hra_exemption"] = np.minimum(columns["hra"], columns["rent_paid"] - columns["basic_salary"] * 0.1)
+    columns["ltcg_exemption"] = np.full(n_rows, get_rule_set(fy_ay).ltcg_exemption)
+    for tip_id, savings in tip_savings_batch(data, fy_ay, employment_type).items():
+        columns[f"{tip_id}_savings"] = savings
+    return columns
+
+def evaluate_tips_batch(data, tax_results, employment_type=None, fy_ay=DEFAULT_FY_AY):
+    """
+    Which tips apply to every row of a batch, without rendering any text.
+    Returns a boolean DataFrame with a column per tip id, indexed like data.
+    """
+    columns = tip_columns_batch(data, tax_results, employment_type, fy_ay)
+    table = TIP_TABLE.evaluate(columns, len(columns["total_tax"]))
+    index = data.index if isinstance(data, pd.DataFrame) else None
+    return pd.DataFrame(table, index=index, columns=list(TIP_TABLE.tip_ids))
+
+def tip_ids_batch(matches):
+    """
+    The tip ids per row of an evaluate_tips_batch table, in display order
+    """
+    table = matches.to_numpy(dtype=bool)
+    tip_ids = np.array(matches.columns, dtype=object)
+    # Rows share few distinct tip combinations; build each tuple once
+    codes = table @ (np.int64(1) << np.arange(table.shape[1], dtype=np.int64))
+    _, first, positions = np.unique(codes, return_index=True, return_inverse=True)
+    combinations = np.empty(len(first), dtype=object)
+    combinations[:] = [tuple(tip_ids[table[row]]) for row in first]
+    return pd.Series(combinations[positions], index=matches.index)
+
+def rank_tips(tips):
+    """
+    Tips with the largest tax saving first; ties keep the table order
+    """
+    return sorted(tips, key=lambda tip: -tip["savings"])
+
+def render_tips_batch(data, tax_results, rows, employment_type=None, fy_ay=DEFAULT_FY_AY):
+    """
+    Tip dicts for only the given row positions of a batch, as
+    {row position: [tip, ...]}, ranked like get_smart_tips
+    """
+    columns = tip_columns_batch(data, tax_results, employment_type, fy_ay)
+    rows = np.asarray(rows, dtype=np.int64)
+    subset = {name: np.asarray(values)[rows] for name, values in columns.items()}
+    table = TIP_TABLE.evaluate(subset, len(rows))
+    return {
+        int(row): rank_tips([TIP_TABLE.render(tip_id, subset, i, fy_ay)
+                             for tip_id, applies in zip(TIP_TABLE.tip_ids, table[i]) if applies])
+        for i, row in enumerate(rows)
+    }
+
+def get_smart_tips(income_details, tax_result, fy_ay, employment_type):
+    """
+    Generate smart tax tips based on user inputs and tax computation results
+    """
+    columns = tip_columns(income_details, tax_result, employment_type, fy_ay)
+    return rank_tips([TIP_TABLE.render(rule.tip_id, columns, fy_ay=fy_ay) for rule in TIP_TABLE.match(columns)])
+
+# Display order and headings of the tip categories
+TIP_CATEGORIES = {
+    "rebate": "💰 Rebates & Savings",
+    "deduction": "📝 Deductions",
+    "investment": "🏦 Investment Opportunities",
+    "capital_gains": "📈 Capital Gains",
+    "advance_tax": "⏰ Tax Payments",
+    "scheme": "📊 Tax Schemes",
+    "regime": "🎯 New Tax Regime",
+    "missing_info": "⚠️ Missing Information"
+}
+
+# Card styles are sent once per render instead of inline on every tip
+_TIP_STYLE = (
+    "<style>"
+    ".taxbot-tip {border: 1px solid #e0e0e0; border-radius: 8px; padding: 15px; margin: 10px 0; background-color: #f9f9f9;}"
+    ".taxbot-tip-head {display: flex; align-items: center; margin-bottom: 8px;}"
+    ".taxbot-tip-icon {font-size: 20px; margin-right: 10px;}"
+    ".taxbot-tip p {margin: 0; color: #666;}"
+    ".taxbot-tip p.taxbot-tip-saving {margin-top: 6px; color: #2e7d32; font-weight: 600;}"
+    "</style>"
+)
+_TIP_CARD = (
+    '<div class="taxbot-tip"><div class="taxbot-tip-head">'
+    '<span class="taxbot-tip-icon">{icon}</span><strong>{title}</strong></div>'
+    '<p>{description}</p>{saving}</div>'
+)
+
+def render_tips_html(tips):
+    """
+    Every tip as one HTML block, grouped by category in a single pass
+    """
+    grouped = {category: [] for category in TIP_CATEGORIES}
+    for tip in tips:
+        if tip["category"] in grouped:
+            grouped[tip["category"]].append(tip)
+    parts = [_TIP_STYLE]
+    for category, category_tips in grouped.items():
+        if category_tips:
+            parts.append(f"<p><strong>{TIP_CATEGORIES[category]}</strong></p>")
+            parts.extend(
+                _TIP_CARD.format(
+                    icon=tip["icon"], title=tip["title"], description=tip["description"],
+                    saving=(f'<p class="taxbot-tip-saving">Tax saving: {format_indian_currency(tip["savings"])}</p>'
+                            if tip.get("savings", 0) > 0 else "")
+                )
+                for tip in category_tips
+            )
+    return "\n".join(parts)
 
 def display_tips(tips):
     """
@@ -129,43 +461,26 @@ def display_tips(tips):
         return
     
     st.subheader("🎯 Smart Tax Tips")
-    
-    # Group tips by category
-    categories = {
-        "rebate": "💰 Rebates & Savings",
-        "deduction": "📝 Deductions",
-        "investment": "🏦 Investment Opportunities",
-        "capital_gains": "📈 Capital Gains",
-        "advance_tax": "⏰ Tax Payments",
-        "scheme": "📊 Tax Schemes",
-        "regime": "🎯 New Tax Regime",
-        "missing_info": "⚠️ Missing Information"
-    }
-    
-    for category, category_title in categories.items():
-        category_tips = [tip for tip in tips if tip["category"] == category]
-        
-        if category_tips:
-            st.markdown(f"**{category_title}**")
-            
-            for tip in category_tips:
-                # Use simple container with better styling
-                with st.container():
-                    st.markdown(f"""
-                    <div style="
-                        border: 1px solid #e0e0e0;
-                        border-radius: 8px;
-                        padding: 15px;
-                        margin: 10px 0;
-                        background-color: #f9f9f9;
-                    ">
-                        <div style="display: flex; align-items: center; margin-bottom: 8px;">
-                            <span style="font-size: 20px; margin-right: 10px;">{tip['icon']}</span>
-                            <strong>{tip['title']}</strong>
-                        </div>
-                        <p style="margin: 0; color: #666;">{tip['description']}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
+    st.markdown(render_tips_html(tips), unsafe_allow_html=True)
+
+CHALLAN_280_GUIDE = """
+**📋 Step-by-step Guide to Challan 280 Payment:**
+1. Visit the Income Tax e-filing portal
+2. Go to 'e-Pay Tax' section
+3. Select 'Challan No./ITNS 280'
+4. Enter your PAN and select Assessment Year
+5. Choose payment method (Net Banking/Debit Card)
+6. Complete the payment process
+7. Download and save the challan receipt
+"""
+
+IMPORTANT_LINKS = """
+**🔗 Important Links:**
+- [Income Tax e-filing Portal](https://www.incometax.gov.in/iec/foportal)
+- [Form 26AS](https://www.incometax.gov.in/iec/foportal/help/form-26as)
+- [Annual Information Statement (AIS)](https://www.incometax.gov.in/iec/foportal/help/ais)
+- [TDS Certificate Download](https://www.incometax.gov.in/iec/foportal/help/tds-certificates)
+"""
 
 def get_tax_payment_guidance():
     """
@@ -176,95 +491,89 @@ def get_tax_payment_guidance():
     col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown("""
-        **📋 Step-by-step Guide to Challan 280 Payment:**
-        1. Visit the Income Tax e-filing portal
-        2. Go to 'e-Pay Tax' section
-        3. Select 'Challan No./ITNS 280'
-        4. Enter your PAN and select Assessment Year
-        5. Choose payment method (Net Banking/Debit Card)
-        6. Complete the payment process
-        7. Download and save the challan receipt
-        """)
+        st.markdown(CHALLAN_280_GUIDE)
     
     with col2:
-        st.markdown("""
-        **🔗 Important Links:**
-        - [Income Tax e-filing Portal](https://www.incometax.gov.in/iec/foportal)
-        - [Form 26AS](https://www.incometax.gov.in/iec/foportal/help/form-26as)
-        - [Annual Information Statement (AIS)](https://www.incometax.gov.in/iec/foportal/help/ais)
-        - [TDS Certificate Download](https://www.incometax.gov.in/iec/foportal/help/tds-certificates)
-        """)
+        st.markdown(IMPORTANT_LINKS)
+
+COMMON_DOCUMENTS = [
+    "PAN Card",
+    "Aadhaar Card",
+    "Bank Account Statements",
+    "Form 26AS",
+    "Annual Information Statement (AIS)"
+]
+
+EMPLOYMENT_TYPE_DOCUMENTS = {
+    "Salaried": [
+        "Form 16 from employer",
+        "Salary certificates",
+        "HRA rent receipts and agreement",
+        "Investment proofs (80C, 80D, etc.)",
+        "Interest certificate from banks"
+    ],
+    "Freelancer": [
+        "Professional income receipts",
+        "Expense vouchers",
+        "TDS certificates from clients",
+        "Business registration documents"
+    ],
+    "Business": [
+        "Business income statements",
+        "Profit & Loss account",
+        "Balance sheet",
+        "Expense receipts",
+        "GST returns"
+    ],
+    "Rental": [
+        "Property documents",
+        "Rent receipts",
+        "Municipal tax receipts",
+        "Home loan interest certificate",
+        "Property tax receipts"
+    ],
+    "Investor": [
+        "Share trading statements",
+        "Dividend income certificates",
+        "Interest income statements",
+        "Capital gains statements",
+        "Mutual fund statements"
+    ]
+}
+
+@functools.lru_cache(maxsize=None)
+def document_checklist_markdown(employment_type):
+    """
+    The document checklist for an employment type as one markdown block,
+    built once per type
+    """
+    all_docs = COMMON_DOCUMENTS + EMPLOYMENT_TYPE_DOCUMENTS.get(employment_type, [])
+    return "\n\n".join(f"☑️ {doc}" for doc in all_docs)
 
 def get_document_checklist(employment_type):
     """
     Generate document checklist based on employment type
     """
     st.subheader("📄 Document Checklist")
-    
-    common_docs = [
-        "PAN Card",
-        "Aadhaar Card",
-        "Bank Account Statements",
-        "Form 26AS",
-        "Annual Information Statement (AIS)"
-    ]
-    
-    specific_docs = {
-        "Salaried": [
-            "Form 16 from employer",
-            "Salary certificates",
-            "HRA rent receipts and agreement",
-            "Investment proofs (80C, 80D, etc.)",
-            "Interest certificate from banks"
-        ],
-        "Freelancer": [
-            "Professional income receipts",
-            "Expense vouchers",
-            "TDS certificates from clients",
-            "Business registration documents"
-        ],
-        "Business": [
-            "Business income statements",
-            "Profit & Loss account",
-            "Balance sheet",
-            "Expense receipts",
-            "GST returns"
-        ],
-        "Rental": [
-            "Property documents",
-            "Rent receipts",
-            "Municipal tax receipts",
-            "Home loan interest certificate",
-            "Property tax receipts"
-        ],
-        "Investor": [
-            "Share trading statements",
-            "Dividend income certificates",
-            "Interest income statements",
-            "Capital gains statements",
-            "Mutual fund statements"
-        ]
-    }
-    
-    all_docs = common_docs + specific_docs.get(employment_type, [])
-    
-    for doc in all_docs:
-        st.markdown(f"☑️ {doc}")
+    st.markdown(document_checklist_markdown(employment_type))
 
-def get_upcoming_deadlines():
+@functools.lru_cache(maxsize=32)
+def upcoming_deadlines_markdown(fy_ay, today):
+    """
+    The year's deadlines still ahead of today as one markdown block, built
+    once per year and day
+    """
+    deadlines = upcoming_deadlines(fy_ay, today)
+    if not deadlines:
+        return f"✅ Every deadline for {fy_ay} has passed."
+    return "\n\n".join(
+        f"📅 **{deadline.due_date:%B} {deadline.due_date.day}, {deadline.due_date.year}**: {deadline.description}"
+        for deadline in deadlines
+    )
+
+def get_upcoming_deadlines(fy_ay=DEFAULT_FY_AY, today=None):
     """
     Display upcoming tax deadlines
     """
     st.subheader("📅 Upcoming Tax Deadlines")
-    
-    deadlines = [
-        {"date": "June 15, 2025", "description": "Q1 Advance Tax Payment (FY 2025-26)"},
-        {"date": "July 31, 2025", "description": "ITR Filing Deadline (AY 2025-26)"},
-        {"date": "September 15, 2025", "description": "Q2 Advance Tax Payment (FY 2025-26)"},
-        {"date": "December 15, 2025", "description": "Q3 Advance Tax Payment (FY 2025-26)"},
-        {"date": "March 15, 2026", "description": "Q4 Advance Tax Payment (FY 2025-26)"}
-    ]
-    
-    for deadline in deadlines:
-        st.markdown(f"📅 **{deadline['date']}**: {deadline['description']}")
+    st.markdown(upcoming_deadlines_markdown(fy_ay, today or date.today()))
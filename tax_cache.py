@@ -0,0 +1,138 @@
+"""
+Result cache for TaxBot 2025
+Thread-safe LRU memoization of tax computations and smart tips, shared by
+every Streamlit session in the process
+"""
+
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+
+from tax_engine import compute_total_tax_liability
+from smart_tips import get_smart_tips
+
+class LRUCache:
+    """
+    Bounded least-recently-used cache guarded by a lock, with hit, miss and
+    eviction counters. With maxbytes, entries are also evicted once the
+    sizeof of every cached value adds up to more than maxbytes.
+    """
+
+    def __init__(self, maxsize=1024, maxbytes=None, sizeof=None):
+        if maxsize <= 0:
+            raise ValueError("Cache size must be a positive number")
+        if maxbytes is not None and (maxbytes <= 0 or sizeof is None):
+            raise ValueError("A byte limit must be a positive number and needs a sizeof function")
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self._sizeof = sizeof
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for key, calling compute() and storing its
+        result on a miss. A None result is returned but not stored, so the
+        next call computes it again. compute runs outside the lock, so a slow
+        computation never blocks other sessions.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        value = compute()
+        if value is None:
+            return None
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key]
+            if self.maxbytes is not None:
+                size = self._sizeof(value)
+                # A value bigger than maxbytes is returned but not kept, and
+                # does not evict anything
+                if size > self.maxbytes:
+                    return value
+                self.bytes += size
+            self._entries[key] = value
+            while len(self._entries) > self.maxsize or (self.maxbytes is not None and self.bytes > self.maxbytes):
+                _, evicted = self._entries.popitem(last=False)
+                if self.maxbytes is not None:
+                    self.bytes -= self._sizeof(evicted)
+                self.evictions += 1
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize
+            }
+            if self.maxbytes is not None:
+                stats.update(bytes=self.bytes, maxbytes=self.maxbytes)
+            return stats
+
+    def __len__(self):
+        return len(self._entries)
+
+TAX_RESULT_CACHE = LRUCache(maxsize=2048)
+SMART_TIPS_CACHE = LRUCache(maxsize=2048)
+
+def canonical_income_key(income_details, fy_ay, employment_type):
+    """
+    Hashable cache key for a computation. Zero and empty fields are dropped
+    because the engine treats a missing field as zero.
+    """
+    income = tuple(sorted((name, value) for name, value in income_details.items() if value))
+    return income, fy_ay, employment_type
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    # TaxBreakdown is already a read-only sequence of read-only rows
+    return value
+
+def cached_compute_total_tax_liability(income_details, fy_ay, employment_type):
+    """
+    compute_total_tax_liability through TAX_RESULT_CACHE. The result is a
+    read-only mapping shared between callers.
+    """
+    key = canonical_income_key(income_details, fy_ay, employment_type)
+    return TAX_RESULT_CACHE.get_or_compute(
+        key,
+        lambda: _freeze(compute_total_tax_liability(income_details, fy_ay, employment_type))
+    )
+
+def cached_get_smart_tips(income_details, fy_ay, employment_type):
+    """
+    get_smart_tips for the cached tax result of the same inputs, through
+    SMART_TIPS_CACHE. Returns a tuple of read-only tip mappings.
+    """
+    key = canonical_income_key(income_details, fy_ay, employment_type)
+
+    def compute():
+        tax_result = cached_compute_total_tax_liability(income_details, fy_ay, employment_type)
+        return _freeze(get_smart_tips(income_details, tax_result, fy_ay, employment_type))
+
+    return SMART_TIPS_CACHE.get_or_compute(key, compute)
+
+def cache_stats():
+    return {
+        "tax_result": TAX_RESULT_CACHE.stats(),
+        "smart_tips": SMART_TIPS_CACHE.stats()
+    }
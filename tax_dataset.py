@@ -0,0 +1,295 @@
+"""
+Columnar taxpayer datasets for TaxBot 2025
+Fixed-schema, memory-mapped storage for income_details and tax results
+
+A dataset is a directory holding one .npy file per column plus schema.json.
+Columns are opened with np.memmap, so batch computation reads inputs and
+writes results in place, and filters, percentiles and aggregates stream
+over the data in chunks instead of loading it into RAM.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from indian_formatter import parse_indian_series
+from tax_engine import BATCH_INCOME_FIELDS, TAX_RESULT_KEYS, compute_total_tax_liability_batch
+from tax_rules import DEFAULT_FY_AY
+
+FORMAT_VERSION = 1
+SCHEMA_FILE = "schema.json"
+DEFAULT_CHUNK_SIZE = 1000000
+
+EMPLOYMENT_TYPES = ["Salaried", "Freelancer", "Business", "Rental", "Investor", "Mixed"]
+
+# Every income_details field; advance_tax_installments is stored as paid_1..paid_4
+INPUT_COLUMNS = {
+    "employment_type": "u1",
+    **{name: "f8" for name in [
+        "basic_salary", "hra", "pf", "bonus", "rent_paid", "employer_nps",
+        "rent_received", "municipal_tax", "interest_paid", "net_profit", "expenses",
+        "stcg", "ltcg", "dividends", "interest_income", "tds_paid", "advance_tax_paid",
+        "paid_1", "paid_2", "paid_3", "paid_4",
+        "section_80c", "section_80d", "nps_contribution", "home_loan_interest"
+    ]},
+    "metro_city": "?",
+    "presumptive_eligibility": "?"
+}
+RESULT_COLUMNS = {
+    name: "?" if name == "advance_tax_required" else "f8"
+    for name in TAX_RESULT_KEYS if name != "tax_breakdown"
+}
+COLUMNS = {**INPUT_COLUMNS, **RESULT_COLUMNS}
+
+def _column_path(path, name):
+    return os.path.join(path, f"{name}.npy")
+
+def _employment_type_codes(values):
+    codes = pd.Categorical(values, categories=EMPLOYMENT_TYPES).codes
+    if (codes < 0).any():
+        unknown = sorted(set(pd.Series(values)[codes < 0].astype(str)))
+        raise ValueError(f"Unknown employment type(s): {', '.join(unknown)}")
+    return codes.astype(np.uint8)
+
+class TaxDataset:
+    """
+    A memory-mapped columnar dataset. ds["total_tax"] is a np.memmap over
+    that column; slicing it reads only the rows asked for.
+    """
+
+    def __init__(self, path, mode="r"):
+        with open(os.path.join(path, SCHEMA_FILE), encoding="utf-8") as f:
+            self.schema = json.load(f)
+        if self.schema.get("version") != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported dataset version {self.schema.get('version')!r}")
+        self.path = path
+        self.mode = mode
+        self.columns = {
+            name: np.load(_column_path(path, name), mmap_mode=mode)
+            for name in self.schema["columns"]
+        }
+
+    @classmethod
+    def create(cls, path, n_rows):
+        """
+        Create an empty dataset of n_rows zeroed rows with every column
+        """
+        if n_rows < 0:
+            raise ValueError("Number of rows must be a non-negative number")
+        os.makedirs(path, exist_ok=True)
+        for name, dtype in COLUMNS.items():
+            column = np.lib.format.open_memmap(
+                _column_path(path, name), mode="w+", dtype=dtype, shape=(n_rows,)
+            )
+            del column  # Flushes the zero-filled file
+        with open(os.path.join(path, SCHEMA_FILE), "w", encoding="utf-8") as f:
+            json.dump({
+                "version": FORMAT_VERSION,
+                "rows": n_rows,
+                "columns": COLUMNS,
+                "employment_types": EMPLOYMENT_TYPES,
+                "fy_ay": None
+            }, f, indent=2)
+        return cls(path, mode="r+")
+
+    @classmethod
+    def from_frame(cls, frame, path, employment_type=None):
+        """
+        Create a dataset from a DataFrame with income_details columns; missing
+        columns are zero. employment_type fills in a missing employment_type column.
+        """
+        dataset = cls.create(path, len(frame))
+        dataset.write_rows(0, frame, employment_type)
+        dataset.flush()
+        return dataset
+
+    @classmethod
+    def from_csv(cls, csv_path, path, employment_type=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Stream a taxpayer CSV into a new dataset without holding it in memory
+        """
+        n_rows = sum(len(chunk) for chunk in pd.read_csv(csv_path, usecols=[0], chunksize=chunk_size))
+        dataset = cls.create(path, n_rows)
+        start = 0
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_size):
+            dataset.write_rows(start, chunk, employment_type)
+            start += len(chunk)
+        dataset.flush()
+        return dataset
+
+    def write_rows(self, start, frame, employment_type=None):
+        stop = start + len(frame)
+        for name in INPUT_COLUMNS:
+            if name == "employment_type":
+                if name in frame:
+                    values = frame[name]
+                elif employment_type is not None:
+                    values = [employment_type] * len(frame)
+                else:
+                    raise ValueError("employment_type must be given or present as a column")
+                self.columns[name][start:stop] = _employment_type_codes(values)
+            elif name in frame and not pd.api.types.is_numeric_dtype(frame[name]):
+                # Amounts written as "12,34,567", "Rs. 12.5L" or "1.2 Cr"
+                self.columns[name][start:stop] = parse_indian_series(frame[name]).to_numpy() / 100
+            elif name in frame:
+                self.columns[name][start:stop] = frame[name].fillna(0).to_numpy()
+
+    def flush(self):
+        for column in self.columns.values():
+            if isinstance(column, np.memmap):
+                column.flush()
+
+    def _save_schema(self):
+        with open(os.path.join(self.path, SCHEMA_FILE), "w", encoding="utf-8") as f:
+            json.dump(self.schema, f, indent=2)
+
+    def __len__(self):
+        return self.schema["rows"]
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def chunks(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Yield (start, stop, view) for consecutive row ranges, where view maps
+        each column name to its zero-copy slice
+        """
+        for start in range(0, len(self), chunk_size):
+            stop = min(start + chunk_size, len(self))
+            yield start, stop, {name: column[start:stop] for name, column in self.columns.items()}
+
+    def employment_types(self, start=0, stop=None):
+        return np.asarray(EMPLOYMENT_TYPES)[self.columns["employment_type"][start:stop]]
+
+    def compute(self, fy_ay=DEFAULT_FY_AY, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Compute tax for every row with the batch engine, reading the input
+        columns and writing the result columns in place, one chunk at a time
+        """
+        if self.mode == "r":
+            raise ValueError("Open the dataset with mode='r+' to write results")
+        for start, stop, view in self.chunks(chunk_size):
+            result = compute_total_tax_liability_batch(
+                {name: view[name] for name in BATCH_INCOME_FIELDS}, fy_ay,
+                self.employment_types(start, stop)
+            )
+            for name in RESULT_COLUMNS:
+                self.columns[name][start:stop] = result[name]
+        self.flush()
+        self.schema["fy_ay"] = fy_ay
+        self._save_schema()
+
+    def _values(self, column, where, chunk_size):
+        for _, _, view in self.chunks(chunk_size):
+            values = view[column]
+            if where is not None:
+                values = values[where(view)]
+            yield values
+
+    def count(self, where=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Rows for which where(view) is true; where gets a chunk's column view
+        """
+        if where is None:
+            return len(self)
+        return int(sum(np.count_nonzero(where(view)) for _, _, view in self.chunks(chunk_size)))
+
+    def filter(self, where, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Row numbers for which where(view) is true
+        """
+        found = [start + np.flatnonzero(where(view)) for start, _, view in self.chunks(chunk_size)]
+        return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+
+    def aggregate(self, column, by=None, where=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        count, sum, mean, min and max of column, overall or per group of the
+        by column (employment_type is reported by name)
+        """
+        groups = {}
+        for _, _, view in self.chunks(chunk_size):
+            mask = where(view) if where is not None else slice(None)
+            values = np.asarray(view[column][mask], dtype=np.float64)
+            keys = view[by][mask] if by is not None else np.zeros(len(values), dtype=np.uint8)
+            for key in np.unique(keys):
+                selected = values[keys == key]
+                count, total, low, high = groups.get(key, (0, 0.0, np.inf, -np.inf))
+                groups[key] = (count + len(selected), total + selected.sum(),
+                               min(low, selected.min()), max(high, selected.max()))
+        rows = []
+        for key in sorted(groups):
+            count, total, low, high = groups[key]
+            label = EMPLOYMENT_TYPES[key] if by == "employment_type" else key
+            rows.append({"group": label if by is not None else "all", "count": count,
+                         "sum": total, "mean": total / count, "min": low, "max": high})
+        return pd.DataFrame(rows, columns=["group", "count", "sum", "mean", "min", "max"])
+
+    def _order_statistic(self, column, k, where, chunk_size, bins=1024, collect_limit=4000000):
+        """
+        k-th smallest value (0-based) by repeated histogram refinement: each
+        round narrows [low, high] to the bin holding rank k, until the values
+        left are all equal or few enough to select exactly in memory
+        """
+        low, high, below = -np.inf, np.inf, 0
+
+        def in_range(values):
+            return values[(values >= low) & (values <= high)]
+
+        while True:
+            # Shrink to the values actually present so ties collapse quickly
+            present_low, present_high, present = np.inf, -np.inf, 0
+            for values in self._values(column, where, chunk_size):
+                values = in_range(values)
+                if len(values):
+                    present_low = min(present_low, values.min())
+                    present_high = max(present_high, values.max())
+                    present += len(values)
+            low, high = present_low, present_high
+            if low == high:
+                return float(low)
+
+            edges = np.linspace(low, high, bins + 1)
+            counts = np.zeros(bins, dtype=np.int64)
+            for values in self._values(column, where, chunk_size):
+                counts += np.bincount(
+                    np.clip(np.searchsorted(edges, in_range(values), side="right") - 1, 0, bins - 1),
+                    minlength=bins
+                )
+            cumulative = np.cumsum(counts)
+            b = int(np.searchsorted(cumulative, k - below, side="right"))
+            if counts[b] <= collect_limit or counts[b] == present:
+                selected = np.concatenate([in_range(values) for values in self._values(column, where, chunk_size)])
+                return float(np.partition(selected, k - below)[k - below])
+            below += int(cumulative[b - 1]) if b > 0 else 0
+            # Bins are [edges[b], edges[b + 1]) apart from the last, so stop just short of the next edge
+            low = edges[b]
+            high = edges[b + 1] if b == bins - 1 else np.nextafter(edges[b + 1], -np.inf)
+
+    def percentile(self, column, q, where=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Exact percentile(s) of column, interpolated like np.percentile,
+        without loading the column into memory
+        """
+        n = self.count(where, chunk_size)
+        if n == 0:
+            raise ValueError("No rows to take a percentile of")
+        results = []
+        for value in np.atleast_1d(q):
+            if not 0 <= value <= 100:
+                raise ValueError("Percentiles must be between 0 and 100")
+            rank = value / 100 * (n - 1)
+            lower = int(np.floor(rank))
+            low_value = self._order_statistic(column, lower, where, chunk_size)
+            if rank == lower:
+                results.append(low_value)
+            else:
+                high_value = self._order_statistic(column, lower + 1, where, chunk_size)
+                fraction = rank - lower
+                # Interpolate from the nearer end, as np.percentile does
+                if fraction < 0.5:
+                    results.append(float(low_value + (high_value - low_value) * fraction))
+                else:
+                    results.append(float(high_value - (high_value - low_value) * (1 - fraction)))
+        return results[0] if np.ndim(q) == 0 else results
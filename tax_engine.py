@@ -1,110 +1,481 @@
+import os
+import struct
+from bisect import bisect_left
+from collections.abc import Mapping, Sequence
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+
 from indian_formatter import format_indian_currency, format_indian_number
+from tax_rules import DEFAULT_FY_AY, TaxRuleSet, get_rule_set
 
-def get_tax_slabs(fy_ay):
+def get_tax_slabs(fy_ay, regime="new"):
     """
-    Returns tax slabs for FY 2025-26 / AY 2026-27
+    Returns the precompiled tax rules for the given FY / AY and regime.
+    The result is shared and immutable; it still supports config["slabs"] style access.
     """
-    return {
-        "slabs": [
-            (0, 400000, 0),      # 0-4L: 0%
-            (400000, 800000, 0.05),  # 4-8L: 5%
-            (800000, 1200000, 0.10), # 8-12L: 10%
-            (1200000, 1600000, 0.15), # 12-16L: 15%
-            (1600000, 2000000, 0.20), # 16-20L: 20%
-            (2000000, 2400000, 0.25), # 20-24L: 25%
-            (2400000, float('inf'), 0.30) # 24L+: 30%
-        ],
-        "standard_deduction": 75000,
-        "rebate_limit": 1200000,  # Up to 12L
-        "rebate_max": 60000,      # Maximum 60K
-        "advance_tax_threshold": 10000
-    }
+    return get_rule_set(fy_ay, regime)
 
-def calculate_income_tax(taxable_income, fy_ay, age_group="Below 60"):
-    if not isinstance(taxable_income, (int, float)) or taxable_income < 0:
-        raise ValueError("Taxable income must be a non-negative number")
-    config = get_tax_slabs(fy_ay)
-    slabs = config["slabs"]
-    tax = 0
+def _build_tax_breakdown(rules, taxable_income):
     tax_breakdown = []
-    for i, (lower, upper, rate) in enumerate(slabs):
+    for lower, upper, rate in rules.slabs:
         if taxable_income <= lower:
             break
         taxable_in_slab = min(taxable_income, upper) - lower
         slab_tax = taxable_in_slab * rate
-        tax += slab_tax
         if slab_tax > 0:
-            tax_breakdown.append({
+            tax_breakdown.append(MappingProxyType({
                 "slab": f"Rs. {format_indian_number(lower)} - Rs. {format_indian_number(upper)}" if upper != float('inf') else f"Rs. {format_indian_number(lower)}+",
                 "rate": f"{rate*100:.0f}%",
                 "taxable_amount": taxable_in_slab,
                 "tax": slab_tax
-            })
-    return tax, tax_breakdown
+            }))
+    return tax_breakdown
+
+class TaxBreakdown(Sequence):
+    """
+    Read-only per-slab tax breakdown that is only built, with its formatted
+    slab labels, the first time someone reads it
+    """
+    __slots__ = ("_rules", "_taxable_income", "_rows")
+
+    def __init__(self, rules, taxable_income):
+        self._rules = rules
+        self._taxable_income = taxable_income
+        self._rows = None
+
+    def _materialize(self):
+        if self._rows is None:
+            self._rows = _build_tax_breakdown(self._rules, self._taxable_income)
+        return self._rows
+
+    def __getitem__(self, index):
+        return self._materialize()[index]
+
+    def __len__(self):
+        return len(self._materialize())
+
+    def __bool__(self):
+        # A slab shows up only if it taxes something, so answer without building rows
+        return any(rate > 0 and self._taxable_income > lower
+                   for lower, _, rate in self._rules.slabs)
+
+    def same_source(self, other):
+        """
+        True when other was built from the same rules and income, which
+        means equal rows; answered without building either
+        """
+        return (isinstance(other, TaxBreakdown) and self._rules is other._rules
+                and self._taxable_income == other._taxable_income)
+
+    def __eq__(self, other):
+        if self.same_source(other):
+            return True
+        if isinstance(other, (list, TaxBreakdown)):
+            return self._materialize() == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"TaxBreakdown({self._materialize()!r})"
+
+TAX_RESULT_KEYS = (
+    "taxable_income", "gross_tax", "rebate_87a", "tax_after_rebate", "surcharge",
+    "cess", "stcg_tax", "ltcg_tax", "total_tax", "advance_tax_required", "tax_breakdown"
+)
+
+class TaxResult(Mapping):
+    """
+    Compact, read-only result of compute_total_tax_liability.
+
+    The slab and surcharge lookups run once, with the engine's own
+    functions on the result's rule set, when the result is built. Their outcome is packed into one
+    bytes object next to the shared rule set: taxable income, gross tax,
+    surcharge and the two capital gains taxes. The other fields are a few
+    additions and multiplications on those, in the engine's order, and the
+    per-slab breakdown is built when read, so every value is identical to
+    an eagerly computed result. Reads like the result dict it replaces:
+    result["total_tax"], .get(), dict(result).
+    """
+    __slots__ = ("_rules", "_packed")
+    _FIELDS = struct.Struct("<5d")
+    # Position of the fields read straight from _packed
+    _STORED = {"taxable_income": 0, "stcg_tax": 3, "ltcg_tax": 4}
+
+    def __init__(self, rules, taxable_income, stcg_tax=0.0, ltcg_tax=0.0):
+        self._rules = rules
+        gross_tax = _slab_tax(rules, taxable_income)
+        rebate_87a = _rebate_87a(rules, gross_tax, taxable_income)
+        surcharge, _ = _surcharge_and_cess(rules, gross_tax - rebate_87a, taxable_income)
+        self._packed = self._FIELDS.pack(taxable_income, gross_tax, surcharge, stcg_tax, ltcg_tax)
+
+    @property
+    def rules(self):
+        return self._rules
+
+    def _numbers(self):
+        taxable_income, gross_tax, surcharge, stcg_tax, ltcg_tax = self._FIELDS.unpack(self._packed)
+        rules = self._rules
+        # Same operations as _rebate_87a and _surcharge_and_cess
+        rebate_87a = min(gross_tax, rules.rebate_max) if taxable_income <= rules.rebate_limit else 0
+        tax_after_rebate = gross_tax - rebate_87a
+        cess = (tax_after_rebate + surcharge) * rules.cess_rate
+        total_tax = tax_after_rebate + surcharge + cess + stcg_tax + ltcg_tax
+        return (taxable_income, gross_tax, rebate_87a, tax_after_rebate, surcharge, cess,
+                stcg_tax, ltcg_tax, total_tax, total_tax > rules.advance_tax_threshold)
+
+    def _values(self):
+        numbers = self._numbers()
+        return numbers + (TaxBreakdown(self._rules, numbers[0]),)
+
+    def __getitem__(self, key):
+        if key not in TAX_RESULT_KEYS:
+            raise KeyError(key)
+        if key in self._STORED:
+            return self._FIELDS.unpack(self._packed)[self._STORED[key]]
+        if key == "tax_breakdown":
+            return TaxBreakdown(self._rules, self._FIELDS.unpack(self._packed)[0])
+        return self._numbers()[TAX_RESULT_KEYS.index(key)]
+
+    def __iter__(self):
+        return iter(TAX_RESULT_KEYS)
+
+    def __len__(self):
+        return len(TAX_RESULT_KEYS)
+
+    def items(self):
+        # One derivation for every field rather than one per key
+        return list(zip(TAX_RESULT_KEYS, self._values()))
+
+    def values(self):
+        return list(self._values())
+
+    def __reduce__(self):
+        taxable_income, _, _, stcg_tax, ltcg_tax = self._FIELDS.unpack(self._packed)
+        return TaxResult, (self._rules, taxable_income, stcg_tax, ltcg_tax)
+
+    def __repr__(self):
+        return f"TaxResult({dict(self.items())!r})"
+
+def _check_taxable_income(taxable_income):
+    if not isinstance(taxable_income, (int, float)) or taxable_income < 0:
+        raise ValueError("Taxable income must be a non-negative number")
+
+def _slab_tax(rules, taxable_income):
+    i = bisect_left(rules.slab_uppers, taxable_income)
+    return rules.cumulative_tax[i] + (taxable_income - rules.slab_lowers[i]) * rules.slab_rates[i]
+
+def calculate_slab_tax(taxable_income, fy_ay, regime="new"):
+    """
+    Slab tax only: one bisect over the slab bounds plus one multiply-add
+    """
+    return _slab_tax(get_rule_set(fy_ay, regime), taxable_income)
 
-def calculate_rebate_87a(gross_tax, taxable_income, fy_ay):
-    config = get_tax_slabs(fy_ay)
-    if taxable_income <= config["rebate_limit"]:
-        return min(gross_tax, config["rebate_max"])
+def calculate_income_tax(taxable_income, fy_ay, age_group="Below 60", regime="new"):
+    _check_taxable_income(taxable_income)
+    tax = calculate_slab_tax(taxable_income, fy_ay, regime)
+    return tax, TaxBreakdown(get_rule_set(fy_ay, regime), taxable_income)
+
+def _rebate_87a(rules, gross_tax, taxable_income):
+    if taxable_income <= rules.rebate_limit:
+        return min(gross_tax, rules.rebate_max)
     return 0
 
-def calculate_cess_and_surcharge(tax_after_rebate, taxable_income):
+def calculate_rebate_87a(gross_tax, taxable_income, fy_ay, regime="new"):
+    return _rebate_87a(get_rule_set(fy_ay, regime), gross_tax, taxable_income)
+
+def _surcharge_and_cess(rules, tax_after_rebate, taxable_income):
     surcharge = 0
-    if taxable_income > 5000000:
-        if taxable_income <= 10000000:
-            surcharge = tax_after_rebate * 0.10
-        elif taxable_income <= 20000000:
-            surcharge = tax_after_rebate * 0.15
-        elif taxable_income <= 50000000:
-            surcharge = tax_after_rebate * 0.25
-        else:
-            surcharge = tax_after_rebate * 0.37
-    cess = (tax_after_rebate + surcharge) * 0.04
+    rate = rules.surcharge_rates[bisect_left(rules.surcharge_thresholds, taxable_income)]
+    if rate:
+        surcharge = tax_after_rebate * rate
+    cess = (tax_after_rebate + surcharge) * rules.cess_rate
     return surcharge, cess
 
-def calculate_capital_gains_tax(stcg, ltcg):
+def calculate_cess_and_surcharge(tax_after_rebate, taxable_income, fy_ay=DEFAULT_FY_AY, regime="new"):
+    return _surcharge_and_cess(get_rule_set(fy_ay, regime), tax_after_rebate, taxable_income)
+
+def calculate_capital_gains_tax(stcg, ltcg, fy_ay=DEFAULT_FY_AY):
     """
     Calculate capital gains tax separately
-    Updated for 2025-26: New capital gains tax rates
+    Rates and the LTCG exemption come from the year's rule file
     """
-    # STCG: 20% (equity and other assets) - Updated for 2025-26
-    # LTCG: 12.5% on gains > ₹1.25L (equity), 20% with indexation (other assets)
-    
-    stcg_tax = stcg * 0.20  # Updated rate for 2025-26
-    ltcg_tax = max(0, (ltcg - 125000)) * 0.125  # Updated exemption limit and rate for 2025-26
+    # 2025-26: STCG 20%, LTCG 12.5% on gains > ₹1.25L (equity)
+    rules = get_rule_set(fy_ay)
+    stcg_tax = stcg * rules.stcg_rate
+    ltcg_tax = max(0, (ltcg - rules.ltcg_exemption)) * rules.ltcg_rate
     
     return stcg_tax, ltcg_tax
 
+INCOME_HEADS = ["salary", "house_property", "business", "other_sources"]
+
+# Heads that count towards taxable income for each employment type; "Mixed" sums all four
+EMPLOYMENT_TYPE_HEADS = {
+    "Salaried": ["salary"],
+    "Rental": ["house_property"],
+    "Freelancer": ["business"],
+    "Business": ["business"],
+    "Investor": ["other_sources"],
+    "Mixed": INCOME_HEADS
+}
+
+def calculate_income_heads(income_details, standard_deduction, hra_exemption=0):
+    """
+    Income under each head, before Chapter VI-A deductions. A loss under
+    house property or business is not set off against other heads; a
+    business loss may never reduce salary (section 71(2A)).
+    """
+    gross_salary = income_details.get('basic_salary', 0) + \
+                   income_details.get('hra', 0) + \
+                   income_details.get('bonus', 0)
+    rental_income = income_details.get('rent_received', 0) - \
+                    income_details.get('municipal_tax', 0) - \
+                    income_details.get('interest_paid', 0)
+    other_income = income_details.get('dividends', 0) + \
+                   income_details.get('interest_income', 0)
+    return {
+        "salary": max(0, gross_salary - hra_exemption - standard_deduction),
+        "house_property": max(0, rental_income),
+        "business": max(0, income_details.get('net_profit', 0)),
+        "other_sources": other_income
+    }
+
+def compute_income_heads(income_details, fy_ay, employment_type):
+    """
+    Head-wise income that counts towards taxable income for the employment
+    type; heads it does not use are zero. The heads sum to taxable income.
+    """
+    heads = EMPLOYMENT_TYPE_HEADS.get(employment_type, [])
+    income_heads = calculate_income_heads(income_details, get_rule_set(fy_ay).standard_deduction)
+    return {head: income_heads[head] if head in heads else 0 for head in INCOME_HEADS}
+
+def _head_income(income_details, employment_type, standard_deduction, hra_exemption=0):
+    """
+    Income under the employment type's heads, before Chapter VI-A deductions
+    """
+    heads = EMPLOYMENT_TYPE_HEADS.get(employment_type)
+    if heads is None:
+        return 0
+    income_heads = calculate_income_heads(income_details, standard_deduction, hra_exemption)
+    taxable_income = income_heads[heads[0]]
+    for head in heads[1:]:
+        taxable_income += income_heads[head]
+    return taxable_income
+
 def compute_total_tax_liability(income_details, fy_ay, employment_type):
-    taxable_income = 0
-    if employment_type == "Salaried":
-        gross_salary = income_details.get('basic_salary', 0) + \
-                       income_details.get('hra', 0) + \
-                       income_details.get('bonus', 0)
-        config = get_tax_slabs(fy_ay)
-        taxable_income = max(0, gross_salary - config["standard_deduction"])
-    elif employment_type == "Rental":
-        rental_income = income_details.get('rent_received', 0) - \
-                        income_details.get('municipal_tax', 0) - \
-                        income_details.get('interest_paid', 0)
-        taxable_income = max(0, rental_income)
-    elif employment_type in ["Freelancer", "Business"]:
-        taxable_income = income_details.get('net_profit', 0)
-    elif employment_type == "Investor":
-        other_income = income_details.get('dividends', 0) + \
-                       income_details.get('interest_income', 0)
-        taxable_income = other_income
-    gross_tax, tax_breakdown = calculate_income_tax(taxable_income, fy_ay)
-    rebate_87a = calculate_rebate_87a(gross_tax, taxable_income, fy_ay)
-    tax_after_rebate = gross_tax - rebate_87a
-    surcharge, cess = calculate_cess_and_surcharge(tax_after_rebate, taxable_income)
+    rules = get_rule_set(fy_ay)
+    taxable_income = _head_income(income_details, employment_type, rules.standard_deduction)
+    _check_taxable_income(taxable_income)
     stcg_tax, ltcg_tax = calculate_capital_gains_tax(
         income_details.get('stcg', 0),
-        income_details.get('ltcg', 0)
+        income_details.get('ltcg', 0),
+        fy_ay
     )
-    total_tax = tax_after_rebate + surcharge + cess + stcg_tax + ltcg_tax
-    advance_tax_required = total_tax > get_tax_slabs(fy_ay)["advance_tax_threshold"]
+    return TaxResult(rules, taxable_income, stcg_tax, ltcg_tax)
+
+def calculate_old_regime_deductions(income_details, employment_type, fy_ay):
+    """
+    Old-regime exemptions and deductions, each capped by the year's rules:
+    HRA (salaried only), 80C (including employee PF), 80D, 80CCD(1B) and
+    24(b) interest on a self-occupied home loan. 80D uses the below-60 limit.
+    """
+    rules = get_rule_set(fy_ay, "old")
+    hra_exemption = 0
+    if "salary" in EMPLOYMENT_TYPE_HEADS.get(employment_type, []):
+        basic_salary = income_details.get('basic_salary', 0)
+        share = rules.hra_metro_share if income_details.get('metro_city') else rules.hra_non_metro_share
+        hra_exemption = max(0, min(
+            income_details.get('hra', 0),
+            income_details.get('rent_paid', 0) - basic_salary * 0.1,
+            basic_salary * share
+        ))
+    deductions = {
+        "hra_exemption": hra_exemption,
+        "section_80c": min(rules.section_80c_limit,
+                           income_details.get('pf', 0) + income_details.get('section_80c', 0)),
+        "section_80d": min(rules.section_80d_limit, income_details.get('section_80d', 0)),
+        "section_80ccd_1b": min(rules.section_80ccd_1b_limit, income_details.get('nps_contribution', 0)),
+        "section_24b": min(rules.section_24b_limit, income_details.get('home_loan_interest', 0))
+    }
+    deductions["total"] = sum(deductions.values())
+    return deductions
+
+def compare_tax_regimes(income_details, fy_ay, employment_type):
+    """
+    Tax under the new and old regimes from one income_details.
+    Capital gains tax is shared between both regimes, and the old regime
+    reuses its head income. Returns both results, the old-regime deductions
+    used, the cheaper regime and how much it saves.
+    """
+    new_rules = get_rule_set(fy_ay, "new")
+    old_rules = get_rule_set(fy_ay, "old")
+    stcg_tax, ltcg_tax = calculate_capital_gains_tax(
+        income_details.get('stcg', 0),
+        income_details.get('ltcg', 0),
+        fy_ay
+    )
+
+    new_taxable_income = _head_income(income_details, employment_type, new_rules.standard_deduction)
+    _check_taxable_income(new_taxable_income)
+    new_result = TaxResult(new_rules, new_taxable_income, stcg_tax, ltcg_tax)
+
+    deductions = calculate_old_regime_deductions(income_details, employment_type, fy_ay)
+    old_head_income = _head_income(
+        income_details, employment_type, old_rules.standard_deduction, deductions["hra_exemption"]
+    )
+    old_taxable_income = max(0, old_head_income - (deductions["total"] - deductions["hra_exemption"]))
+    old_result = TaxResult(old_rules, old_taxable_income, stcg_tax, ltcg_tax)
+
+    recommended = "old" if old_result["total_tax"] < new_result["total_tax"] else "new"
     return {
+        "new": new_result,
+        "old": old_result,
+        "old_regime_deductions": deductions,
+        "recommended_regime": recommended,
+        "savings": abs(old_result["total_tax"] - new_result["total_tax"])
+    }
+
+BATCH_INCOME_FIELDS = [
+    "basic_salary", "hra", "bonus",
+    "rent_received", "municipal_tax", "interest_paid",
+    "net_profit", "dividends", "interest_income",
+    "stcg", "ltcg"
+]
+
+def _batch_column(data, name, n_rows):
+    if name in data:
+        return np.asarray(data[name], dtype=np.float64)
+    return np.zeros(n_rows, dtype=np.float64)
+
+def _batch_row_count(data, employment_type):
+    if isinstance(data, pd.DataFrame):
+        return len(data)
+    for name in BATCH_INCOME_FIELDS + ["employment_type"]:
+        if name in data:
+            return len(data[name])
+    if employment_type is not None and not isinstance(employment_type, str):
+        return len(employment_type)
+    return 0
+
+def _batch_employment_types(data, employment_type, n_rows):
+    if employment_type is None:
+        if "employment_type" not in data:
+            raise ValueError("employment_type must be given or present as a column")
+        employment_type = data["employment_type"]
+    if isinstance(employment_type, str):
+        return np.full(n_rows, employment_type)
+    if isinstance(employment_type, pd.Series):
+        # pandas string columns compare much faster than their object arrays
+        return employment_type
+    return np.asarray(employment_type)
+
+def _batch_income_heads(col, standard_deduction, hra_exemption=0):
+    """
+    Vectorized calculate_income_heads: one column per head for every row
+    """
+    gross_salary = col["basic_salary"] + col["hra"] + col["bonus"]
+    return {
+        "salary": np.maximum(0, gross_salary - hra_exemption - standard_deduction),
+        "house_property": np.maximum(0, col["rent_received"] - col["municipal_tax"] - col["interest_paid"]),
+        "business": np.maximum(0, col["net_profit"]),
+        "other_sources": col["dividends"] + col["interest_income"]
+    }
+
+def _batch_head_masks(etype):
+    masks = {head: np.zeros(len(etype), dtype=bool) for head in INCOME_HEADS}
+    for employment_type, heads in EMPLOYMENT_TYPE_HEADS.items():
+        rows = np.asarray(etype == employment_type)
+        for head in heads:
+            masks[head] |= rows
+    return masks
+
+def _batch_head_income(col, etype, standard_deduction, hra_exemption=0):
+    """
+    Vectorized _head_income: the heads are computed as whole columns and
+    summed under each row's mask, in the scalar order
+    """
+    income_heads = _batch_income_heads(col, standard_deduction, hra_exemption)
+    masks = _batch_head_masks(etype)
+    taxable_income = np.zeros(len(col["basic_salary"]), dtype=np.float64)
+    counted = np.zeros(len(taxable_income), dtype=bool)
+    for head in INCOME_HEADS:
+        # The first head counted is copied rather than added, so -0.0 and the
+        # order of additions match the scalar path
+        taxable_income = np.where(
+            masks[head],
+            np.where(counted, taxable_income + income_heads[head], income_heads[head]),
+            taxable_income
+        )
+        counted |= masks[head]
+    if (taxable_income < 0).any():
+        raise ValueError("Taxable income must be a non-negative number")
+    return taxable_income
+
+def _batch_slab_income_tax(rules, taxable_income):
+    # Same prefix-sum lookup as calculate_slab_tax so every row matches the
+    # scalar path exactly
+    slab_index = np.searchsorted(rules.slab_uppers, taxable_income, side="left")
+    gross_tax = (
+        np.asarray(rules.cumulative_tax, dtype=np.float64)[slab_index]
+        + (taxable_income - np.asarray(rules.slab_lowers, dtype=np.float64)[slab_index])
+        * np.asarray(rules.slab_rates)[slab_index]
+    )
+
+    rebate_87a = np.where(
+        taxable_income <= rules.rebate_limit,
+        np.minimum(gross_tax, rules.rebate_max),
+        0.0
+    )
+    tax_after_rebate = gross_tax - rebate_87a
+
+    surcharge_rate = np.asarray(rules.surcharge_rates)[
+        np.searchsorted(rules.surcharge_thresholds, taxable_income, side="left")
+    ]
+    surcharge = np.where(surcharge_rate > 0, tax_after_rebate * surcharge_rate, 0.0)
+    cess = (tax_after_rebate + surcharge) * rules.cess_rate
+    return gross_tax, rebate_87a, tax_after_rebate, surcharge, cess
+
+def _batch_capital_gains_tax(rules, col):
+    stcg_tax = col["stcg"] * rules.stcg_rate
+    ltcg_tax = np.maximum(0, col["ltcg"] - rules.ltcg_exemption) * rules.ltcg_rate
+    return stcg_tax, ltcg_tax
+
+def compute_income_heads_batch(data, fy_ay, employment_type=None):
+    """
+    Vectorized compute_income_heads: one column per income head, zero where
+    the row's employment type does not use that head
+    """
+    n_rows = _batch_row_count(data, employment_type)
+    etype = _batch_employment_types(data, employment_type, n_rows)
+    col = {name: _batch_column(data, name, n_rows) for name in BATCH_INCOME_FIELDS}
+    income_heads = _batch_income_heads(col, get_rule_set(fy_ay).standard_deduction)
+    masks = _batch_head_masks(etype)
+    result = {head: np.where(masks[head], income_heads[head], 0.0) for head in INCOME_HEADS}
+    if isinstance(data, pd.DataFrame):
+        return pd.DataFrame(result, index=data.index)
+    return result
+
+def compute_total_tax_liability_batch(data, fy_ay, employment_type=None):
+    """
+    Vectorized compute_total_tax_liability over many taxpayers at once.
+
+    data is a DataFrame or a dict of NumPy columns named like income_details.
+    employment_type is a single type for every row or a per-row array; when
+    omitted it is read from an "employment_type" column. Returns a dict of
+    columns (a DataFrame when data is a DataFrame) with the same keys as the
+    scalar result, except the per-slab tax_breakdown.
+    """
+    n_rows = _batch_row_count(data, employment_type)
+    etype = _batch_employment_types(data, employment_type, n_rows)
+    col = {name: _batch_column(data, name, n_rows) for name in BATCH_INCOME_FIELDS}
+    rules = get_rule_set(fy_ay)
+
+    taxable_income = _batch_head_income(col, etype, rules.standard_deduction)
+    gross_tax, rebate_87a, tax_after_rebate, surcharge, cess = _batch_slab_income_tax(rules, taxable_income)
+    stcg_tax, ltcg_tax = _batch_capital_gains_tax(rules, col)
+
+    total_tax = tax_after_rebate + surcharge + cess + stcg_tax + ltcg_tax
+    result = {
         "taxable_income": taxable_income,
         "gross_tax": gross_tax,
         "rebate_87a": rebate_87a,
@@ -114,6 +485,289 @@ def compute_total_tax_liability(income_details, fy_ay, employment_type):
         "stcg_tax": stcg_tax,
         "ltcg_tax": ltcg_tax,
         "total_tax": total_tax,
-        "advance_tax_required": advance_tax_required,
-        "tax_breakdown": tax_breakdown
-    }
\ No newline at end of file
+        "advance_tax_required": total_tax > rules.advance_tax_threshold
+    }
+    if isinstance(data, pd.DataFrame):
+        return pd.DataFrame(result, index=data.index)
+    return result
+
+OLD_REGIME_FIELDS = [
+    "rent_paid", "pf", "section_80c", "section_80d",
+    "nps_contribution", "home_loan_interest"
+]
+
+def compare_tax_regimes_batch(data, fy_ay, employment_type=None):
+    """
+    Vectorized compare_tax_regimes: tags every row with its cheaper regime.
+
+    Takes the same data as compute_total_tax_liability_batch plus the
+    OLD_REGIME_FIELDS columns and an optional boolean metro_city column.
+    Returns per-row taxable income and total tax under both regimes, the
+    old-regime deductions, savings and recommended_regime ("new" on ties).
+    """
+    n_rows = _batch_row_count(data, employment_type)
+    etype = _batch_employment_types(data, employment_type, n_rows)
+    col = {name: _batch_column(data, name, n_rows)
+           for name in BATCH_INCOME_FIELDS + OLD_REGIME_FIELDS}
+    new_rules = get_rule_set(fy_ay, "new")
+    old_rules = get_rule_set(fy_ay, "old")
+
+    # Capital gains tax is the same under both regimes
+    stcg_tax, ltcg_tax = _batch_capital_gains_tax(new_rules, col)
+    capital_gains_tax = stcg_tax + ltcg_tax
+
+    new_taxable_income = _batch_head_income(col, etype, new_rules.standard_deduction)
+    _, _, tax_after_rebate, surcharge, cess = _batch_slab_income_tax(new_rules, new_taxable_income)
+    new_total_tax = tax_after_rebate + surcharge + cess + stcg_tax + ltcg_tax
+
+    if "metro_city" in data:
+        metro = np.asarray(data["metro_city"], dtype=bool)
+    else:
+        metro = np.zeros(n_rows, dtype=bool)
+    basic_salary = col["basic_salary"]
+    share = np.where(metro, old_rules.hra_metro_share, old_rules.hra_non_metro_share)
+    hra_exemption = np.where(
+        _batch_head_masks(etype)["salary"],
+        np.maximum(0, np.minimum(np.minimum(col["hra"], col["rent_paid"] - basic_salary * 0.1),
+                                 basic_salary * share)),
+        0.0
+    )
+    section_80c = np.minimum(old_rules.section_80c_limit, col["pf"] + col["section_80c"])
+    section_80d = np.minimum(old_rules.section_80d_limit, col["section_80d"])
+    section_80ccd_1b = np.minimum(old_rules.section_80ccd_1b_limit, col["nps_contribution"])
+    section_24b = np.minimum(old_rules.section_24b_limit, col["home_loan_interest"])
+    total_deductions = hra_exemption + section_80c + section_80d + section_80ccd_1b + section_24b
+
+    old_head_income = _batch_head_income(col, etype, old_rules.standard_deduction, hra_exemption)
+    old_taxable_income = np.maximum(0, old_head_income - (total_deductions - hra_exemption))
+    _, _, tax_after_rebate, surcharge, cess = _batch_slab_income_tax(old_rules, old_taxable_income)
+    old_total_tax = tax_after_rebate + surcharge + cess + stcg_tax + ltcg_tax
+
+    result = {
+        "new_taxable_income": new_taxable_income,
+        "new_total_tax": new_total_tax,
+        "old_taxable_income": old_taxable_income,
+        "old_total_tax": old_total_tax,
+        "old_regime_deductions": total_deductions,
+        "capital_gains_tax": capital_gains_tax,
+        "savings": np.abs(old_total_tax - new_total_tax),
+        "recommended_regime": np.where(old_total_tax < new_total_tax, "old", "new")
+    }
+    if isinstance(data, pd.DataFrame):
+        return pd.DataFrame(result, index=data.index)
+    return result
+
+def _liability_pieces(rules):
+    """
+    Split the tax on slab income (after the 87A rebate, surcharge and cess)
+    into linear pieces over (start, end]. Returns NumPy arrays of start, end,
+    the tax just after start, and the slope on each piece. Tax only ever
+    jumps upwards between pieces, at the rebate limit and surcharge thresholds.
+    """
+    breakpoints = {0.0, float(rules.rebate_limit)}
+    breakpoints.update(float(upper) for upper in rules.slab_uppers if upper != float('inf'))
+    breakpoints.update(float(threshold) for threshold in rules.surcharge_thresholds)
+    # Below the rebate limit the rebate stops covering all tax where slab tax
+    # reaches rebate_max, in whichever slab the running tax crosses it
+    for lower, upper, cumulative, rate in zip(rules.slab_lowers, rules.slab_uppers,
+                                              rules.cumulative_tax, rules.slab_rates):
+        if rate > 0 and cumulative < rules.rebate_max:
+            kink = lower + (rules.rebate_max - cumulative) / rate
+            if kink <= upper:
+                if kink < rules.rebate_limit:
+                    breakpoints.add(kink)
+                break
+    starts = np.array(sorted(breakpoints))
+    ends = np.append(starts[1:], np.inf)
+
+    tax_at_start = np.empty(len(starts))
+    slopes = np.empty(len(starts))
+    for k, (start, end) in enumerate(zip(starts, ends)):
+        probe = end if end != np.inf else start + 1
+        i = bisect_left(rules.slab_uppers, probe)
+        gross_at_start = rules.cumulative_tax[i] + (start - rules.slab_lowers[i]) * rules.slab_rates[i]
+        after_rebate, slope = gross_at_start, rules.slab_rates[i]
+        if probe <= rules.rebate_limit:
+            # Slab tax at probe, from these rules rather than the registry's
+            if rules.cumulative_tax[i] + (probe - rules.slab_lowers[i]) * rules.slab_rates[i] <= rules.rebate_max:
+                after_rebate, slope = 0.0, 0.0
+            else:
+                after_rebate -= rules.rebate_max
+        surcharge_rate = rules.surcharge_rates[bisect_left(rules.surcharge_thresholds, probe)]
+        factor = (1 + surcharge_rate) * (1 + rules.cess_rate)
+        tax_at_start[k] = after_rebate * factor
+        slopes[k] = slope * factor
+    return starts, ends, tax_at_start, slopes
+
+def _scalar_or_array(values, like):
+    return float(values) if np.ndim(like) == 0 else values
+
+class TaxFunction:
+    """
+    Tax on slab income (after the 87A rebate, surcharge and cess, excluding
+    capital gains) as an explicit piecewise-linear function of taxable income.
+
+    Calling it evaluates a whole NumPy array of incomes with the batch
+    engine's arithmetic, so values match compute_total_tax_liability
+    exactly. The linear pieces give exact breakpoints, marginal rates and
+    the size of every upward jump (rebate cliff, surcharge thresholds).
+    """
+
+    def __init__(self, fy_ay=DEFAULT_FY_AY, regime="new"):
+        self.rules = get_rule_set(fy_ay, regime)
+        self.starts, self.ends, self.tax_at_start, self.slopes = _liability_pieces(self.rules)
+
+    @staticmethod
+    def _incomes(taxable_income):
+        incomes = np.asarray(taxable_income, dtype=np.float64)
+        if (incomes < 0).any():
+            raise ValueError("Taxable income must be a non-negative number")
+        return incomes
+
+    @property
+    def breakpoints(self):
+        """Incomes where the slope or level of the tax changes"""
+        return self.starts[1:]
+
+    def __call__(self, taxable_income):
+        incomes = self._incomes(taxable_income)
+        _, _, tax_after_rebate, surcharge, cess = _batch_slab_income_tax(self.rules, np.atleast_1d(incomes))
+        tax = tax_after_rebate + surcharge + cess
+        return _scalar_or_array(tax[0] if incomes.ndim == 0 else tax, taxable_income)
+
+    def marginal_rate(self, taxable_income):
+        """
+        Tax on the next rupee of income, as a fraction. Jumps are not
+        included; see jumps().
+        """
+        incomes = self._incomes(taxable_income)
+        k = np.searchsorted(self.starts, incomes, side="right") - 1
+        return _scalar_or_array(self.slopes[k], taxable_income)
+
+    def effective_rate(self, taxable_income):
+        """Tax as a fraction of taxable income; zero at zero income"""
+        incomes = self._incomes(taxable_income)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rate = np.where(incomes > 0, self(incomes) / incomes, 0.0)
+        return _scalar_or_array(rate, taxable_income)
+
+    def jumps(self):
+        """
+        (income, jump) pairs where tax steps up just past income, such as
+        the 87A rebate cliff and each surcharge threshold
+        """
+        left = self.tax_at_start[:-1] + self.slopes[:-1] * (self.ends[:-1] - self.starts[:-1])
+        steps = self.tax_at_start[1:] - left
+        found = steps > 1e-6 * np.maximum(1, self.tax_at_start[1:])
+        return list(zip(self.breakpoints[found].tolist(), steps[found].tolist()))
+
+    def curve(self, max_income, points=1000):
+        """
+        DataFrame of income, tax, marginal_rate and effective_rate sampled
+        evenly up to max_income, with every breakpoint (and the rupee after
+        each jump) added so the curve's corners are exact
+        """
+        if max_income <= 0 or points < 2:
+            raise ValueError("Curve needs a positive max income and at least two points")
+        incomes = np.linspace(0, max_income, points)
+        corners = self.breakpoints[self.breakpoints < max_income]
+        jump_points = np.array([income for income, _ in self.jumps() if income < max_income])
+        incomes = np.union1d(incomes, np.concatenate([corners, np.nextafter(jump_points, np.inf)]))
+        return pd.DataFrame({
+            "income": incomes,
+            "tax": self(incomes),
+            "marginal_rate": self.marginal_rate(incomes),
+            "effective_rate": self.effective_rate(incomes)
+        })
+
+_TAX_FUNCTIONS = {}
+
+def get_tax_function(fy_ay=DEFAULT_FY_AY, regime="new"):
+    """
+    Shared TaxFunction for fy_ay and regime; rule sets never change, so each
+    one is built only once per process
+    """
+    rules = get_rule_set(fy_ay, regime)
+    key = (rules.fy_ay, rules.regime)
+    if key not in _TAX_FUNCTIONS:
+        _TAX_FUNCTIONS[key] = TaxFunction(rules.fy_ay, rules.regime)
+    return _TAX_FUNCTIONS[key]
+
+def solve_taxable_income_for_tax(target_tax, fy_ay):
+    """
+    Largest taxable income whose tax (after rebate, surcharge and cess,
+    excluding capital gains) does not exceed target_tax.
+    Accepts a single target or an array of targets.
+    """
+    targets = np.asarray(target_tax, dtype=np.float64)
+    if (targets < 0).any():
+        raise ValueError("Target tax must be a non-negative number")
+    starts, ends, tax_at_start, slopes = _liability_pieces(get_rule_set(fy_ay))
+    # Tax never decreases, so the last piece starting at or below the target holds the answer
+    k = np.searchsorted(tax_at_start, targets, side="right") - 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        within_piece = np.where(
+            slopes[k] > 0,
+            starts[k] + (targets - tax_at_start[k]) / slopes[k],
+            np.inf
+        )
+    return _scalar_or_array(np.minimum(within_piece, ends[k]), target_tax)
+
+def solve_max_salary_for_tax(target_tax, fy_ay):
+    """
+    Largest gross salary (basic + HRA + bonus) whose income tax stays within target_tax
+    """
+    taxable_income = solve_taxable_income_for_tax(target_tax, fy_ay)
+    return taxable_income + get_rule_set(fy_ay).standard_deduction
+
+def solve_max_bonus_for_tax(income_details, target_tax, fy_ay):
+    """
+    Largest extra bonus a salaried employee can receive while total tax,
+    capital gains included, stays within target_tax. Returns 0 when the
+    current income already exceeds the target.
+    """
+    stcg_tax, ltcg_tax = calculate_capital_gains_tax(
+        income_details.get('stcg', 0),
+        income_details.get('ltcg', 0),
+        fy_ay
+    )
+    gross_salary = income_details.get('basic_salary', 0) + \
+                   income_details.get('hra', 0) + \
+                   income_details.get('bonus', 0)
+    available = np.asarray(target_tax, dtype=np.float64) - stcg_tax - ltcg_tax
+    max_salary = solve_max_salary_for_tax(np.maximum(available, 0), fy_ay)
+    bonus = np.where(available >= 0, np.maximum(max_salary - gross_salary, 0), 0.0)
+    return _scalar_or_array(bonus, target_tax)
+
+def solve_gross_salary_for_take_home(target_take_home, fy_ay):
+    """
+    Smallest gross salary (basic + HRA + bonus) whose take-home pay after
+    income tax reaches target_take_home. Take-home drops just past the rebate
+    limit and surcharge thresholds, so the first piece that reaches the
+    target is used. Accepts a single target or an array of targets.
+    """
+    targets = np.asarray(target_take_home, dtype=np.float64)
+    if (targets < 0).any():
+        raise ValueError("Target take-home must be a non-negative number")
+    rules = get_rule_set(fy_ay)
+    standard_deduction = rules.standard_deduction
+    starts, ends, tax_at_start, slopes = _liability_pieces(rules)
+    net_at_start = starts + standard_deduction - tax_at_start
+    net_at_end = np.empty(len(starts))
+    net_at_end[:-1] = ends[:-1] + standard_deduction - (tax_at_start[:-1] + slopes[:-1] * (ends[:-1] - starts[:-1]))
+    net_at_end[-1] = np.inf
+    k = np.searchsorted(np.maximum.accumulate(net_at_end), targets, side="left")
+    taxable_income = starts[k] + np.maximum(targets - net_at_start[k], 0) / (1 - slopes[k])
+    # Up to the standard deduction there is no tax, so take-home equals salary
+    gross_salary = np.where(targets <= standard_deduction, targets, taxable_income + standard_deduction)
+    return _scalar_or_array(gross_salary, target_take_home)
+
+METRICS_ENV_VAR = "TAXBOT_METRICS"
+
+def metrics_requested():
+    """Whether TAXBOT_METRICS asks for stage instrumentation (1/true/yes/on)"""
+    return os.environ.get(METRICS_ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on")
+
+if metrics_requested():
+    # Instrument the stages before anyone imports them by name
+    import tax_metrics  # noqa: E402
@@ -0,0 +1,178 @@
+"""
+Stage instrumentation for TaxBot 2025
+Per-stage wall time, call counts and input-size histograms for tax_engine
+
+Instrumentation works by swapping tax_engine's stage functions for timed
+wrappers, so while it is off the engine runs its original functions with
+no extra cost at all. Set TAXBOT_METRICS=1 to switch it on as tax_engine
+is imported, which also covers modules that later import stage functions
+by name; enable() at runtime instruments calls made through tax_engine.
+"""
+
+import functools
+import json
+import threading
+import time
+
+import tax_engine
+
+ENV_VAR = tax_engine.METRICS_ENV_VAR
+
+AMOUNT_BUCKETS = (300000, 700000, 1200000, 2400000, 5000000, 10000000, 50000000, float('inf'))
+ROW_BUCKETS = (1, 10, 100, 1000, 10000, 100000, 1000000, float('inf'))
+
+def _gross_income(args, kwargs):
+    income_details = args[0] if args else kwargs["income_details"]
+    return sum(value for value in income_details.values()
+               if isinstance(value, (int, float)) and not isinstance(value, bool))
+
+def _argument(position, name):
+    def size(args, kwargs):
+        return args[position] if len(args) > position else kwargs[name]
+    return size
+
+def _batch_rows(args, kwargs):
+    data = args[0] if args else kwargs["data"]
+    employment_type = args[2] if len(args) > 2 else kwargs.get("employment_type")
+    return tax_engine._batch_row_count(data, employment_type)
+
+# stage name: (tax_engine function, input size of one call, histogram buckets)
+STAGES = {
+    "total": ("compute_total_tax_liability", _gross_income, AMOUNT_BUCKETS),
+    "taxable_income": ("_head_income", _gross_income, AMOUNT_BUCKETS),
+    "slab_tax": ("_slab_tax", _argument(1, "taxable_income"), AMOUNT_BUCKETS),
+    "rebate_87a": ("_rebate_87a", _argument(2, "taxable_income"), AMOUNT_BUCKETS),
+    "surcharge_cess": ("_surcharge_and_cess", _argument(2, "taxable_income"), AMOUNT_BUCKETS),
+    "capital_gains": ("calculate_capital_gains_tax",
+                      lambda args, kwargs: sum(args[:2]) if len(args) >= 2 else 0, AMOUNT_BUCKETS),
+    "breakdown": ("_build_tax_breakdown", _argument(1, "taxable_income"), AMOUNT_BUCKETS),
+    "regime_comparison": ("compare_tax_regimes", _gross_income, AMOUNT_BUCKETS),
+    "batch": ("compute_total_tax_liability_batch", _batch_rows, ROW_BUCKETS)
+}
+
+class StageMetrics:
+    """
+    Running totals for one stage
+    """
+    __slots__ = ("calls", "seconds", "buckets", "bucket_counts", "size_sum")
+
+    def __init__(self, buckets):
+        self.calls = 0
+        self.seconds = 0.0
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.size_sum = 0.0
+
+    def record(self, seconds, size):
+        self.calls += 1
+        self.seconds += seconds
+        if size is not None:
+            self.size_sum += size
+            for i, upper in enumerate(self.buckets):
+                if size <= upper:
+                    self.bucket_counts[i] += 1
+                    break
+
+_LOCK = threading.Lock()
+_METRICS = {stage: StageMetrics(buckets) for stage, (_, _, buckets) in STAGES.items()}
+_ORIGINALS = {}
+
+def _timed(stage, func, size_of):
+    metrics = _METRICS[stage]
+
+    @functools.wraps(func)
+    def timed(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            try:
+                size = float(size_of(args, kwargs))
+            except (KeyError, IndexError, TypeError, ValueError):
+                size = None
+            with _LOCK:
+                metrics.record(elapsed, size)
+    return timed
+
+def is_enabled():
+    return bool(_ORIGINALS)
+
+def enable():
+    """
+    Start recording stage metrics; calling it again changes nothing
+    """
+    with _LOCK:
+        if _ORIGINALS:
+            return
+        for stage, (name, size_of, _) in STAGES.items():
+            original = getattr(tax_engine, name)
+            _ORIGINALS[name] = original
+            setattr(tax_engine, name, _timed(stage, original, size_of))
+
+def disable():
+    """
+    Put the original, uninstrumented stage functions back
+    """
+    with _LOCK:
+        for name, original in _ORIGINALS.items():
+            setattr(tax_engine, name, original)
+        _ORIGINALS.clear()
+
+def reset():
+    with _LOCK:
+        for stage, (_, _, buckets) in STAGES.items():
+            _METRICS[stage].__init__(buckets)
+
+def snapshot():
+    """
+    Copy of every stage's counters: calls, total and mean seconds, and the
+    input-size histogram (cumulative counts per upper bound)
+    """
+    with _LOCK:
+        stages = {}
+        for stage, metrics in _METRICS.items():
+            cumulative, buckets = 0, {}
+            for upper, count in zip(metrics.buckets, metrics.bucket_counts):
+                cumulative += count
+                buckets["+Inf" if upper == float('inf') else f"{upper:g}"] = cumulative
+            stages[stage] = {
+                "calls": metrics.calls,
+                "seconds": metrics.seconds,
+                "mean_seconds": metrics.seconds / metrics.calls if metrics.calls else 0.0,
+                "input_size": {"buckets": buckets, "sum": metrics.size_sum, "count": cumulative}
+            }
+    return {"enabled": is_enabled(), "stages": stages}
+
+def to_json(indent=2):
+    return json.dumps(snapshot(), indent=indent)
+
+def to_prometheus():
+    """
+    Snapshot in the Prometheus text exposition format
+    """
+    stages = snapshot()["stages"]
+    lines = [
+        "# HELP taxbot_stage_calls_total Calls to each tax engine stage.",
+        "# TYPE taxbot_stage_calls_total counter"
+    ]
+    lines += [f'taxbot_stage_calls_total{{stage="{stage}"}} {m["calls"]}' for stage, m in stages.items()]
+    lines += [
+        "# HELP taxbot_stage_seconds_total Wall time spent in each tax engine stage.",
+        "# TYPE taxbot_stage_seconds_total counter"
+    ]
+    lines += [f'taxbot_stage_seconds_total{{stage="{stage}"}} {m["seconds"]!r}' for stage, m in stages.items()]
+    lines += [
+        "# HELP taxbot_stage_input_size Input size per call: rupees, or rows for batch.",
+        "# TYPE taxbot_stage_input_size histogram"
+    ]
+    for stage, m in stages.items():
+        size = m["input_size"]
+        lines += [f'taxbot_stage_input_size_bucket{{stage="{stage}",le="{upper}"}} {count}'
+                  for upper, count in size["buckets"].items()]
+        lines.append(f'taxbot_stage_input_size_sum{{stage="{stage}"}} {size["sum"]!r}')
+        lines.append(f'taxbot_stage_input_size_count{{stage="{stage}"}} {size["count"]}')
+    return "\n".join(lines) + "\n"
+
+if tax_engine.metrics_requested():
+    enable()
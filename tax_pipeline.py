@@ -0,0 +1,151 @@
+"""
+Incremental tax pipeline for TaxBot 2025
+The stages of compute_total_tax_liability as a dependency graph of named,
+memoized nodes, so an update recomputes only what its changed inputs reach
+"""
+
+from collections import namedtuple
+
+from tax_engine import (
+    TaxBreakdown, _head_income, calculate_capital_gains_tax,
+    calculate_cess_and_surcharge, calculate_income_tax, calculate_rebate_87a
+)
+from tax_rules import get_rule_set
+
+Stage = namedtuple("Stage", ["name", "inputs", "compute"])
+
+def _same_value(old, new):
+    # Lazy breakdowns are compared by where they came from, so checking a
+    # stage for changes never builds their rows
+    if isinstance(old, TaxBreakdown) and isinstance(new, TaxBreakdown):
+        return old.same_source(new)
+    if isinstance(old, dict) and isinstance(new, dict):
+        return old.keys() == new.keys() and all(_same_value(old[key], new[key]) for key in old)
+    return old == new
+
+class TaxPipeline:
+    """
+    Dependency graph of stages, each a function of named inputs or of
+    earlier stages' outputs. update() recomputes a stage only when one of
+    its inputs changed, and stops propagating when a recomputed stage
+    produces the same value as before. The stages recomputed by the last
+    update are in .recomputed.
+    """
+
+    def __init__(self, stages, defaults=None):
+        self.stages = []
+        names = set()
+        for stage in stages:
+            if stage.name in names:
+                raise ValueError(f"Duplicate pipeline stage '{stage.name}'")
+            names.add(stage.name)
+            self.stages.append(stage)
+        # Names that are not stages are read from the inputs passed to update()
+        self.input_names = sorted({
+            name for stage in self.stages for name in stage.inputs if name not in names
+        })
+        for stage in self.stages:
+            for name in stage.inputs:
+                if name in names and self.stages.index(stage) < self._index(name):
+                    raise ValueError(f"Stage '{stage.name}' depends on later stage '{name}'")
+        self.defaults = defaults or {}
+        self.values = {}
+        self.recomputed = ()
+        self.evaluations = 0
+        self.skipped = 0
+
+    def _index(self, name):
+        return next(i for i, stage in enumerate(self.stages) if stage.name == name)
+
+    def update(self, inputs):
+        """
+        Bring every stage up to date with inputs (a dict; missing inputs use
+        the pipeline defaults, then 0) and return all stage outputs. New
+        values are kept only once every stage they reach has run, so a stage
+        that raises leaves the pipeline as it was before the update.
+        """
+        values = dict(self.values)
+        changed = set()
+        for name in self.input_names:
+            value = inputs.get(name, self.defaults.get(name, 0))
+            if name not in values or not _same_value(values[name], value):
+                values[name] = value
+                changed.add(name)
+
+        recomputed = []
+        for stage in self.stages:
+            if stage.name in values and changed.isdisjoint(stage.inputs):
+                self.skipped += 1
+                continue
+            value = stage.compute(*(values[name] for name in stage.inputs))
+            self.evaluations += 1
+            recomputed.append(stage.name)
+            if stage.name not in values or not _same_value(values[stage.name], value):
+                changed.add(stage.name)
+            values[stage.name] = value
+        self.values = values
+        self.recomputed = tuple(recomputed)
+        return {stage.name: values[stage.name] for stage in self.stages}
+
+    def stats(self):
+        return {"evaluations": self.evaluations, "skipped": self.skipped}
+
+_HEAD_INCOME_FIELDS = [
+    "basic_salary", "hra", "bonus", "rent_received", "municipal_tax",
+    "interest_paid", "net_profit", "dividends", "interest_income"
+]
+
+def _taxable_income(employment_type, rules, *fields):
+    return _head_income(dict(zip(_HEAD_INCOME_FIELDS, fields)), employment_type, rules.standard_deduction)
+
+def _tax_result(taxable_income, gross_tax, rebate_87a, tax_after_rebate, surcharge_cess,
+                capital_gains_tax, total_tax, rules, tax_breakdown):
+    surcharge, cess = surcharge_cess
+    stcg_tax, ltcg_tax = capital_gains_tax
+    return {
+        "taxable_income": taxable_income,
+        "gross_tax": gross_tax,
+        "rebate_87a": rebate_87a,
+        "tax_after_rebate": tax_after_rebate,
+        "surcharge": surcharge,
+        "cess": cess,
+        "stcg_tax": stcg_tax,
+        "ltcg_tax": ltcg_tax,
+        "total_tax": total_tax,
+        "advance_tax_required": total_tax > rules.advance_tax_threshold,
+        "tax_breakdown": tax_breakdown
+    }
+
+def build_tax_pipeline():
+    """
+    TaxPipeline for compute_total_tax_liability. Its "tax_result" stage
+    holds the same dict the engine returns.
+    """
+    return TaxPipeline([
+        Stage("rules", ["fy_ay"], get_rule_set),
+        Stage("taxable_income", ["employment_type", "rules"] + _HEAD_INCOME_FIELDS, _taxable_income),
+        Stage("gross_tax", ["taxable_income", "fy_ay"],
+              lambda taxable_income, fy_ay: calculate_income_tax(taxable_income, fy_ay)[0]),
+        Stage("tax_breakdown", ["rules", "taxable_income"], TaxBreakdown),
+        Stage("rebate_87a", ["gross_tax", "taxable_income", "fy_ay"], calculate_rebate_87a),
+        Stage("tax_after_rebate", ["gross_tax", "rebate_87a"],
+              lambda gross_tax, rebate_87a: gross_tax - rebate_87a),
+        Stage("surcharge_cess", ["tax_after_rebate", "taxable_income", "fy_ay"],
+              calculate_cess_and_surcharge),
+        Stage("capital_gains_tax", ["stcg", "ltcg", "fy_ay"], calculate_capital_gains_tax),
+        Stage("total_tax", ["tax_after_rebate", "surcharge_cess", "capital_gains_tax"],
+              lambda tax_after_rebate, surcharge_cess, capital_gains_tax:
+                  tax_after_rebate + surcharge_cess[0] + surcharge_cess[1]
+                  + capital_gains_tax[0] + capital_gains_tax[1]),
+        Stage("tax_result", ["taxable_income", "gross_tax", "rebate_87a", "tax_after_rebate",
+                             "surcharge_cess", "capital_gains_tax", "total_tax", "rules",
+                             "tax_breakdown"], _tax_result)
+    ])
+
+def update_tax_pipeline(pipeline, income_details, fy_ay, employment_type):
+    """
+    Run pipeline on income_details and return the tax result, recomputing
+    only the stages the changed fields reach
+    """
+    inputs = dict(income_details, fy_ay=fy_ay, employment_type=employment_type)
+    return pipeline.update(inputs)["tax_result"]
@@ -0,0 +1,236 @@
+"""
+Tax rule sets for TaxBot 2025
+Immutable, precompiled tax rules, one per financial year and regime.
+
+The rules themselves live in versioned JSON files under rules/, one per
+financial year and regime. They are validated and compiled once per process; the
+compiled form is also pickled next to them so a cold start can skip
+parsing until a rule file changes.
+"""
+
+import json
+import os
+import pickle
+from dataclasses import dataclass
+
+RULES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules")
+COMPILED_CACHE_PATH = os.environ.get(
+    "TAXBOT_RULES_CACHE", os.path.join(RULES_DIR, ".compiled_rules.pickle")
+)
+SCHEMA_VERSION = 1
+# Bump whenever TaxRuleSet or compile_rule_set change so old pickles are ignored
+COMPILED_FORMAT_VERSION = 3
+
+DEFAULT_FY_AY = "FY 2025-26 / AY 2026-27"
+
+_DEDUCTION_KEYS = frozenset([
+    "section_80c", "section_80d", "section_80ccd_1b", "section_24b",
+    "hra_metro_share", "hra_non_metro_share"
+])
+
+# Keys callers of the old get_tax_slabs dict still read with config["..."]
+_LEGACY_KEYS = frozenset([
+    "slabs", "standard_deduction", "rebate_limit", "rebate_max", "advance_tax_threshold"
+])
+
+@dataclass(frozen=True)
+class TaxRuleSet:
+    """
+    New or Old Tax Regime rules for one financial year.
+
+    Everything is stored as tuples so a rule set can be shared between
+    Streamlit sessions and threads without copying. cumulative_tax[i] is the
+    slab tax due on an income of exactly slab_lowers[i].
+    """
+    fy_ay: str
+    slabs: tuple
+    slab_lowers: tuple
+    slab_uppers: tuple
+    slab_rates: tuple
+    cumulative_tax: tuple
+    standard_deduction: int
+    rebate_limit: int
+    rebate_max: int
+    surcharge_thresholds: tuple
+    surcharge_rates: tuple
+    cess_rate: float
+    stcg_rate: float
+    ltcg_rate: float
+    ltcg_exemption: int
+    advance_tax_threshold: int
+    regime: str = "new"
+    # Old-regime deduction caps; zero means the regime does not allow the deduction
+    section_80c_limit: int = 0
+    section_80d_limit: int = 0
+    section_80ccd_1b_limit: int = 0
+    section_24b_limit: int = 0
+    hra_metro_share: float = 0
+    hra_non_metro_share: float = 0
+
+    def __getitem__(self, key):
+        if key not in _LEGACY_KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+def compile_rule_set(fy_ay, slabs, standard_deduction, rebate_limit, rebate_max,
+                     surcharge_bands, cess_rate, advance_tax_threshold,
+                     stcg_rate, ltcg_rate, ltcg_exemption, regime="new", deductions=None):
+    """
+    Build a TaxRuleSet from (lower, upper, rate) slabs and (upper, rate)
+    surcharge bands, precomputing the cumulative tax at each slab boundary
+    """
+    deductions = deductions or {}
+    slabs = tuple((lower, upper, rate) for lower, upper, rate in slabs)
+    cumulative_tax = []
+    tax = 0
+    for lower, upper, rate in slabs:
+        cumulative_tax.append(tax)
+        if upper != float('inf'):
+            # Same summation order as the slab-by-slab loop, so results agree exactly
+            tax += (upper - lower) * rate
+    return TaxRuleSet(
+        fy_ay=fy_ay,
+        slabs=slabs,
+        slab_lowers=tuple(lower for lower, _, _ in slabs),
+        slab_uppers=tuple(upper for _, upper, _ in slabs),
+        slab_rates=tuple(rate for _, _, rate in slabs),
+        cumulative_tax=tuple(cumulative_tax),
+        standard_deduction=standard_deduction,
+        rebate_limit=rebate_limit,
+        rebate_max=rebate_max,
+        surcharge_thresholds=tuple(upper for upper, _ in surcharge_bands[:-1]),
+        surcharge_rates=tuple(rate for _, rate in surcharge_bands),
+        cess_rate=cess_rate,
+        stcg_rate=stcg_rate,
+        ltcg_rate=ltcg_rate,
+        ltcg_exemption=ltcg_exemption,
+        advance_tax_threshold=advance_tax_threshold,
+        regime=regime,
+        section_80c_limit=deductions.get("section_80c", 0),
+        section_80d_limit=deductions.get("section_80d", 0),
+        section_80ccd_1b_limit=deductions.get("section_80ccd_1b", 0),
+        section_24b_limit=deductions.get("section_24b", 0),
+        hra_metro_share=deductions.get("hra_metro_share", 0),
+        hra_non_metro_share=deductions.get("hra_non_metro_share", 0)
+    )
+
+def _check_bands(bands, name, source, with_lower):
+    if not bands:
+        raise ValueError(f"{source}: '{name}' must not be empty")
+    previous_upper = 0
+    for i, band in enumerate(bands):
+        lower, upper, rate = band if with_lower else (previous_upper, *band)
+        if with_lower and lower != previous_upper:
+            raise ValueError(f"{source}: {name}[{i}] starts at {lower}, expected {previous_upper}")
+        if not 0 <= rate <= 1:
+            raise ValueError(f"{source}: {name}[{i}] rate {rate} is not between 0 and 1")
+        last = i == len(bands) - 1
+        if last != (upper is None):
+            raise ValueError(f"{source}: only the last entry of '{name}' may be open-ended (null)")
+        if upper is not None and upper <= lower:
+            raise ValueError(f"{source}: {name}[{i}] upper bound {upper} is not above {lower}")
+        previous_upper = upper
+
+def compile_rule_file(data, source="<rules>"):
+    """
+    Validate one parsed rule file and compile it into a TaxRuleSet.
+    Raises ValueError naming the file and field on any problem.
+    """
+    if data.get("schema_version") != SCHEMA_VERSION:
+        raise ValueError(f"{source}: unsupported schema_version {data.get('schema_version')!r}")
+    required = ["fy_ay", "slabs", "standard_deduction", "rebate_87a", "surcharge",
+                "cess_rate", "capital_gains", "advance_tax_threshold"]
+    missing = [key for key in required if key not in data]
+    if missing:
+        raise ValueError(f"{source}: missing {', '.join(missing)}")
+    _check_bands(data["slabs"], "slabs", source, with_lower=True)
+    _check_bands(data["surcharge"], "surcharge", source, with_lower=False)
+    regime = data.get("regime", "new")
+    if regime not in ("new", "old"):
+        raise ValueError(f"{source}: regime must be 'new' or 'old', not {regime!r}")
+    unknown = set(data.get("deductions", {})) - _DEDUCTION_KEYS
+    if unknown:
+        raise ValueError(f"{source}: unknown deductions {', '.join(sorted(unknown))}")
+    infinite = float('inf')
+    return compile_rule_set(
+        data["fy_ay"],
+        slabs=[(lower, infinite if upper is None else upper, rate)
+               for lower, upper, rate in data["slabs"]],
+        standard_deduction=data["standard_deduction"],
+        rebate_limit=data["rebate_87a"]["income_limit"],
+        rebate_max=data["rebate_87a"]["max_rebate"],
+        surcharge_bands=[(infinite if upper is None else upper, rate)
+                         for upper, rate in data["surcharge"]],
+        cess_rate=data["cess_rate"],
+        advance_tax_threshold=data["advance_tax_threshold"],
+        stcg_rate=data["capital_gains"]["stcg_rate"],
+        ltcg_rate=data["capital_gains"]["ltcg_rate"],
+        ltcg_exemption=data["capital_gains"]["ltcg_exemption"],
+        regime=regime,
+        deductions=data.get("deductions")
+    )
+
+def _rule_files(rules_dir):
+    return sorted(
+        os.path.join(rules_dir, name) for name in os.listdir(rules_dir) if name.endswith(".json")
+    )
+
+def _fingerprint(paths):
+    stats = [(os.path.basename(path), os.stat(path).st_mtime_ns, os.stat(path).st_size) for path in paths]
+    return COMPILED_FORMAT_VERSION, tuple(stats)
+
+def load_rule_sets(rules_dir=RULES_DIR, cache_path=COMPILED_CACHE_PATH):
+    """
+    Return {(fy_ay, regime): TaxRuleSet} for every rule file in rules_dir, reusing the
+    pickled compiled form at cache_path while no rule file has changed
+    """
+    paths = _rule_files(rules_dir)
+    fingerprint = _fingerprint(paths)
+    if cache_path:
+        try:
+            with open(cache_path, "rb") as f:
+                cached = pickle.load(f)
+            if cached["fingerprint"] == fingerprint:
+                return cached["rule_sets"]
+        except (OSError, pickle.UnpicklingError, EOFError, KeyError, TypeError, AttributeError):
+            pass
+
+    rule_sets = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            rule_set = compile_rule_file(json.load(f), source=os.path.basename(path))
+        key = (rule_set.fy_ay, rule_set.regime)
+        if key in rule_sets:
+            raise ValueError(f"{os.path.basename(path)}: duplicate {rule_set.regime} regime rules for {rule_set.fy_ay}")
+        rule_sets[key] = rule_set
+
+    if cache_path:
+        try:
+            with open(cache_path, "wb") as f:
+                pickle.dump({"fingerprint": fingerprint, "rule_sets": rule_sets}, f)
+        except OSError:
+            pass  # Read-only deployments just compile on every start
+    return rule_sets
+
+_LOADED = load_rule_sets()
+_RULE_SETS = {}
+for _rule_set in _LOADED.values():
+    _RULE_SETS[(_rule_set.fy_ay, _rule_set.regime)] = _rule_set
+    # Also answer to the bare "FY 2024-25" part of the label
+    _RULE_SETS[(_rule_set.fy_ay.split("/")[0].strip(), _rule_set.regime)] = _rule_set
+
+def available_fy_ay():
+    """
+    Every financial year we have new-regime rules for, newest first
+    """
+    return sorted((fy_ay for fy_ay, regime in _LOADED if regime == "new"), reverse=True)
+
+def get_rule_set(fy_ay, regime="new"):
+    """
+    Return the shared TaxRuleSet for fy_ay and regime ("new" or "old"),
+    falling back to the current year for labels we have no rules for
+    """
+    rule_set = _RULE_SETS.get((fy_ay, regime))
+    if rule_set is None:
+        return _RULE_SETS[(DEFAULT_FY_AY, regime)]
+    return rule_set
@@ -60,6 +60,844 @@ def test_tax_engine():
         traceback.print_exc()
         return False
 
+def test_tax_rules():
+    """Test the precompiled per-year rule sets"""
+    try:
+        from dataclasses import FrozenInstanceError
+        from tax_engine import get_tax_slabs, calculate_income_tax
+        from tax_rules import get_rule_set
+        
+        rules = get_rule_set("FY 2025-26 / AY 2026-27")
+        assert get_rule_set("FY 2025-26 / AY 2026-27") is rules
+        assert get_tax_slabs("FY 2025-26") is rules
+        assert get_rule_set("FY 2024-25 / AY 2025-26").rebate_max == 25000
+        
+        # Cumulative tax at each slab boundary matches the slab-by-slab computation
+        for lower, cumulative in zip(rules.slab_lowers, rules.cumulative_tax):
+            assert calculate_income_tax(lower, rules.fy_ay)[0] == cumulative
+        
+        try:
+            rules.rebate_limit = 0
+            raise AssertionError("rule sets must be immutable")
+        except FrozenInstanceError:
+            pass
+        
+        print("✅ Tax rule set tests passed")
+        return True
+    except Exception as e:
+        print(f" Tax rule set error: {e}")
+        traceback.print_exc()
+        return False
+
+def test_rule_files():
+    """Test loading, validation and the compiled cache of the rule files"""
+    try:
+        import json
+        import os
+        import shutil
+        import tempfile
+        from tax_rules import RULES_DIR, available_fy_ay, compile_rule_file, load_rule_sets
+        
+        assert available_fy_ay() == ["FY 2025-26 / AY 2026-27", "FY 2024-25 / AY 2025-26"]
+        
+        with open(os.path.join(RULES_DIR, "fy2025-26.json"), encoding="utf-8") as f:
+            data = json.load(f)
+        broken = dict(data, slabs=[[0, 400000, 0], [500000, None, 0.3]])
+        try:
+            compile_rule_file(broken, "broken.json")
+            raise AssertionError("gap between slabs must be rejected")
+        except ValueError as e:
+            assert "broken.json" in str(e) and "slabs[1]" in str(e)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            rules_dir = os.path.join(tmp, "rules")
+            shutil.copytree(RULES_DIR, rules_dir, ignore=shutil.ignore_patterns(".*"))
+            cache_path = os.path.join(tmp, "compiled.pickle")
+            compiled = load_rule_sets(rules_dir, cache_path)
+            assert os.path.exists(cache_path)
+            # A second load is served from the pickle; editing a file invalidates it
+            assert load_rule_sets(rules_dir, cache_path) == compiled
+            data["standard_deduction"] = 100000
+            with open(os.path.join(rules_dir, "fy2025-26.json"), "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            reloaded = load_rule_sets(rules_dir, cache_path)
+            assert reloaded[("FY 2025-26 / AY 2026-27", "new")].standard_deduction == 100000
+        
+        print("✅ Rule file tests passed")
+        return True
+    except Exception as e:
+        print(f" Rule file error: {e}")
+        traceback.print_exc()
+        return False
+
+def test_lazy_tax_breakdown():
+    """Test the bisect fast path and the lazily built slab breakdown"""
+    try:
+        from tax_engine import calculate_income_tax, calculate_slab_tax
+        
+        fy_ay = "FY 2025-26 / AY 2026-27"
+        assert calculate_slab_tax(1200000, fy_ay) == 60000
+        assert calculate_slab_tax(2500000, fy_ay) == 330000
+        
+        tax, breakdown = calculate_income_tax(1000000, fy_ay)
+        assert tax == 40000
+        assert breakdown and breakdown._rows is None  # truthiness does not build rows
+        assert [row["rate"] for row in breakdown] == ["5%", "10%"]
+        assert breakdown[0]["slab"] == "Rs. 4,00,000 - Rs. 8,00,000"
+        assert sum(row["tax"] for row in breakdown) == tax
+        
+        _, empty_breakdown = calculate_income_tax(350000, fy_ay)
+        assert not empty_breakdown and list(empty_breakdown) == []
+        
+        print("✅ Lazy tax breakdown tests passed")
+        return True
+    except Exception as e:
+        print(f" Lazy tax breakdown error: {e}")
+        traceback.print_exc()
+        return False
+
+def test_gross_up_solver():
+    """Test the inverse solvers against the forward tax computation"""
+    try:
+        from tax_engine import (
+            compute_total_tax_liability, solve_gross_salary_for_take_home,
+            solve_max_salary_for_tax, solve_max_bonus_for_tax
+        )
+        
+        fy_ay = "FY 2025-26 / AY 2026-27"
+        
+        def salary_tax(gross_salary):
+            return compute_total_tax_liability({"basic_salary": gross_salary}, fy_ay, "Salaried")["total_tax"]
+        
+        # Zero tax right up to the rebate limit plus standard deduction
+        assert solve_max_salary_for_tax(0, fy_ay) == 1275000
+        
+        targets = [100000, 500000, 1500000, 2500000]
+        for target, gross_salary in zip(targets, solve_max_salary_for_tax(targets, fy_ay)):
+            assert abs(salary_tax(gross_salary) - target) < 0.01
+        
+        # Just past the rebate cliff take-home dips, so the answer jumps above 12.75L
+        for target, gross_salary in zip([1275000, 1276000, 6000000],
+                                        solve_gross_salary_for_take_home([1275000, 1276000, 6000000], fy_ay)):
+            assert abs(gross_salary - salary_tax(gross_salary) - target) < 0.01
+            assert gross_salary - 1 - salary_tax(gross_salary - 1) < target
+        
+        # A target inside the rebate cliff stops at the cliff edge
+        assert solve_max_bonus_for_tax({"basic_salary": 1000000, "ltcg": 200000}, 50000, fy_ay) == 275000
+        bonus = solve_max_bonus_for_tax({"basic_salary": 1000000, "ltcg": 200000}, 100000, fy_ay)
+        assert abs(salary_tax(1000000 + bonus) + 9375 - 100000) < 0.01
+        
+        print("✅ Gross-up solver tests passed")
+        return True
+    except Exception as e:
+        print(f" Gross-up solver error: {e}")
+        traceback.print_exc()
+        return False
+
+def test_compact_tax_result():
+    """Test the slotted TaxResult reads like a dict at a fraction of the memory"""
+    try:
+        import pickle
+        import tracemalloc
+        from tax_engine import TaxResult, compute_total_tax_liability
+        
+        fy_ay = "FY 2025-26 / AY 2026-27"
+        result = compute_total_tax_liability({"basic_salary": 1875000, "stcg": 50000}, fy_ay, "Salaried")
+        assert isinstance(result, TaxResult) and not hasattr(result, "__dict__")
+        assert len(result) == 11 and result.get("missing", 0) == 0 and "cess" in result
+        assert result["taxable_income"] == 1800000 and result["stcg_tax"] == 10000
+        assert result["total_tax"] == result["tax_after_rebate"] + result["surcharge"] + result["cess"] + 10000
+        assert result["tax_breakdown"][-1]["rate"] == "20%"
+        assert dict(result) == dict(result.items()) and pickle.loads(pickle.dumps(result)) == result
+        try:
+            result["total_tax"] = 0
+            raise AssertionError("results must be read-only")
+        except TypeError:
+            pass
+        
+        incomes = [{"basic_salary": 500000 + i * 37, "stcg": i} for i in range(20000)]
+        def measure(build):
+            tracemalloc.start()
+            held = [build(details) for details in incomes]
+            size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del held
+            return size
+        as_dicts = measure(lambda details: dict(compute_total_tax_liability(details, fy_ay, "Salaried").items()))
+        compact = measure(lambda details: compute_total_tax_liability(details, fy_ay, "Salaried"))
+        assert as_dicts >= 5 * compact, (as_dicts, compact)
+        
+        # Every field comes from the rule set the result was built with, even
+        # one the registry does not know
+        from tax_rules import compile_rule_set, get_rule_set
+        rules = compile_rule_set(
+            "FY 2099-00", [(0, 300000, 0), (300000, 600000, 0.05), (600000, 900000, 0.10),
+                           (900000, float("inf"), 0.20)],
+            standard_deduction=0, rebate_limit=800000, rebate_max=25000,
+            surcharge_bands=[(5000000, 0), (float("inf"), 0.10)], cess_rate=0.04,
+            advance_tax_threshold=10000, stcg_rate=0.2, ltcg_rate=0.125, ltcg_exemption=125000
+        )
+        assert get_rule_set("FY 2099-00") is not rules
+        rebated = TaxResult(rules, 700000)
+        assert abs(rebated["gross_tax"] - 25000) < 1e-6 and rebated["rebate_87a"] == rebated["gross_tax"]
+        assert rebated["total_tax"] == 0
+        high = TaxResult(rules, 6000000)
+        assert abs(high["gross_tax"] - 1065000) < 1e-6 and high["rebate_87a"] == 0
+        assert abs(high["surcharge"] - 106500) < 1e-6
+        assert abs(high["total_tax"] - 1171500 * 1.04) < 1e-6
+        
+        print("✅ Compact tax result tests passed")
+        return True
+    except Exception as e:
+        print(f" Compact tax result error: {e}")
+        traceback.print_exc()
+        return False
+
+def test_stage_metrics():
+    """Test optional per-stage timing and its JSON / Prometheus export"""
+    try:
+        import json
+        import os
+        import tax_engine
+        import tax_metrics
+        
+        was_enabled = tax_metrics.is_enabled()
+        tax_metrics.disable()
+        original = tax_engine._slab_tax
+        tax_metrics.enable()
+        assert tax_engine._slab_tax is not original
+        tax_metrics.reset()
+        result = tax_engine.compute_total_tax_liability(
+            {"basic_salary": 1800000, "ltcg": 200000}, "FY 2025-26 / AY 2026-27", "Salaried"
+        )
+        result["total_tax"]
+        list(result["tax_breakdown"])
+        stages = tax_metrics.snapshot()["stages"]
+        assert stages["total"]["calls"] == 1 and stages["slab_tax"]["calls"] == 1
+        assert stages["breakdown"]["calls"] == 1 and stages["capital_gains"]["calls"] == 1
+        assert stages["total"]["input_size"]["buckets"]["2.4e+06"] == 1
+        assert stages["total"]["seconds"] > 0
+        assert json.loads(tax_metrics.to_json())["stages"]["rebate_87a"]["calls"] == 1
+        prometheus = tax_metrics.to_prometheus()
+        assert 'taxbot_stage_calls_total{stage="slab_tax"} 1' in prometheus
+        assert 'taxbot_stage_input_size_bucket{stage="slab_tax",le="+Inf"} 1' in prometheus
+        
+        tax_metrics.disable()
+        # Switched off, the engine runs its original functions again
+        assert tax_engine._slab_tax is original and not tax_metrics.is_enabled()
+        if was_enabled:
+            tax_metrics.enable()
+        
+        # Only an explicit yes in the environment switches metrics on at import
+        saved = os.environ.get(tax_metrics.ENV_VAR)
+        try:
+            for value, expected in [("1", True), (" On ", True), ("yes", True), ("0", False),
+                                    ("false", False), ("off", False), ("", False)]:
+                os.environ[tax_metrics.ENV_VAR] = value
+                assert tax_engine.metrics_requested() is expected, value
+        finally:
+            if saved is None:
+                os.environ.pop(tax_metrics.ENV_VAR, None)
+            else:
+                os.environ[tax_metrics.ENV_VAR] = saved
+        
+        print("✅ Stage metrics tests passed")
+        return True
+    except Exception as e:
+        print(f" Stage metrics error: {e}")
+        traceback.print_exc()
+        return False
+
+def test_tax_engine_batch():
+    """Test that the vectorized batch path matches the scalar engine"""
+    try:
+        from tax_engine import compute_total_tax_liability, compute_total_tax_liability_batch
+        
+        fy_ay = "FY 2025-26 / AY 2026-27"
+        rows = [
+            ({"basic_salary": 1275000}, "Salaried"),
+            ({"basic_salary": 1275001, "stcg": 80000, "ltcg": 200000}, "Salaried"),
+            ({"basic_salary": 6000000, "hra": 500000, "bonus": 100000}, "Salaried"),
+            ({"rent_received": 600000, "municipal_tax": 20000, "interest_paid": 100000}, "Rental"),
+            ({"net_profit": 1500000}, "Freelancer"),
+            ({"net_profit": 25000000}, "Business"),
+            ({"dividends": 75000, "interest_income": 50000, "ltcg": 100000}, "Investor"),
+            ({"basic_salary": 800000}, "Mixed")
+        ]
+        fields = ["basic_salary", "hra", "bonus", "rent_received", "municipal_tax",
+                  "interest_paid", "net_profit", "dividends", "interest_income", "stcg", "ltcg"]
+        batch = {name: [details.get(name, 0) for details, _ in rows] for name in fields}
+        batch["employment_type"] = [etype for _, etype in rows]
+        
+        results = compute_total_tax_liability_batch(batch, fy_ay)
+        for i, (details, etype) in enumerate(rows):
+            expected = compute_total_tax_liability(details, fy_ay, etype)
+            for key, column in results.items():
+                assert column[i] == expected[key], (etype, key, column[i], expected[key])
+        
+        print("✅ Batch tax engine tests passed")
+        return True
+    except Exception as e:
+        print(f" Batch tax engine error: {e}")
+        traceback.print_exc()
+        return False
+
+def test_mixed_income():
+    """Test head-wise aggregation for mixed income, scalar and batch"""
+    try:
+        from tax_engine import (
+            compute_income_heads, compute_income_heads_batch,
+            compute_total_tax_liability, compute_total_tax_liability_batch
+        )
+        
+        fy_ay = "FY 2025-26 / AY 2026-27"
+        details = {
+            "basic_salary": 1000000, "bonus": 75000,
+            "rent_received": 300000, "municipal_tax": 20000, "interest_paid": 400000,
+            "net_profit": 500000, "dividends": 20000, "interest_income": 30000, "ltcg": 200000
+        }
+        heads = compute_income_heads(details, fy_ay, "Mixed")
+        # The house property loss is not set off against other heads
+        assert heads == {"salary": 1000000, "house_property": 0, "business": 500000, "other_sources": 50000}
+        result = compute_total_tax_liability(details, fy_ay, "Mixed")
+        assert result["taxable_income"] == sum(heads.values()) == 1550000
+        assert result["ltcg_tax"] == 9375
+        assert compute_income_heads(details, fy_ay, "Salaried")["business"] == 0
+        # A business loss is not set off against salary
+        loss = {"basic_salary": 1500000, "net_profit": -300000}
+        assert compute_total_tax_liability(loss, fy_ay, "Mixed")["taxable_income"] == 1425000
+        assert compute_total_tax_liability(loss, fy_ay, "Business")["taxable_income"] == 0
+        
+        rows = [
+            (details, "Mixed"),
+            ({"basic_salary": 600000, "rent_received": 240000, "dividends": 10000}, "Mixed"),
+            ({"net_profit": 2000000, "interest_income": 90000}, "Mixed"),
+            ({"basic_salary": 1500000, "net_profit": -300000}, "Mixed"),
+            (details, "Salaried"),
+            (details, "Investor")
+        ]
+        fields = ["basic_salary", "bonus", "rent_received", "municipal_tax", "interest_paid",
+                  "net_profit", "dividends", "interest_income", "ltcg"]
+        batch = {name: [row.get(name, 0) for row, _ in rows] for name in fields}
+        batch["employment_type"] = [etype for _, etype in rows]
+        results = compute_total_tax_liability_batch(batch, fy_ay)
+        head_columns = compute_income_heads_batch(batch, fy_ay)
+        for i, (row, etype) in enumerate(rows):
+            expected = compute_total_tax_liability(row, fy_ay, etype)
+            assert results["taxable_income"][i] == expected["taxable_income"], etype
+            assert results["total_tax"][i] == expected["total_tax"], etype
+            for head, amount in compute_income_heads(row, fy_ay, etype).items():
+                assert head_columns[head][i] == amount, (etype, head)
+        
+        print("✅ Mixed income tests passed")
+        return True
+    except Exception as e:
+        print(f" Mixed income error: {e}")
+        traceback.print_exc()
+        return False
+
+def test_tax_function():
+    """Test the piecewise-linear tax function against the engine"""
+    try:
+        import numpy as np
+        from tax_engine import compute_total_tax_liability, get_tax_function
+        
+        fy_ay = "FY 2025-26 / AY 2026-27"
+        tax_function = get_tax_function(fy_ay)
+        assert get_tax_function(fy_ay) is tax_function
+        incomes = np.array([0, 400000, 1200000, 1200001, 1875000, 5000001, 60000000])
+        for income, tax in zip(incomes, tax_function(incomes)):
+            assert tax == compute_total_tax_liability({"net_profit": int(income)}, fy_ay, "Business")["total_tax"]
+        
+        assert 1200000 in tax_function.breakpoints and 5000000 in tax_function.breakpoints
+        jumps = dict(tax_function.jumps())
+        assert set(jumps) == {1200000, 5000000, 10000000, 20000000, 50000000}
+        assert abs(jumps[1200000] - 62400) < 1e-6  # the 87A rebate cliff
+        assert abs(tax_function.marginal_rate(1500000) - 0.15 * 1.04) < 1e-12
+        assert tax_function.marginal_rate(1200000) > 0 and tax_function.marginal_rate(300000) == 0
+        assert tax_function.effective_rate(0) == 0
+        
+        curve = tax_function.curve(3000000, points=500)
+        assert curve["income"].is_monotonic_increasing
+        assert {1200000, 2400000}.issubset(set(curve["income"]))
+        
+        # A rule set whose 87A kink falls in the second taxed slab
+        from tax_engine import _batch_slab_income_tax, _liability_pieces
+        from tax_rules import compile_rule_set
+        rules = compile_rule_set(
+            "FY 2099-00", [(0, 300000, 0), (300000, 600000, 0.05), (600000, 900000, 0.10),
+                           (900000, float("inf"), 0.20)],
+            standard_deduction=0, rebate_limit=800000, rebate_max=25000,
+            surcharge_bands=[(float("inf"), 0)], cess_rate=0.04, advance_tax_threshold=10000,
+            stcg_rate=0.2, ltcg_rate=0.125, ltcg_exemption=125000
+        )
+        starts, ends, tax_at_start, slopes = _liability_pieces(rules)
+        assert 700000 in starts
+        probes = np.linspace(1, 1500000, 3001)
+        k = np.searchsorted(starts, probes, side="left") - 1
+        _, _, tax_after_rebate, surcharge, cess = _batch_slab_income_tax(rules, probes)
+        assert np.allclose(tax_at_start[k] + slopes[k] * (probes - starts[k]), tax_after_rebate + surcharge + cess)
+        
+        print("✅ Tax function tests passed")
+        return True
+    except Exception as e:
+        print(f" Tax function error: {e}")
+        traceback.print_exc()
+        return False
+
+def test_advance_tax():
+    """Test advance tax installments and 234B / 234C interest"""
+    try:
+        import numpy as np
+        from advance_tax import schedule_advance_tax, schedule_advance_tax_batch
+        
+        fy_ay = "FY 2025-26 / AY 2026-27"
+        schedule = schedule_advance_tax(100000, 10000, (10000, 20000, 20000, 20000), fy_ay)
+        assert schedule["assessed_tax"] == 90000
+        assert [schedule[f"installment_{i}"] for i in range(1, 5)] == [13500, 27000, 27000, 22500]
+        # 1% a month on each quarter's shortfall: 3500 x 3, 10500 x 3, 17500 x 3, 20000 x 1
+        assert schedule["interest_234c"] == 105 + 315 + 525 + 200
+        # Only 70000 of 90000 paid, under 90%, so 1% a month on 20000 until July
+        assert schedule["interest_234b"] == 800
+        assert abs(sum(interest for _, interest in schedule["monthly_interest"]) -
+                   schedule["total_interest"]) < 1e-9
+        assert schedule["installments"][0]["due_date"].isoformat() == "2025-06-15"
+        
+        # 12% paid by June is enough to avoid 234C on the first installment
+        relieved = schedule_advance_tax(100000, 0, (12000, 33000, 30000, 25000), fy_ay)
+        assert relieved["interest_234c"] == 0 and relieved["interest_234b"] == 0
+        assert schedule_advance_tax(9999, 0, (0, 0, 0, 0), fy_ay)["total_interest"] == 0
+        presumptive = schedule_advance_tax(50000, presumptive=True, fy_ay=fy_ay)
+        assert presumptive["installment_4"] == 50000 and presumptive["interest_234c"] == 500
+        
+        rng = np.random.default_rng(7)
+        total_tax = rng.integers(0, 500000, 200)
+        tds_paid = rng.integers(0, 100000, 200)
+        paid = rng.integers(0, 50000, (200, 4))
+        batch = schedule_advance_tax_batch(total_tax, tds_paid, paid, fy_ay)
+        for i in range(0, 200, 17):
+            single = schedule_advance_tax(int(total_tax[i]), int(tds_paid[i]), paid[i].tolist(), fy_ay)
+            assert batch["total_interest"][i] == single["total_interest"]
+            assert batch["balance_payable"][i] == single["balance_payable"]
+        
+        print("✅ Advance tax tests passed")
+        return True
+    except Exception as e:
+        print(f" Advance tax error: {e}")
+        traceback.print_exc()
+        return False
+
+def test_regime_comparison():
+    """Test the old vs new regime comparison, scalar and batch"""
+    try:
+        from tax_engine import (
+            compare_tax_regimes, compare_tax_regimes_batch, compute_total_tax_liability
+        )
+        
+        fy_ay = "FY 2024-25 / AY 2025-26"
+        details = {
+            "basic_salary": 1000000, "hra": 300000, "rent_paid": 360000, "metro_city": True,
+            "pf": 50000, "section_80c": 150000, "section_80d": 25000,
+            "nps_contribution": 50000, "home_loan_interest": 200000
+        }
+        comparison = compare_tax_regimes(details, fy_ay, "Salaried")
+        deductions = comparison["old_regime_deductions"]
+        assert deductions["hra_exemption"] == 260000  # rent paid less 10% of basic
+        assert deductions["section_80c"] == 150000    # PF plus 80C, capped
+        assert comparison["old"]["taxable_income"] == 565000
+        assert comparison["old"]["total_tax"] == 26520
+        assert comparison["new"]["total_tax"] == 88400
+        assert comparison["new"] == compute_total_tax_liability(details, fy_ay, "Salaried")
+        assert comparison["recommended_regime"] == "old" and comparison["savings"] == 61880
+        # Equal tax goes to the new regime
+        assert compare_tax_regimes({}, fy_ay, "Salaried")["recommended_regime"] == "new"
+        
+        rows = [
+            (details, "Salaried"),
+            ({"basic_salary": 1500000, "pf": 20000}, "Salaried"),
+            ({"net_profit": 900000, "section_80c": 100000, "home_loan_interest": 250000}, "Business"),
+            ({"rent_received": 500000, "interest_paid": 50000, "section_80d": 40000}, "Rental"),
+            ({"dividends": 400000, "ltcg": 300000, "nps_contribution": 60000}, "Investor")
+        ]
+        fields = ["basic_salary", "hra", "bonus", "rent_paid", "pf", "section_80c", "section_80d",
+                  "nps_contribution", "home_loan_interest", "rent_received", "interest_paid",
+                  "net_profit", "dividends", "ltcg", "metro_city"]
+        batch = {name: [row.get(name, 0) for row, _ in rows] for name in fields}
+        results = compare_tax_regimes_batch(batch, fy_ay, [etype for _, etype in rows])
+        for i, (row, etype) in enumerate(rows):
+            expected = compare_tax_regimes(row, fy_ay, etype)
+            assert results["new_total_tax"][i] == expected["new"]["total_tax"], (etype, "new")
+            assert results["old_total_tax"][i] == expected["old"]["total_tax"], (etype, "old")
+            assert results["old_regime_deductions"][i] == expected["old_regime_deductions"]["total"]
+            assert results["recommended_regime"][i] == expected["recommended_regime"]
+        
+        print("✅ Regime comparison tests passed")
+        return True
+    except Exception as e:
+        print(f" Regime comparison error: {e}")
+        traceback.print_exc()
+        return False
+
+def test_compliance_calendar():
+    """Test due dates and the client due-date index"""
+    try:
+        from datetime import date
+        import numpy as np
+        import pandas as pd
+        from compliance_calendar import build_compliance_calendar, compliance_deadlines, upcoming_deadlines
+        
+        fy_ay = "FY 2025-26 / AY 2026-27"
+        deadlines = {deadline.kind: deadline.due_date for deadline in compliance_deadlines(fy_ay)}
+        assert deadlines["advance_tax_1"] == date(2025, 6, 15)
+        assert deadlines["itr"] == date(2026, 7, 31)
+        assert deadlines["belated_revised"] == date(2026, 12, 31)
+        assert [d.kind for d in upcoming_deadlines(fy_ay, date(2026, 8, 1))] == ["itr_audit", "belated_revised"]
+        assert compliance_deadlines("FY 2024-25")[0].due_date == date(2024, 6, 15)
+        
+        clients = pd.DataFrame({
+            "total_tax": [100000, 5000, 300000, 200000, 80000],
+            "tds_paid": [0, 0, 0, 0, 80000],
+            "paid_1": [15000, 0, 0, 0, 0],
+            "tax_audit": [False, False, True, False, False]
+        }, index=["A", "B", "C", "D", "E"])
+        calendar = build_compliance_calendar(clients, fy_ay)
+        assert (np.diff(calendar.due_dates.astype(np.int64)) >= 0).all()
+        # A paid installment and a client below the advance tax threshold owe nothing
+        june = calendar.due_between("2025-06-01", "2025-06-30")
+        assert list(june["client"]) == ["C", "D"] and list(june["amount"]) == [45000, 30000]
+        september = calendar.upcoming(14, today=date(2025, 9, 2))
+        assert list(september["client"]) == ["A", "C", "D"]
+        # Each installment adds only its own shortfall, so amounts total up
+        assert september["amount"].tolist() == [30000, 90000, 60000]
+        installments = calendar.due_between(date(2025, 6, 1), date(2026, 3, 31))
+        assert installments.groupby("client")["amount"].sum().to_dict() == {"A": 85000, "C": 300000, "D": 200000}
+        assert calendar.upcoming(13, today=date(2025, 9, 2)).empty
+        returns = calendar.due_between(date(2026, 7, 1), date(2026, 12, 31))
+        assert dict(zip(returns["client"], returns["kind"])) == {"A": "itr", "B": "itr", "D": "itr", "C": "itr_audit"}
+        # A client with nothing left to pay gets no return entry
+        assert "E" not in set(calendar.clients)
+        
+        print("✅ Compliance calendar tests passed")
+        return True
+    except Exception as e:
+        print(f" Compliance calendar error: {e}")
+        traceback.print_exc()
+        return False
+
+def test_tax_pipeline():
+    """Test that the stage graph recomputes only what an update reaches"""
+    try:
+        from tax_engine import compute_total_tax_liability
+        from tax_pipeline import Stage, TaxPipeline, build_tax_pipeline, update_tax_pipeline
+        
+        fy_ay = "FY 2025-26 / AY 2026-27"
+        pipeline = build_tax_pipeline()
+        details = {"basic_salary": 1800000, "stcg": 10000}
+        result = update_tax_pipeline(pipeline, details, fy_ay, "Salaried")
+        assert result == compute_total_tax_liability(details, fy_ay, "Salaried")
+        assert len(pipeline.recomputed) == len(pipeline.stages)
+        
+        details["stcg"] = 50000
+        result = update_tax_pipeline(pipeline, details, fy_ay, "Salaried")
+        assert pipeline.recomputed == ("capital_gains_tax", "total_tax", "tax_result")
+        assert result == compute_total_tax_liability(details, fy_ay, "Salaried")
+        
+        update_tax_pipeline(pipeline, dict(details, hra=0), fy_ay, "Salaried")
+        assert pipeline.recomputed == ()
+        # Business income does not count for a salaried taxpayer, so nothing past taxable income reruns
+        update_tax_pipeline(pipeline, dict(details, net_profit=500000), fy_ay, "Salaried")
+        assert pipeline.recomputed == ("taxable_income",)
+        # Checking a recomputed breakdown for changes does not build its rows
+        update_tax_pipeline(pipeline, dict(details, basic_salary=2000000), fy_ay, "Salaried")
+        assert "tax_breakdown" in pipeline.recomputed and pipeline.values["tax_breakdown"]._rows is None
+        update_tax_pipeline(pipeline, dict(details, basic_salary=2000000, net_profit=1), fy_ay, "Salaried")
+        assert pipeline.recomputed == ("taxable_income",) and pipeline.values["tax_breakdown"]._rows is None
+        
+        # A failed update keeps nothing, so repeating it fails again
+        failing = {"dividends": -5}
+        for _ in range(2):
+            try:
+                update_tax_pipeline(pipeline, failing, fy_ay, "Investor")
+                raise AssertionError("negative taxable income must be rejected")
+            except ValueError:
+                pass
+        result = update_tax_pipeline(pipeline, dict(details, basic_salary=2000000, net_profit=1), fy_ay, "Salaried")
+        assert pipeline.recomputed == ()
+        assert result == compute_total_tax_liability(dict(details, basic_salary=2000000), fy_ay, "Salaried")
+        
+        try:
+            TaxPipeline([Stage("a", ["b"], abs), Stage("b", ["x"], abs)])
+            raise AssertionError("stages must come after their dependencies")
+        except ValueError:
+            pass
+        
+        print("✅ Tax pipeline tests passed")
+        return True
+    except Exception as e:
+        print(f" Tax pipeline error: {e}")
+        traceback.print_exc()
+        return False
+
+def test_batch_cli():
+    """Test the chunked CSV batch runner keeps rows in input order"""
+    try:
+        import io
+        import os
+        import tempfile
+        import pandas as pd
+        from batch_cli import run_batch
+        from tax_engine import compute_total_tax_liability
+        
+        rows = pd.DataFrame({
+            "basic_salary": [1500000, 0, 900000, 0, 3000000],
+            "net_profit": [0, 2500000, 0, None, 0],
+            "rent_received": [0, 0, 0, 600000, 0],
+            "employment_type": ["Salaried", "Business", "Salaried", "Rental", "Salaried"]
+        })
+        with tempfile.TemporaryDirectory() as tmp:
+            input_path = os.path.join(tmp, "input.csv")
+            rows.to_csv(input_path, index=False)
+            for workers in (0, 2):
+                output_path = os.path.join(tmp, f"output_{workers}.csv")
+                processed = run_batch(input_path, output_path, workers=workers,
+                                      chunk_size=2, log=io.StringIO())
+                assert processed == len(rows)
+                output = pd.read_csv(output_path)
+                for i, row in rows.fillna(0).iterrows():
+                    expected = compute_total_tax_liability(row.to_dict(), "FY 2025-26 / AY 2026-27",
+                                                           row["employment_type"])
+                    assert output.loc[i, "total_tax"] == expected["total_tax"]
+        
+        print("✅ Batch CLI tests passed")
+        return True
+    except Exception as e:
+        print(f" Batch CLI error: {e}")
+        traceback.print_exc()
+        return False
+
+def test_tax_dataset():
+    """Test the memory-mapped columnar dataset: compute in place and query in chunks"""
+    try:
+        import os
+        import tempfile
+        import numpy as np
+        import pandas as pd
+        from tax_dataset import TaxDataset
+        from tax_engine import compute_total_tax_liability_batch
+        
+        fy_ay = "FY 2025-26 / AY 2026-27"
+        rng = np.random.default_rng(11)
+        n_rows = 5000
+        frame = pd.DataFrame({
+            "basic_salary": rng.integers(0, 4000000, n_rows),
+            "net_profit": rng.integers(0, 2000000, n_rows),
+            "ltcg": rng.integers(0, 300000, n_rows),
+            "employment_type": rng.choice(["Salaried", "Business", "Mixed"], n_rows)
+        })
+        expected = compute_total_tax_liability_batch(frame, fy_ay)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "clients.csv")
+            frame.to_csv(csv_path, index=False)
+            dataset = TaxDataset.from_csv(csv_path, os.path.join(tmp, "clients"), chunk_size=1200)
+            dataset.compute(fy_ay, chunk_size=700)
+            
+            dataset = TaxDataset(os.path.join(tmp, "clients"))
+            assert isinstance(dataset["total_tax"], np.memmap) and dataset.schema["fy_ay"] == fy_ay
+            assert (np.asarray(dataset["total_tax"]) == expected["total_tax"].to_numpy()).all()
+            
+            high_tax = lambda view: view["total_tax"] > 200000
+            assert dataset.count(high_tax, chunk_size=900) == (expected["total_tax"] > 200000).sum()
+            assert (dataset.filter(high_tax, chunk_size=900) ==
+                    np.flatnonzero(expected["total_tax"] > 200000)).all()
+            q = [0, 25, 50, 90, 99.5, 100]
+            assert dataset.percentile("total_tax", q, chunk_size=900) == list(np.percentile(expected["total_tax"], q))
+            
+            summary = dataset.aggregate("total_tax", by="employment_type", chunk_size=900).set_index("group")
+            by_type = expected["total_tax"].groupby(frame["employment_type"])
+            assert (summary["count"] == by_type.count().reindex(summary.index)).all()
+            assert np.allclose(summary["sum"], by_type.sum().reindex(summary.index))
+            try:
+                dataset.compute(fy_ay)
+                raise AssertionError("read-only datasets must not be written")
+            except ValueError:
+                pass
+        
+        print("✅ Tax dataset tests passed")
+        return True
+    except Exception as e:
+        print(f" Tax dataset error: {e}")
+        traceback.print_exc()
+        return False
+
+def test_result_cache():
+    """Test LRU memoization of tax results and tips"""
+    try:
+        import threading
+        from tax_cache import (
+            LRUCache, canonical_income_key,
+            cached_compute_total_tax_liability, cached_get_smart_tips
+        )
+        
+        fy_ay = "FY 2025-26 / AY 2026-27"
+        # Zero-valued fields do not change the key
+        assert (canonical_income_key({"basic_salary": 900000, "hra": 0}, fy_ay, "Salaried") ==
+                canonical_income_key({"basic_salary": 900000}, fy_ay, "Salaried"))
+        
+        first = cached_compute_total_tax_liability({"basic_salary": 1800000, "bonus": 0}, fy_ay, "Salaried")
+        second = cached_compute_total_tax_liability({"basic_salary": 1800000}, fy_ay, "Salaried")
+        assert first is second
+        try:
+            first["total_tax"] = 0
+            raise AssertionError("cached results must be read-only")
+        except TypeError:
+            pass
+        tips = cached_get_smart_tips({"basic_salary": 1800000}, fy_ay, "Salaried")
+        assert isinstance(tips, tuple) and len(tips) > 0
+        
+        cache = LRUCache(maxsize=2)
+        cache.get_or_compute("a", lambda: 1)
+        cache.get_or_compute("b", lambda: 2)
+        cache.get_or_compute("a", lambda: 1)
+        cache.get_or_compute("c", lambda: 3)  # evicts "b", the least recently used
+        assert cache.get_or_compute("b", lambda: 4) == 4
+        assert cache.stats() == {"hits": 1, "misses": 4, "evictions": 2, "size": 2, "maxsize": 2}
+        
+        sized = LRUCache(maxsize=8, maxbytes=10, sizeof=len)
+        sized.get_or_compute("a", lambda: "aaaa")
+        sized.get_or_compute("b", lambda: "bbbb")
+        sized.get_or_compute("c", lambda: "cccc")  # 12 bytes, so "a" goes
+        assert len(sized) == 2 and sized.stats()["bytes"] == 8 and sized.stats()["evictions"] == 1
+        assert sized.get_or_compute("d", lambda: "d" * 11) == "d" * 11
+        assert len(sized) == 2 and sized.stats()["bytes"] == 8 and sized.stats()["evictions"] == 1
+        assert sized.get_or_compute("b", lambda: "") == "bbbb" and sized.get_or_compute("c", lambda: "") == "cccc"
+        
+        shared = LRUCache(maxsize=16)
+        workers = [
+            threading.Thread(target=lambda: [shared.get_or_compute(i % 32, lambda: i) for i in range(2000)])
+            for _ in range(8)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        stats = shared.stats()
+        assert stats["hits"] + stats["misses"] == 16000 and stats["size"] == 16
+        
+        print("✅ Result cache tests passed")
+        return True
+    except Exception as e:
+        print(f" Result cache error: {e}")
+        traceback.print_exc()
+        return False
+
+def test_benchmark_suite():
+    """Test the benchmark runner and regression check on a quick subset"""
+    try:
+        from benchmark import compare_to_baseline, run_benchmarks
+        
+        current = run_benchmarks(profiles=["small"], name_filter="formatter.", min_time=0.001, log=None)
+        assert set(current["results"]) == {
+            "formatter.format_indian_number[small]", "formatter.format_indian_series[small]",
+            "formatter.convert_to_words[small]"
+        }
+        for result in current["results"].values():
+            assert result["ops_per_sec"] > 0 and result["peak_bytes"] >= 0
+        
+        faster = {"results": {name: {"ops_per_sec": result["ops_per_sec"] * 2}
+                              for name, result in current["results"].items()}}
+        assert len(compare_to_baseline(current, faster, threshold=25)) == 3
+        assert compare_to_baseline(current, faster, threshold=60) == []
+        assert compare_to_baseline(current, {"results": {}}) == []
+        
+        print("✅ Benchmark suite tests passed")
+        return True
+    except Exception as e:
+        print(f" Benchmark suite error: {e}")
+        traceback.print_exc()
+        return False
+
+def test_indian_formatter():
+    """Test Indian digit grouping, scalar and for whole columns"""
+    try:
+        import numpy as np
+        import pandas as pd
+        from indian_formatter import (IndianFormatter, convert_to_words, convert_to_words_bulk,
+                                      format_indian_array, format_indian_currency,
+                                      format_indian_currency_short, format_indian_integer,
+                                      format_indian_number, format_indian_series, number_to_words,
+                                      parse_indian_amount, parse_indian_series)
+        
+        assert format_indian_integer(999) == "999"
+        assert format_indian_integer(123456789) == "12,34,56,789"
+        assert format_indian_integer(-12345) == "-12,345"
+        assert format_indian_number(1234567.891) == "12,34,567.89"
+        
+        amounts = [0, 7, -999, 1000, 99999, -100000, 12345678, 10 ** 15, 1500000.0]
+        assert list(format_indian_array(amounts)) == [format_indian_number(a) for a in amounts]
+        assert list(format_indian_array([1234.5, -0.001, -75.456], paise=True)) == ["1,234.50", "0.00", "-75.46"]
+        assert list(format_indian_array([2500, -2500, 0], sign=True, prefix="Rs. ")) == ["Rs. +2,500", "Rs. -2,500", "Rs. 0"]
+        assert format_indian_array([[1, 100000]]).tolist() == [["1", "1,00,000"]]
+        
+        rupee_short = IndianFormatter(symbol="₹", short=True)
+        assert [rupee_short(a) for a in (45000, 1250000, 12000000, 9999999)] == ["₹45,000", "₹12.5 L", "₹1.2 Cr", "₹1 Cr"]
+        assert IndianFormatter(precision=2, negative="parentheses")(-1500) == "(Rs. 1,500.00)"
+        assert IndianFormatter(precision=0, negative="leading")(-0.4) == "Rs. 0"
+        assert format_indian_currency(-1234.5) == "Rs. -1,234.5"
+        assert format_indian_currency_short(2500000) == "Rs. 25 L"
+        rupee_short(1250000)
+        assert rupee_short.cache_info().hits == 1
+        
+        assert convert_to_words(1250300.5) == "Twelve Lakh Fifty Thousand Three Hundred Rupees and Fifty Paise"
+        assert convert_to_words(1250300.5, "hi") == "बारह लाख पचास हज़ार तीन सौ रुपये और पचास पैसे"
+        assert convert_to_words(1) == "One Rupee" and convert_to_words(0.75) == "Seventy Five Paise"
+        assert number_to_words(10 ** 12) == "One Lakh Crore"
+        bulk = convert_to_words_bulk(np.array([[99, 1250300.5], [99, -2.5]]), language="hi")
+        assert bulk.shape == (2, 2) and bulk[0, 0] == bulk[1, 0] == "निन्यानवे रुपये"
+        assert bulk[1, 1] == convert_to_words(-2.5, "hi") == "ऋण दो रुपये और पचास पैसे"
+        
+        for text, expected in [("12,34,567", 1234567), ("₹12.5L", 1250000), ("1.2 Cr", 12000000),
+                               ("twelve lakh", 1200000), ("(Rs. 1,500.50)", -1500.5), ("Rs. 5,000/-", 5000)]:
+            assert parse_indian_amount(text) == expected, text
+        assert parse_indian_amount(convert_to_words(1250300.5, "hi")) == 1250300.5
+        for bad in ("1,2,3", "twelve apples", ""):
+            try:
+                parse_indian_amount(bad)
+                raise AssertionError(f"{bad!r} should be rejected")
+            except ValueError:
+                pass
+        column = pd.Series(["12,34,567.50", "Rs. 12.5L", None, "-1.2 Cr", "fifty thousand"], index=list("vwxyz"))
+        parsed = parse_indian_series(column)
+        assert parsed.dtype == np.int64 and parsed.to_dict() == {
+            "v": 123456750, "w": 125000000, "x": 0, "y": -1200000000, "z": 5000000
+        }
+        round_trip = np.array([0, 99.5, -123456.78, 98765432.1])
+        assert (parse_indian_series(pd.Series(format_indian_array(round_trip, paise=True, prefix="Rs. "))).to_numpy()
+                == np.rint(round_trip * 100)).all()
+        try:
+            parse_indian_series(pd.Series(["1,000", "lots"]))
+            raise AssertionError("a bad row should be rejected")
+        except ValueError as e:
+            assert "Row 1" in str(e)
+        
+        series = pd.Series([250000, 7500000], index=["a", "b"], name="tax")
+        formatted = format_indian_series(series)
+        assert formatted.to_dict() == {"a": "2,50,000", "b": "75,00,000"} and formatted.name == "tax"
+        
+        for bad in ([float("nan")], [1e18]):
+            try:
+                format_indian_array(bad)
+                raise AssertionError(f"{bad} should be rejected")
+            except ValueError:
+                pass
+        
+        print("✅ Indian formatter tests passed")
+        return True
+    except Exception as e:
+        print(f" Indian formatter error: {e}")
+        traceback.print_exc()
+        return False
+
 def test_smart_tips():
     """Test the smart tips module"""
     try:
@@ -85,6 +923,127 @@ def test_smart_tips():
         assert isinstance(tips, list)
         assert len(tips) > 0
         
+        # The decision table gives every row of a batch the same tips as one by one
+        import pandas as pd
+        from smart_tips import evaluate_tips_batch, render_tips_batch, tip_ids_batch
+        from tax_engine import compute_total_tax_liability, compute_total_tax_liability_batch
+        
+        fy_ay = "FY 2025-26 / AY 2026-27"
+        payroll = pd.DataFrame({
+            "basic_salary": [600000, 2500000, 0, 900000],
+            "hra": [200000, 0, 0, 150000],
+            "rent_paid": [180000, 0, 0, 0],
+            "net_profit": [0, 0, 1800000, 0],
+            "ltcg": [150000, 90000, 0, 400000],
+            "pf": [0, 180000, 0, 60000],
+            "home_loan_interest": [0, 200000, 0, 0],
+            "employment_type": ["Salaried", "Salaried", "Freelancer", "Mixed"]
+        }, index=["e1", "e2", "e3", "e4"])
+        results = compute_total_tax_liability_batch(payroll, fy_ay)
+        matches = evaluate_tips_batch(payroll, results, fy_ay=fy_ay)
+        tip_ids = tip_ids_batch(matches)
+        rendered = render_tips_batch(payroll, results, [1, 3], fy_ay=fy_ay)
+        assert set(rendered) == {1, 3}
+        for position, (label, row) in enumerate(payroll.iterrows()):
+            details = row.drop("employment_type").to_dict()
+            result = compute_total_tax_liability(details, fy_ay, row["employment_type"])
+            expected = get_smart_tips(details, result, fy_ay, row["employment_type"])
+            assert len(tip_ids[label]) == len(expected) == matches.loc[label].sum()
+            if position in rendered:
+                assert rendered[position] == expected
+        assert "presumptive" in tip_ids["e3"] and "missing_rent" not in tip_ids["e4"]
+        
+        # Savings come from re-running the engine with the tip applied
+        from smart_tips import tip_savings
+        from tax_engine import compare_tax_regimes
+        details = {"basic_salary": 1600000, "hra": 700000, "rent_paid": 800000, "pf": 60000,
+                   "home_loan_interest": 200000, "metro_city": True}
+        
+        def best_tax(income_details):
+            comparison = compare_tax_regimes(income_details, fy_ay, "Salaried")
+            return min(comparison["new"]["total_tax"], comparison["old"]["total_tax"])
+        
+        savings = tip_savings(details, fy_ay, "Salaried")
+        assert savings["section_80c"] == best_tax(details) - best_tax(dict(details, section_80c=90000)) > 0
+        assert savings["hra_exemption"] == best_tax(dict(details, rent_paid=0)) - best_tax(details) > 0
+        ranked = get_smart_tips(details, compute_total_tax_liability(details, fy_ay, "Salaried"), fy_ay, "Salaried")
+        assert [tip["savings"] for tip in ranked] == sorted((tip["savings"] for tip in ranked), reverse=True)
+        frame = pd.DataFrame([details])
+        # The scalar path prices the same scenarios as the batch one, both when
+        # the old regime may win and when the new regime wins every scenario
+        from smart_tips import tip_savings_batch
+        for scalar_details, etype in [(details, "Salaried"),
+                                      ({"basic_salary": 2100000, "pf": 90000, "ltcg": 300000}, "Salaried"),
+                                      ({"basic_salary": 900000, "rent_received": 600000, "ltcg": 200000}, "Mixed"),
+                                      ({"dividends": 400000, "section_80d": 10000}, "Investor")]:
+            batch_savings = tip_savings_batch(pd.DataFrame([scalar_details]), fy_ay, etype)
+            assert tip_savings(scalar_details, fy_ay, etype) == {
+                tip_id: float(values[0]) for tip_id, values in batch_savings.items()
+            }
+        assert tip_savings({"basic_salary": 2100000, "ltcg": 300000}, fy_ay, "Salaried")["ltcg_harvesting"] > 0
+        frame_results = compute_total_tax_liability_batch(frame, fy_ay, "Salaried")
+        frame_ids = tip_ids_batch(evaluate_tips_batch(frame, frame_results, "Salaried", fy_ay))[0]
+        assert {"regime_switch", "section_80c", "health_insurance"} <= set(frame_ids)
+        
+        # Each section is a single precomposed payload
+        from smart_tips import TIP_CATEGORIES, document_checklist_markdown, render_tips_html
+        html = render_tips_html(expected)
+        for tip in expected:
+            assert html.count(f"<strong>{tip['title']}</strong>") == 1
+        categories = [c for c in TIP_CATEGORIES if any(tip["category"] == c for tip in expected)]
+        headings = [html.index(TIP_CATEGORIES[c]) for c in categories]
+        assert headings == sorted(headings) and "style=" not in html
+        checklist = document_checklist_markdown("Salaried")
+        assert "☑️ Form 16 from employer" in checklist and checklist.count("☑️") == 10
+        assert document_checklist_markdown("Salaried") is checklist
+        
+        # Limits quoted in tip text come from the rule set the savings use
+        import dataclasses
+        from unittest import mock
+        import smart_tips
+        from indian_formatter import format_indian_currency
+        from tax_rules import get_rule_set
+        section_80c = next(tip for tip in ranked if tip["title"] == "Section 80C Headroom")
+        assert format_indian_currency(get_rule_set(fy_ay, "old").section_80c_limit) in section_80c["description"]
+        
+        def raised_80c_limit(fy, regime="new"):
+            rules = get_rule_set(fy, regime)
+            return dataclasses.replace(rules, section_80c_limit=200000) if regime == "old" else rules
+        
+        smart_tips.tip_figures.cache_clear()
+        try:
+            with mock.patch.object(smart_tips, "get_rule_set", raised_80c_limit):
+                description = smart_tips.TIP_TABLE.render("section_80c", {}, fy_ay=fy_ay)["description"]
+        finally:
+            smart_tips.tip_figures.cache_clear()
+        assert "Rs. 2,00,000 Section 80C limit" in description
+        
+        # Year-specific figures follow the selected financial year
+        gains = {"basic_salary": 900000, "stcg": 10000, "ltcg": 100000}
+        by_year = {}
+        for year in ("FY 2024-25 / AY 2025-26", "FY 2025-26 / AY 2026-27"):
+            year_tips = get_smart_tips(gains, compute_total_tax_liability(gains, year, "Salaried"), year, "Salaried")
+            by_year[year] = {tip["title"]: tip["description"] for tip in year_tips}
+        slabs_2024 = by_year["FY 2024-25 / AY 2025-26"]["New Tax Regime Slabs"]
+        slabs_2025 = by_year["FY 2025-26 / AY 2026-27"]["New Tax Regime Slabs"]
+        assert "FY 2024-25" in slabs_2024 and "0% up to Rs. 3 L" in slabs_2024
+        assert "up to Rs. 25,000" in slabs_2024 and "within Rs. 7,00,000" in slabs_2024
+        assert "0% up to Rs. 4 L" in slabs_2025 and "within Rs. 12,00,000" in slabs_2025
+        assert "FY 2025-26" not in " ".join(by_year["FY 2024-25 / AY 2025-26"].values())
+        
+        def lower_ltcg_exemption(fy, regime="new"):
+            return dataclasses.replace(get_rule_set(fy, regime), ltcg_exemption=50000, ltcg_rate=0.1)
+        
+        smart_tips.tip_figures.cache_clear()
+        try:
+            with mock.patch.object(smart_tips, "get_rule_set", lower_ltcg_exemption):
+                columns = smart_tips.tip_columns(gains, compute_total_tax_liability(gains, fy_ay, "Salaried"), "Salaried", fy_ay)
+                assert "ltcg_taxable" in [rule.tip_id for rule in smart_tips.TIP_TABLE.match(columns)]
+                ltcg_text = smart_tips.TIP_TABLE.render("ltcg_taxable", columns, fy_ay=fy_ay)["description"]
+        finally:
+            smart_tips.tip_figures.cache_clear()
+        assert "exceeds Rs. 50,000. Tax of 10%" in ltcg_text
+        
         print("✅ Smart tips tests passed")
         return True
     except Exception as e:
@@ -119,6 +1078,48 @@ def test_visualization():
         tax_chart = create_tax_breakdown_chart(test_tax_result)
         income_chart = create_income_composition_chart(test_income, "Salaried")
         
+        # Repeat renders come from the figure cache as fresh, equal figures
+        import json
+        from visualization import FIGURE_CACHE
+        FIGURE_CACHE.clear()
+        first = create_tax_breakdown_chart(test_tax_result)
+        hits = FIGURE_CACHE.stats()["hits"]
+        # Keys the chart does not read do not change the cache key
+        second = create_tax_breakdown_chart(dict(test_tax_result, total_tax=1, tax_breakdown=[]))
+        assert FIGURE_CACHE.stats()["hits"] == hits + 1 and second is not first
+        assert json.loads(second.to_json()) == json.loads(first.to_json())
+        uncached = create_tax_breakdown_chart.__wrapped__(test_tax_result)
+        assert json.loads(second.to_json()) == json.loads(uncached.to_json())
+        third = create_tax_breakdown_chart(dict(test_tax_result, cess=700))
+        assert FIGURE_CACHE.stats()["hits"] == hits + 1 and third.to_json() != first.to_json()
+        
+        # Savings bars show tax reachable in the cheaper regime
+        import visualization
+        from tax_engine import compare_tax_regimes, compute_total_tax_liability
+        fy_ay = "FY 2025-26 / AY 2026-27"
+        details = {"basic_salary": 1500000, "hra": 600000, "rent_paid": 720000, "metro_city": True,
+                   "home_loan_interest": 200000, "section_80c": 50000}
+        chart = visualization.create_savings_potential_chart(
+            compute_total_tax_liability(details, fy_ay, "Salaried"), details, "Salaried", fy_ay
+        )
+        bars = dict(zip(chart.data[0].x, chart.data[0].y))
+        assert bars["Cheaper Regime"] == compare_tax_regimes(details, fy_ay, "Salaried")["old"]["total_tax"]
+        with_80c = compare_tax_regimes(dict(details, section_80c=150000), fy_ay, "Salaried")["old"]["total_tax"]
+        assert bars["+ 80C (Rs. 1.5 L)"] == with_80c
+        
+        # Nothing to chart is not cached: the same zero-tax input runs the
+        # builder again on every render, and builders show no messages
+        from unittest import mock
+        zero_tax = compute_total_tax_liability({}, "FY 2025-26 / AY 2026-27", "Salaried")
+        size = len(FIGURE_CACHE)
+        with mock.patch.object(visualization.st, "info") as info:
+            for _ in range(2):
+                misses = FIGURE_CACHE.stats()["misses"]
+                assert visualization.create_tax_slab_visualization(zero_tax, "FY 2025-26 / AY 2026-27") is None
+                assert visualization.create_income_composition_chart({}, "Salaried") is None
+                assert FIGURE_CACHE.stats()["misses"] == misses + 2
+        assert len(FIGURE_CACHE) == size and not info.called
+        
         print("✅ Visualization tests passed")
         return True
     except Exception as e:
@@ -133,6 +1134,24 @@ def run_all_tests():
     tests = [
         ("Import Tests", test_imports),
         ("Tax Engine Tests", test_tax_engine),
+        ("Tax Rule Set Tests", test_tax_rules),
+        ("Rule File Tests", test_rule_files),
+        ("Lazy Tax Breakdown Tests", test_lazy_tax_breakdown),
+        ("Compact Tax Result Tests", test_compact_tax_result),
+        ("Stage Metrics Tests", test_stage_metrics),
+        ("Batch Tax Engine Tests", test_tax_engine_batch),
+        ("Gross-up Solver Tests", test_gross_up_solver),
+        ("Mixed Income Tests", test_mixed_income),
+        ("Tax Function Tests", test_tax_function),
+        ("Regime Comparison Tests", test_regime_comparison),
+        ("Advance Tax Tests", test_advance_tax),
+        ("Compliance Calendar Tests", test_compliance_calendar),
+        ("Tax Pipeline Tests", test_tax_pipeline),
+        ("Batch CLI Tests", test_batch_cli),
+        ("Tax Dataset Tests", test_tax_dataset),
+        ("Result Cache Tests", test_result_cache),
+        ("Benchmark Suite Tests", test_benchmark_suite),
+        ("Indian Formatter Tests", test_indian_formatter),
         ("Smart Tips Tests", test_smart_tips),
         ("Visualization Tests", test_visualization)
     ]
@@ -42,7 +42,7 @@ def test_scenario(name, income_details, employment_type):
             ("Tax Efficiency Gauge", create_tax_efficiency_gauge),
             ("Tax vs Income Comparison", create_tax_vs_income_comparison),
             ("Tax Slab Progression", create_tax_slab_progression_chart),
-            ("Savings Potential Chart", create_savings_potential_chart),
+            ("Savings Potential Chart", lambda r: create_savings_potential_chart(r, income_details, employment_type, 'FY 2025-26 / AY 2026-27')),
             ("Income Composition Chart", lambda r: create_income_composition_chart(income_details, employment_type))
         ]
         
@@ -11,10 +11,64 @@ from plotly.subplots import make_subplots
 import plotly.express as px
 import numpy as np
 import io
+import functools
+import hashlib
+import inspect
+import json
+from collections.abc import Mapping, Sequence
 from datetime import datetime
-from indian_formatter import format_indian_currency, format_indian_number
-from tax_engine import get_tax_slabs
+from indian_formatter import format_indian_currency, format_indian_currency_short, format_indian_number
+from smart_tips import tip_savings
+from tax_cache import LRUCache
+from tax_engine import get_tax_function, get_tax_slabs
+from tax_rules import get_rule_set
 
+# Figure JSON of every create_* chart builder, keyed by a hash of its inputs
+FIGURE_CACHE = LRUCache(maxsize=512, maxbytes=32 * 1024 * 1024, sizeof=len)
+
+def _json_default(value):
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, Sequence):
+        return list(value)
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot hash a {type(value).__name__} chart input")
+
+def cached_figure(*tax_result_keys):
+    """
+    Cache a chart builder in FIGURE_CACHE as figure JSON. The key is a hash
+    of the builder's arguments, with tax_result cut down to tax_result_keys,
+    the only keys the builder is given. A hit rebuilds the figure from JSON
+    without running the builder or plotly's validation. A builder that
+    returns None has nothing to show; that is not cached, and any message
+    about it is left to the caller.
+    """
+    def decorator(builder):
+        signature = inspect.signature(builder)
+
+        @functools.wraps(builder)
+        def wrapper(*args, **kwargs):
+            inputs = signature.bind(*args, **kwargs).arguments
+            if "tax_result" in inputs:
+                inputs["tax_result"] = {key: inputs["tax_result"][key] for key in tax_result_keys}
+            try:
+                content = json.dumps([builder.__name__, inputs], sort_keys=True, default=_json_default)
+            except TypeError:
+                return builder(**inputs)
+
+            def build():
+                figure = builder(**inputs)
+                return None if figure is None else figure.to_json(validate=False)
+
+            figure_json = FIGURE_CACHE.get_or_compute(hashlib.sha256(content.encode()).hexdigest(), build)
+            if figure_json is None:
+                return None
+            return go.Figure(**json.loads(figure_json), _validate=False)
+        return wrapper
+    return decorator
+
+@cached_figure("tax_after_rebate", "surcharge", "cess", "stcg_tax", "ltcg_tax")
 def create_tax_breakdown_chart(tax_result):
     """
     Create an enhanced and interactive pie chart showing tax breakdown
@@ -60,6 +114,7 @@ def create_tax_breakdown_chart(tax_result):
     
     return fig
 
+@cached_figure("taxable_income", "total_tax")
 def create_tax_efficiency_gauge(tax_result):
     """
     Create a gauge chart showing tax efficiency
@@ -102,6 +157,7 @@ def create_tax_efficiency_gauge(tax_result):
     
     return fig
 
+@cached_figure("taxable_income", "total_tax")
 def create_tax_vs_income_comparison(tax_result):
     """
     Create a comparison chart between gross income and tax liability
@@ -119,7 +175,7 @@ def create_tax_vs_income_comparison(tax_result):
             x=categories,
             y=values,
             marker_color=colors,
-            text=[format_indian_currency(v) for v in values],
+            text=[format_indian_currency_short(v) for v in values],
             textposition='auto',
             hovertemplate='<b>%{x}</b><br>Amount: Rs. %{y:,.0f}<extra></extra>'
         )
@@ -135,6 +191,7 @@ def create_tax_vs_income_comparison(tax_result):
     
     return fig
 
+@cached_figure("tax_breakdown")
 def create_tax_slab_progression_chart(tax_result):
     """
     Create a progressive tax slab visualization
@@ -196,19 +253,73 @@ def create_tax_slab_progression_chart(tax_result):
     
     return fig
 
-def create_savings_potential_chart(tax_result):
+@cached_figure("taxable_income")
+def create_tax_rate_curve_chart(tax_result, fy_ay):
     """
-    Create a chart showing potential savings opportunities
+    Create exact marginal and effective tax rate curves up to twice the
+    user's taxable income, marking where the user sits on them
     """
     taxable_income = tax_result['taxable_income']
+    if taxable_income <= 0:
+        return None
+    
+    tax_function = get_tax_function(fy_ay)
+    curve = tax_function.curve(2 * taxable_income, points=2000)
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=curve['income'],
+        y=curve['marginal_rate'] * 100,
+        mode='lines',
+        name='Marginal Rate (%)',
+        line=dict(color='#A23B72', width=2, shape='hv'),
+        hovertemplate='Income: Rs. %{x:,.0f}<br>Marginal Rate: %{y:.2f}%<extra></extra>'
+    ))
+    fig.add_trace(go.Scatter(
+        x=curve['income'],
+        y=curve['effective_rate'] * 100,
+        mode='lines',
+        name='Effective Rate (%)',
+        line=dict(color='#2E86AB', width=3),
+        hovertemplate='Income: Rs. %{x:,.0f}<br>Effective Rate: %{y:.2f}%<extra></extra>'
+    ))
+    fig.add_trace(go.Scatter(
+        x=[taxable_income],
+        y=[tax_function.effective_rate(taxable_income) * 100],
+        mode='markers',
+        name='You',
+        marker=dict(color='red', size=12)
+    ))
+    
+    fig.update_layout(
+        title="Marginal vs Effective Tax Rate",
+        xaxis_title="Taxable Income (Rs.)",
+        yaxis_title="Tax Rate (%)",
+        height=400,
+        hovermode='x unified'
+    )
+    
+    return fig
+
+@cached_figure("total_tax")
+def create_savings_potential_chart(tax_result, income_details, employment_type, fy_ay):
+    """
+    Create a chart showing potential savings opportunities
+    """
     current_tax = tax_result['total_tax']
     
-    # Calculate potential savings with different deductions
+    # Savings are measured in the cheaper regime, so each deduction bar is the
+    # tax actually reachable there: cheaper-regime tax less its saving
+    savings = tip_savings(income_details, fy_ay, employment_type)
+    rules = get_rule_set(fy_ay, "old")
+    best_tax = current_tax - savings['regime_switch']
     savings_scenarios = {
         'Current Tax': current_tax,
-        'With 80C (₹1.5L)': max(0, current_tax - (150000 * 0.20)),  # Rough estimate
-        'With NPS (₹50K)': max(0, current_tax - (50000 * 0.20)),
-        'With Health Insurance': max(0, current_tax - (25000 * 0.20))
+        'Cheaper Regime': best_tax,
+        f'+ 80C ({format_indian_currency_short(rules.section_80c_limit)})': best_tax - savings['section_80c'],
+        f'+ NPS ({format_indian_currency_short(rules.section_80ccd_1b_limit)})': best_tax - savings['nps'],
+        f'+ Health Insurance ({format_indian_currency_short(rules.section_80d_limit)})':
+            best_tax - savings['health_insurance']
     }
     
     scenarios = list(savings_scenarios.keys())
@@ -218,8 +329,8 @@ def create_savings_potential_chart(tax_result):
         go.Bar(
             x=scenarios,
             y=taxes,
-            marker_color=['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4'],
-            text=[format_indian_currency(t) for t in taxes],
+            marker_color=['#FF6B6B', '#FFEAA7', '#4ECDC4', '#45B7D1', '#96CEB4'],
+            text=[format_indian_currency_short(t) for t in taxes],
             textposition='auto',
             hovertemplate='<b>%{x}</b><br>Tax: Rs. %{y:,.0f}<extra></extra>'
         )
@@ -235,14 +346,16 @@ def create_savings_potential_chart(tax_result):
     
     return fig
 
+@cached_figure()
 def create_income_composition_chart(income_details, employment_type):
     """
     Create a bar chart showing income composition
     """
     income_sources = []
     amounts = []
+    mixed = employment_type == "Mixed"
     
-    if employment_type == "Salaried":
+    if employment_type == "Salaried" or mixed:
         if income_details.get('basic_salary', 0) > 0:
             income_sources.append("Basic Salary")
             amounts.append(income_details['basic_salary'])
@@ -255,17 +368,17 @@ def create_income_composition_chart(income_details, employment_type):
             income_sources.append("Bonus")
             amounts.append(income_details['bonus'])
     
-    elif employment_type == "Rental":
+    if employment_type == "Rental" or mixed:
         if income_details.get('rent_received', 0) > 0:
             income_sources.append("Rent Received")
             amounts.append(income_details['rent_received'])
     
-    elif employment_type in ["Freelancer", "Business"]:
+    if employment_type in ["Freelancer", "Business"] or mixed:
         if income_details.get('net_profit', 0) > 0:
             income_sources.append("Net Profit")
             amounts.append(income_details['net_profit'])
     
-    elif employment_type == "Investor":
+    if employment_type == "Investor" or mixed:
         if income_details.get('dividends', 0) > 0:
             income_sources.append("Dividends")
             amounts.append(income_details['dividends'])
@@ -283,7 +396,6 @@ def create_income_composition_chart(income_details, employment_type):
             amounts.append(income_details['ltcg'])
     
     if not income_sources:
-        st.info("No income data to display.")
         return None
     
     fig = go.Figure(data=[go.Bar(
@@ -303,12 +415,12 @@ def create_income_composition_chart(income_details, employment_type):
     
     return fig
 
+@cached_figure("tax_breakdown")
 def create_tax_slab_visualization(tax_result, fy_ay):
     """
     Create a visualization showing tax slab utilization
     """
     if not tax_result["tax_breakdown"]:
-        st.info("No tax slab data to display.")
         return None
     
     slabs = []
@@ -508,6 +620,94 @@ def display_key_metrics(tax_result):
             delta="Due in quarterly installments" if tax_result['advance_tax_required'] else "Annual filing sufficient"
         )
 
+def display_regime_comparison(comparison):
+    """
+    Display new vs old regime tax side by side with the recommended regime
+    """
+    st.subheader("⚖️ New vs Old Regime")
+    new_result, old_result = comparison['new'], comparison['old']
+    deductions = comparison['old_regime_deductions']
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("New Regime Tax", format_indian_currency(new_result['total_tax']))
+    with col2:
+        st.metric("Old Regime Tax", format_indian_currency(old_result['total_tax']))
+    with col3:
+        st.metric(
+            "Recommended",
+            f"{comparison['recommended_regime'].title()} Regime",
+            f"Saves {format_indian_currency(comparison['savings'])}" if comparison['savings'] > 0 else "Same tax"
+        )
+    
+    rows = [
+        ("Taxable Income", new_result['taxable_income'], old_result['taxable_income']),
+        ("HRA Exemption", 0, deductions['hra_exemption']),
+        ("Section 80C", 0, deductions['section_80c']),
+        ("Section 80D", 0, deductions['section_80d']),
+        ("Section 80CCD(1B)", 0, deductions['section_80ccd_1b']),
+        ("Section 24(b)", 0, deductions['section_24b']),
+        ("Tax after Rebate", new_result['tax_after_rebate'], old_result['tax_after_rebate']),
+        ("Surcharge", new_result['surcharge'], old_result['surcharge']),
+        ("Cess", new_result['cess'], old_result['cess']),
+        ("Total Tax", new_result['total_tax'], old_result['total_tax'])
+    ]
+    st.dataframe(
+        pd.DataFrame(
+            [(label, format_indian_currency(new), format_indian_currency(old)) for label, new, old in rows],
+            columns=["Component", "New Regime", "Old Regime"]
+        ),
+        use_container_width=True,
+        hide_index=True
+    )
+
+def display_advance_tax_schedule(schedule):
+    """
+    Display quarterly advance tax installments and interest under 234B / 234C
+    """
+    st.subheader("📅 Advance Tax Schedule")
+    if sum(installment['amount_due'] for installment in schedule['installments']) == 0:
+        st.info("No advance tax is due after TDS; any balance can be paid as self-assessment tax.")
+        return
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Interest u/s 234C", format_indian_currency(schedule['interest_234c']))
+    with col2:
+        st.metric("Interest u/s 234B", format_indian_currency(schedule['interest_234b']))
+    with col3:
+        st.metric("Balance Payable", format_indian_currency(schedule['balance_payable']))
+    
+    st.dataframe(
+        pd.DataFrame([
+            {
+                "Due Date": installment['due_date'].strftime("%d %b %Y"),
+                "Amount Due": format_indian_currency(installment['amount_due']),
+                "Amount Paid": format_indian_currency(installment['amount_paid']),
+                "Cumulative Shortfall": format_indian_currency(installment['shortfall'])
+            }
+            for installment in schedule['installments']
+        ]),
+        use_container_width=True,
+        hide_index=True
+    )
+    
+    if schedule['total_interest'] > 0:
+        months, interest = zip(*schedule['monthly_interest'])
+        fig = go.Figure(go.Bar(
+            x=list(months),
+            y=list(interest),
+            marker_color='#A23B72',
+            hovertemplate='<b>%{x}</b><br>Interest: Rs. %{y:,.0f}<extra></extra>'
+        ))
+        fig.update_layout(
+            title="Interest Accruing by Month",
+            xaxis_title="Month",
+            yaxis_title="Interest (Rs.)",
+            height=350
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
 def display_visualizations(income_details, tax_result, employment_type, fy_ay):
     """
     Display enhanced visualizations for tax insights
@@ -530,9 +730,9 @@ def display_visualizations(income_details, tax_result, employment_type, fy_ay):
         # Show a simple visualization for zero tax case
         col1, col2 = st.columns(2)
         with col1:
-            st.metric("Your Tax Savings", f"Rs. {tax_result['rebate_87a']:,.0f}", "Thanks to Section 87A rebate")
+            st.metric("Your Tax Savings", format_indian_currency(tax_result['rebate_87a']), "Thanks to Section 87A rebate")
         with col2:
-            st.metric("Net Take-home", f"Rs. {tax_result['taxable_income']:,.0f}", "100% of taxable income")
+            st.metric("Net Take-home", format_indian_currency(tax_result['taxable_income']), "100% of taxable income")
         return
     
     # Create a three-column layout
@@ -550,17 +750,23 @@ def display_visualizations(income_details, tax_result, employment_type, fy_ay):
         income_chart = create_income_composition_chart(income_details, employment_type)
         if income_chart:
             st.plotly_chart(income_chart, use_container_width=True)
+        else:
+            st.info("No income data to display.")
         tax_vs_income = create_tax_vs_income_comparison(tax_result)
         if tax_vs_income:
             st.plotly_chart(tax_vs_income, use_container_width=True)
     
     with col3:
-        savings_potential_chart = create_savings_potential_chart(tax_result)
+        savings_potential_chart = create_savings_potential_chart(tax_result, income_details, employment_type, fy_ay)
         if savings_potential_chart:
             st.plotly_chart(savings_potential_chart, use_container_width=True)
         slab_progression_chart = create_tax_slab_progression_chart(tax_result)
         if slab_progression_chart:
             st.plotly_chart(slab_progression_chart, use_container_width=True)
+    
+    rate_curve_chart = create_tax_rate_curve_chart(tax_result, fy_ay)
+    if rate_curve_chart:
+        st.plotly_chart(rate_curve_chart, use_container_width=True)
 
 def offer_pdf_download(income_details, tax_result, tips, employment_type, fy_ay):
     """
@@ -10,6 +10,8 @@ import os
 from openai import OpenAI
 import re
 
+from indian_formatter import AMOUNT_IN_TEXT, parse_indian_amount
+
 # ========================== CONFIGURATION ==========================
 st.set_page_config(
     page_title="Voice Assistant - Income Tax Bot",
@@ -131,33 +133,25 @@ def transcribe_audio(audio_bytes_list):
             os.unlink(tmp_file_path)
 
 # ========================== FORM FIELD EXTRACTION ==========================
+# Form field: a keyword followed, somewhere later, by an amount in digits or words
+FIELD_PATTERNS = {
+    field: re.compile(rf"(?:{keywords}).*?(?P<amount>{AMOUNT_IN_TEXT.pattern})", re.IGNORECASE)
+    for field, keywords in [
+        ("basic_salary", "salary|income|pay"),
+        ("rent_paid", "rent paid|rent"),
+        ("tds_paid", "tds|tax deducted")
+    ]
+}
+
 def extract_form_fields(text):
     fields = {}
-    text_lower = text.lower()
-
-    def parse_amount(match):
-        if not match: return 0
-        amount_str = match.group(0).lower().replace('₹', '').replace(',', '').strip()
-        if 'lakh' in amount_str or 'lac' in amount_str:
-            base = re.search(r"(\d+(\.\d+)?)", amount_str)
-            return float(base.group(1)) * 100000 if base else 0
-        if 'crore' in amount_str:
-            base = re.search(r"(\d+(\.\d+)?)", amount_str)
-            return float(base.group(1)) * 10000000 if base else 0
-        direct_match = re.search(r"\d+\.?\d*", amount_str)
-        return float(direct_match.group(0)) if direct_match else 0
-
-    salary_match = re.search(r"(salary|income|pay).*?(\d[\d,.]*(?:\s(?:lakh|lac|crore))?)", text_lower)
-    if salary_match:
-        fields["basic_salary"] = int(parse_amount(salary_match))
-
-    rent_paid_match = re.search(r"(rent paid|rent).*?(\d[\d,.]*(?:\s(?:lakh|lac|crore))?)", text_lower)
-    if rent_paid_match:
-        fields["rent_paid"] = int(parse_amount(rent_paid_match))
-
-    tds_match = re.search(r"(tds|tax deducted).*?(\d[\d,.]*(?:\s(?:lakh|lac|crore))?)", text_lower)
-    if tds_match:
-        fields["tds_paid"] = int(parse_amount(tds_match))
+    for field, pattern in FIELD_PATTERNS.items():
+        match = pattern.search(text)
+        if match:
+            try:
+                fields[field] = int(parse_indian_amount(match.group("amount")))
+            except ValueError:
+                pass
 
     return {k: v for k, v in fields.items() if v > 0}
 